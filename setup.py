@@ -69,6 +69,7 @@ setup(
         "console_scripts": [
             "pylele1=pylele.pylele1.main:pylele_main",
             "pylele2=pylele.pylele2.all_assembly:main",
+            "pylele_bench=pylele.bench:bench_main",
             "stl2glb=b13d.conversion.stl2glb:stl2glb",
             "stlascii2stlbin=b13d.conversion.stlascii2stlbin:stlascii2stlbin",
             "stlbin2stlascii=b13d.conversion.stlbin2stlascii:stlbin2stlascii",
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+"""
+    Bounding box helpers, cached bounding boxes of shapes,
+    and broadphase skipping booleans of disjoint shapes
+"""
+
+from __future__ import annotations
+
+import functools
+
+import numpy as np
+
+# minimum gap between bounding boxes for shapes to be disjoint [mm]
+DISJOINT_TOL = 1e-6
+
+BROADPHASE_CUTS = ["cut"]
+BROADPHASE_INTERSECTIONS = ["intersection"]
+BROADPHASE_DIFFERENCES = ["difference_all"]
+
+# Shape methods changing the geometry, invalidating the cached bounding box
+BBOX_MUTATORS = [
+    "cut", "join", "intersection", "fillet", "hull", "minkowski",
+    "mv", "rotate_x", "rotate_y", "rotate_z", "rotate", "scale", "transform",
+    "linear_extrude", "rotate_extrude", "offset", "projection",
+    "extrudeZ", "repairMesh",
+]
+# Shape methods returning a copy, leaving the original geometry untouched
+BBOX_COPIES = ["dup", "mirror"]
+
+def bbox_bounds(bbox: tuple) -> np.ndarray:
+    """ 3x2 array of (min, max) per axis, None if the box is degenerate, e.g. 2D shapes """
+    bounds = np.array(bbox, dtype=float).reshape(3, 2)
+    if np.any(bounds[:, 1] - bounds[:, 0] <= 0):
+        return None
+    return bounds
+
+def disjoint(a: np.ndarray, b: np.ndarray) -> bool:
+    """ True if two bounds are known and separated along an axis """
+    if a is None or b is None:
+        return False
+    return bool(np.any(a[:, 0] > b[:, 1] + DISJOINT_TOL) or np.any(b[:, 0] > a[:, 1] + DISJOINT_TOL))
+
+def shape_bounds(shape) -> np.ndarray:
+    """ Bounds of a Shape, None if empty or degenerate """
+    if shape is None or not shape.has_solid():
+        return None
+    return bbox_bounds(shape.bbox())
+
+def updated_bbox(bbox: tuple, method: str, args: tuple, kwargs: dict) -> tuple:
+    """ bbox after a translation or scaling, None if it cannot be updated analytically """
+    if bbox is None or kwargs or method not in ["mv", "scale"] or len(args) != 3:
+        return None
+    bounds = bbox_bounds(bbox)
+    if bounds is None:
+        # 2D shapes ignore z moves
+        return None
+    if method == "mv":
+        bounds = bounds + np.array(args, dtype=float)[:, None]
+    else:
+        bounds = np.sort(bounds * np.array(args, dtype=float)[:, None], axis=1)
+    return tuple(float(v) for v in bounds.flatten())
+
+def cached_bbox(func):
+    """ Decorator memoizing bbox until the shape is changed """
+    @functools.wraps(func)
+    def wrapper(self):
+        if self._bbox_cache is None:
+            self._bbox_cache = tuple(func(self))
+        return self._bbox_cache
+    wrapper.bbox_cache = True
+    return wrapper
+
+def bbox_mutator(method: str):
+    """ Decorator invalidating the cached bbox of a shape changed by method,
+        or updating it for translations and scalings """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            before = self._bbox_cache
+            result = func(self, *args, **kwargs)
+            if result is self:
+                self._bbox_cache = updated_bbox(before, method, args, kwargs)
+            else:
+                if method not in BBOX_COPIES:
+                    self._bbox_cache = None
+                if hasattr(result, "_bbox_cache"):
+                    result._bbox_cache = before if method == "dup" else None
+            return result
+        wrapper.bbox_cache = True
+        return wrapper
+    return decorator
+
+def bbox_cache_methods(cls):
+    """ Wrap bbox and the mutating methods defined by a Shape class """
+    for name in ["bbox"] + BBOX_MUTATORS + BBOX_COPIES:
+        func = cls.__dict__.get(name)
+        if func is not None and not getattr(func, "bbox_cache", False):
+            setattr(cls, name, cached_bbox(func) if name == "bbox" else bbox_mutator(name)(func))
+
+class BooleanStats:
+    """ Counters of booleans performed and skipped by the broadphase """
+
+    def __init__(self):
+        self.counters = {}
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> dict:
+        return dict(self.counters)
+
+    def since(self, snapshot: dict) -> dict:
+        """ Counters increase since a snapshot """
+        return {k: v - snapshot.get(k, 0) for k, v in self.counters.items() if v != snapshot.get(k, 0)}
+
+    def reset(self):
+        self.counters = {}
+
+BOOLEAN_STATS = BooleanStats()
+
+def broadphase(kind: str):
+    """ Decorator skipping a cut or intersection when the operands bounding boxes are disjoint """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, other, *args, **kwargs):
+            if other is None or not disjoint(shape_bounds(self), shape_bounds(other)):
+                BOOLEAN_STATS.count(kind)
+                return func(self, other, *args, **kwargs)
+            if kind == "cut":
+                BOOLEAN_STATS.count("skipped_cut")
+                return self
+            empty = self.api.empty_solid()
+            if empty is None:
+                BOOLEAN_STATS.count(kind)
+                return func(self, other, *args, **kwargs)
+            BOOLEAN_STATS.count("skipped_intersection")
+            self.solid = empty
+            return self
+        wrapper.broadphase = True
+        return wrapper
+    return decorator
+
+def broadphase_difference(func):
+    """ Decorator dropping the cutters of difference_all disjoint from base """
+    @functools.wraps(func)
+    def wrapper(self, base, cutters, *args, **kwargs):
+        base_bounds = shape_bounds(base)
+        kept = [c for c in cutters if c is not None and not disjoint(base_bounds, shape_bounds(c))]
+        BOOLEAN_STATS.count("cut", len(kept))
+        BOOLEAN_STATS.count("skipped_cut", len([c for c in cutters if c is not None]) - len(kept))
+        if len(kept) == 0:
+            return base
+        return func(self, base, kept, *args, **kwargs)
+    wrapper.broadphase = True
+    return wrapper
+
+def broadphase_methods(cls, names: list, decorator):
+    """ Wrap methods defined by a class, used by base classes on subclass creation """
+    for name in names:
+        func = cls.__dict__.get(name)
+        if func is not None and not getattr(func, "broadphase", False):
+            setattr(cls, name, decorator(func))
+
+def test_broadphase(self):
+    """ Test bounding box broadphase of booleans """
+    from b13d.api.core import Implementation
+
+    for impl in [Implementation.MANIFOLD, Implementation.TRIMESH]:
+        api = impl.get_api()
+        BOOLEAN_STATS.reset()
+
+        base = api.box(10, 10, 10)
+        base = base.cut(api.box(2, 2, 2).mv(20, 0, 0))
+        self.assertEqual(BOOLEAN_STATS.counters, {"skipped_cut": 1})
+        base = base.cut(api.box(2, 2, 20))
+        self.assertEqual(BOOLEAN_STATS.counters["cut"], 1)
+
+        base = api.difference_all(base, [api.box(2, 2, 2).mv(0, 30, 0), api.box(2, 2, 2).mv(5, 5, 5)])
+        self.assertEqual(BOOLEAN_STATS.counters["skipped_cut"], 2)
+        self.assertEqual(BOOLEAN_STATS.counters["cut"], 2)
+        bounds = shape_bounds(base)
+        self.assertAlmostEqual(bounds[0, 0], -5, places=3)
+        self.assertAlmostEqual(bounds[0, 1], 5, places=3)
+
+    # disjoint intersections are empty, on implementations with empty solids
+    api = Implementation.MANIFOLD.get_api()
+    snapshot = BOOLEAN_STATS.snapshot()
+    far = api.box(10, 10, 10).intersection(api.box(1, 1, 1).mv(0, 0, 50))
+    self.assertEqual(BOOLEAN_STATS.since(snapshot), {"skipped_intersection": 1})
+    self.assertIsNone(shape_bounds(far))
+    self.assertIsNotNone(shape_bounds(far.join(api.box(1, 1, 1))))
+    BOOLEAN_STATS.reset()
+
+def test_bbox_cache(self):
+    """ Test bounding boxes cached and updated by shape operations """
+    from b13d.api.core import Implementation
+
+    for impl in [Implementation.MANIFOLD, Implementation.TRIMESH]:
+        api = impl.get_api()
+        compute = type(api.box(1, 1, 1)).bbox.__wrapped__
+
+        shape = api.box(10, 20, 30)
+        bbox = shape.bbox()
+        self.assertIs(shape.bbox(), bbox)
+
+        # translations and scalings update the cache, without applying the transform
+        shape.mv(1, 2, 3).scale(2, -1, 1)
+        self.assertIsNotNone(shape._pending)
+        expected = (-8.0, 12.0, -12.0, 8.0, -12.0, 18.0)
+        for a, b in zip(shape.bbox(), expected):
+            self.assertAlmostEqual(a, b, places=6)
+        self.assertIsNotNone(shape._pending)
+        for a, b in zip(compute(shape), expected):
+            self.assertAlmostEqual(a, b, places=3)
+        self.assertAlmostEqual(shape.length(), 20, places=6)
+
+        # copies keep or drop the cache, other changes invalidate it
+        self.assertIs(shape.dup().bbox(), shape.bbox())
+        mirrored = shape.mirror((1, 0, 0))
+        self.assertIsNone(mirrored._bbox_cache)
+        self.assertAlmostEqual(mirrored.left(), -12, places=3)
+        self.assertIsNotNone(shape._bbox_cache)
+
+        shape.rotate_z(45)
+        self.assertIsNone(shape._bbox_cache)
+        self.assertAlmostEqual(shape.width(), compute(shape)[3] - compute(shape)[2], places=6)
+
+        shape.bbox()
+        shape.cut(api.box(1, 1, 100))
+        self.assertIsNone(shape._bbox_cache)
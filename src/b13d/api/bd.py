@@ -10,7 +10,7 @@ Supports fillet and hull operations.
 from __future__ import annotations
 
 import copy
-from math import pi, ceil
+from math import pi
 import os
 from pathlib import Path
 import sys
@@ -50,7 +50,7 @@ from b13d.api.core import ShapeAPI, Shape, Direction, Implementation
 from b13d.api.utils import (
     dimXY,
     file_ensure_extension,
-    lineSplineXY,
+    pointList,
     textToGlyphsPaths,
 )
 
@@ -98,7 +98,7 @@ class BDShapeAPI(ShapeAPI):
             raise ValueError("Cannot export empty Compound (no solids to export)")
         # Wrap export in timeout to prevent hang on complex geometry
         self._run_with_timeout(
-            lambda s, p: bd.export_stl(s, p),
+            lambda s, p: bd.export_stl(s, p, tolerance=self.mesh_tolerance()),
             (solid, file_ensure_extension(path, ".stl")),
             self.BOOLEAN_TIMEOUT,
         )
@@ -240,7 +240,7 @@ class BDShape(Shape):
         return self.solid
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.smoothing_segments(dim)
 
     def _ensure3d(self) -> BDShape:
         """If cross_section is set but solid is None, convert to 3D via dummy extrude."""
@@ -679,7 +679,7 @@ class BDLineSplineExtrusionZ(BDShape):
         api: BDShapeAPI,
     ):
         super().__init__(api)
-        approx_curve_path = lineSplineXY(start, path, self._smoothing_segments)
+        approx_curve_path = pointList(self.api.spline_polygon(start, path))
         cleaned = _clean_polygon_path(approx_curve_path)
         if cleaned is not None and len(cleaned) >= 3:
             # build123d extrude direction follows winding; normalize to CCW so
@@ -711,7 +711,7 @@ class BDLineSplineRevolveX(BDShape):
         _, dimY = dimXY(start, path)
         neg_deg = deg < 0
         deg = -deg if neg_deg else deg
-        approx_curve_path = lineSplineXY(start, path, self._smoothing_segments)
+        approx_curve_path = pointList(self.api.spline_polygon(start, path))
         cleaned = _clean_polygon_path(approx_curve_path)
         if cleaned is not None and len(cleaned) >= 3:
             # Use align=None to preserve original coordinates (bd.Polygon defaults to CENTER)
@@ -831,6 +831,7 @@ class BDTextZ(BDShape):
             txt,
             fontSize,
             dimToSegs=self._smoothing_segments,
+            segsKey=self.api.segments_key(),
         )
 
         text3d: bd.Solid | bd.Part | None = None
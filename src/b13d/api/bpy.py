@@ -34,7 +34,7 @@ from b13d.api.utils import (
     dimXY,
     file_ensure_extension,
     isPathCounterClockwise,
-    lineSplineXY,
+    pointList,
     radians,
     simplifyLineSpline,
 )
@@ -589,7 +589,7 @@ class BlenderShape(Shape):
         self.solid.select_set(True)
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.smoothing_segments(dim)
 
     def bbox(self) -> tuple[float, float, float, float, float, float]:
         bpy.context.view_layer.objects.active = self.solid
@@ -952,7 +952,7 @@ class BlenderLineSplineExtrusionZ(BlenderShape):
     ):
         super().__init__(api)
         # optimization:instead of detecting winding direction of polypath, detect the winding direction of input line-spline
-        polyPath = lineSplineXY(start, path, self._smoothing_segments)
+        polyPath = pointList(self.api.spline_polygon(start, path))
         if not isPathCounterClockwise(simplifyLineSpline(start, path)):
             polyPath.reverse()
         polyExt = BlenderPolyExtrusionZ(polyPath, ht, api, checkWinding=False)
@@ -968,7 +968,7 @@ class BlenderLineSplineRevolveX(BlenderShape):
         api: BlenderShapeAPI,
     ):
         super().__init__(api)
-        polyPath = lineSplineXY(start, path, self._smoothing_segments)
+        polyPath = pointList(self.api.spline_polygon(start, path))
 
         mesh = bpy.data.meshes.new(name="Polygon")
         bpy.ops.object.select_all(action="DESELECT")
@@ -980,7 +980,7 @@ class BlenderLineSplineRevolveX(BlenderShape):
         polyObj = bpy.data.objects.new(name="Polygon_Object", object_data=mesh)
 
         _, dimY = dimXY(start, path)
-        segs = self._smoothing_segments(abs(2 * pi * dimY * min(abs(deg), 360) / 360))
+        segs = self.api.revolve_segments(dimY, deg)
         bpy.ops.object.select_all(action="DESELECT")
         self.solid = polyObj
         bpy.context.collection.objects.link(self.solid)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+
+"""
+    Content Addressed On-Disk Cache for generated Solid shapes,
+    and in-process caches of shapes and primitive meshes
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import tempfile
+from argparse import Namespace
+from collections import OrderedDict
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from b13d.api.core import Shape, ShapeAPI
+from b13d.api.constants import ColorEnum, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_SIZE_MB
+from b13d.api.utils import make_or_exist_path
+
+CACHE_FORMAT_VERSION = 1
+CACHE_FILE_EXT = '.npz'
+PRIMITIVE_CACHE_SIZE = 256
+
+# cli fields that only affect where and how a solid is exported,
+# not the geometry returned by gen()
+CACHE_IGNORED_ARGS = [
+    'outdir',
+    'outdir_date_off',
+    'export',
+    'is_cut',
+    'section_x',
+    'section_y',
+    'section_z',
+    'stl_check_en',
+    'reference_volume',
+    'reference_volume_tolerance',
+    'no_cache',
+    'cache_dir',
+    'cache_max_size',
+    'trace',
+    'lazy',
+    'jobs',
+]
+
+# fingerprint of the python sources of each top level package, computed once per process
+_SOURCE_FINGERPRINTS = {}
+
+def package_version() -> str:
+    """ Return installed pylele version, if available """
+    try:
+        from importlib.metadata import version
+        return version('pylele')
+    except Exception:
+        return 'dev'
+
+def source_fingerprint(package: str) -> str:
+    """ Hash of all python sources in a top level package, so that cache entries
+        generated by a different revision of the code are never reused """
+    if package not in _SOURCE_FINGERPRINTS:
+        root = Path(__file__).resolve().parents[2] / package
+        digest = hashlib.sha256()
+        for fname in sorted(root.rglob('*.py')):
+            digest.update(str(fname.relative_to(root)).encode())
+            digest.update(fname.read_bytes())
+        _SOURCE_FINGERPRINTS[package] = digest.hexdigest()
+    return _SOURCE_FINGERPRINTS[package]
+
+def cli_fingerprint(cli: Namespace, ignored: list = CACHE_IGNORED_ARGS) -> str:
+    """ Deterministic text representation of the cli fields affecting geometry """
+    fields = vars(cli)
+    return ';'.join(
+        f'{key}={fields[key]!r}' for key in sorted(fields) if key not in ignored
+    )
+
+class ShapeCache:
+    """
+    Size bounded, least recently used, on-disk cache of generated shapes.
+
+    Entries are keyed on the content that determines the output of Solid.gen():
+    Solid class, geometry related cli fields, isCut, implementation, fidelity
+    and the version of the code. Shapes are stored as vertex and face arrays,
+    so only implementations exposing a triangle mesh can be cached.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_size_mb: float = DEFAULT_CACHE_MAX_SIZE_MB,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+
+    def key(self, solid) -> str:
+        """ Return the cache key of a Solid """
+        module = type(solid).__module__
+        package = module.split('.')[0]
+        fields = [
+            f'format={CACHE_FORMAT_VERSION}',
+            f'version={package_version()}',
+            f'b13d={source_fingerprint("b13d")}',
+            f'package={source_fingerprint(package)}' if package != 'b13d' else '',
+            f'class={module}.{type(solid).__qualname__}',
+            f'isCut={solid.isCut}',
+            f'implementation={solid.cli.implementation}',
+            f'fidelity={solid.cli.fidelity}',
+            f'cli={cli_fingerprint(solid.cli)}',
+        ]
+        return hashlib.sha256('\n'.join(fields).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        """ Return the file path of a cache entry """
+        return os.path.join(self.cache_dir, key + CACHE_FILE_EXT)
+
+    def load(self, solid) -> Shape:
+        """ Return cached shape of a Solid, or None on miss """
+        fname = self.path(self.key(solid))
+        if not os.path.isfile(fname):
+            return None
+
+        try:
+            with np.load(fname, allow_pickle=False) as data:
+                vertices = data['vertices']
+                faces = data['faces']
+                color = str(data['color'])
+        except (OSError, KeyError, ValueError) as e:
+            print(f'# WARNING: discarding corrupted cache entry {fname}: {e}')
+            self._remove(fname)
+            return None
+
+        shape = solid.api.mesh_from_arrays(vertices, faces)
+        if shape is None:
+            return None
+        if color in ColorEnum._member_names_:
+            shape.set_color(ColorEnum[color])
+
+        # refresh access time for least recently used eviction
+        os.utime(fname)
+        return shape
+
+    def store(self, solid, shape: Shape) -> str:
+        """ Store shape of a Solid, return file name or None if the shape cannot be cached """
+        api: ShapeAPI = solid.api
+        arrays = api.mesh_arrays(shape)
+        if arrays is None:
+            return None
+        vertices, faces = arrays
+        color = shape.color.name if isinstance(shape.color, Enum) else ''
+
+        make_or_exist_path(self.cache_dir)
+        fname = self.path(self.key(solid))
+
+        # atomic write, concurrent processes may generate the same entry
+        fd, tmpname = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, vertices=vertices, faces=faces, color=np.array(color))
+            os.replace(tmpname, fname)
+        except OSError as e:
+            print(f'# WARNING: cannot write cache entry {fname}: {e}')
+            self._remove(tmpname)
+            return None
+
+        self.evict()
+        return fname
+
+    def entries(self) -> list:
+        """ Return list of (access time, size, file name) of cache entries, oldest first """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for item in os.scandir(self.cache_dir):
+            if item.name.endswith(CACHE_FILE_EXT):
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        entries.sort()
+        return entries
+
+    def evict(self) -> None:
+        """ Remove least recently used entries until cache fits its maximum size """
+        entries = self.entries()
+        size = sum(e[1] for e in entries)
+        for _, entry_size, fname in entries:
+            if size <= self.max_size:
+                break
+            self._remove(fname)
+            size -= entry_size
+
+    def clear(self) -> None:
+        """ Remove all cache entries """
+        for _, _, fname in self.entries():
+            self._remove(fname)
+
+    def _remove(self, fname: str) -> None:
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+
+class ShapeRegistry:
+    """
+    In-process memo of generated shapes, so that a Solid constructed again
+    with the same class, isCut and cli within one build is not regenerated.
+    Shapes are stored and returned as duplicates, since solids modify their
+    shape in place after generation.
+    """
+
+    def __init__(self):
+        self.shapes = {}
+
+    def key(self, solid) -> tuple:
+        """ Return the registry key of a Solid """
+        return (type(solid), solid.isCut, cli_fingerprint(solid.cli))
+
+    def get(self, solid) -> Shape:
+        """ Return a duplicate of the registered shape of a Solid, or None on miss """
+        shape = self.shapes.get(self.key(solid))
+        if shape is None:
+            return None
+        return shape.dup()
+
+    def put(self, solid, shape: Shape) -> None:
+        """ Register the generated shape of a Solid """
+        self.shapes[self.key(solid)] = shape.dup()
+
+    def clear(self) -> None:
+        """ Remove all registered shapes """
+        self.shapes.clear()
+
+SHAPE_REGISTRY = ShapeRegistry()
+
+class PrimitiveCache:
+    """
+    Least recently used cache of primitive meshes of an implementation,
+    keyed by (primitive, dimensions, segments).
+    Cached meshes are shared, so they must be immutable, like manifolds:
+    shapes built from them transform a new mesh instead of the cached one.
+    """
+
+    def __init__(self, max_size: int = PRIMITIVE_CACHE_SIZE):
+        self.max_size = max_size
+        self.meshes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, build):
+        """ Return the cached mesh of key, built by build() on miss """
+        mesh = self.meshes.get(key)
+        if mesh is not None:
+            self.meshes.move_to_end(key)
+            self.hits += 1
+            return mesh
+        self.misses += 1
+        mesh = build()
+        self.meshes[key] = mesh
+        if len(self.meshes) > self.max_size:
+            self.meshes.popitem(last=False)
+        return mesh
+
+    def clear(self) -> None:
+        """ Remove all cached meshes """
+        self.meshes.clear()
+        self.hits = 0
+        self.misses = 0
+
+def shape_cache_from_cli(cli: Namespace) -> ShapeCache:
+    """ Return the ShapeCache configured by cli, or None if caching is disabled """
+    if getattr(cli, 'no_cache', False):
+        return None
+    return ShapeCache(
+        cache_dir=getattr(cli, 'cache_dir', DEFAULT_CACHE_DIR),
+        max_size_mb=getattr(cli, 'cache_max_size', DEFAULT_CACHE_MAX_SIZE_MB),
+    )
+
+def test_shape_cache(self):
+    """ Test ShapeCache """
+    from b13d.parts.tube import Tube
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        args = ['-i', 'mf', '-cdir', cache_dir]
+
+        first = Tube(args=args)
+        first.gen_full()
+        cache = shape_cache_from_cli(first.cli)
+        self.assertEqual(len(cache.entries()), 1)
+
+        second = Tube(args=args)
+        second.configure()
+        self.assertIsNotNone(cache.load(second))
+        second.gen_full()
+        self.assertAlmostEqual(first.shape.solid.volume(), second.shape.solid.volume(), places=3)
+
+        # geometry related arguments must change the key, output arguments must not
+        self.assertNotEqual(cache.key(first), cache.key(Tube(args=args + ['-H', '6'])))
+        self.assertEqual(cache.key(first), cache.key(Tube(args=args + ['-o', 'elsewhere'])))
+
+        cache.clear()
+        self.assertEqual(len(cache.entries()), 0)
+
+    # the registry returns an independent duplicate of the first generated shape,
+    # without applying its pending transform
+    SHAPE_REGISTRY.clear()
+    first = Tube(args=['-i', 'mf', '-nc'])
+    first.configure()
+    shape = first.gen().mv(0, 0, 5)
+    SHAPE_REGISTRY.put(first, shape)
+    second = Tube(args=['-i', 'mf', '-nc'])
+    memo = SHAPE_REGISTRY.get(second)
+    self.assertIsNotNone(memo)
+    self.assertIsNotNone(shape._pending)
+    self.assertIsNotNone(memo._pending)
+    memo.mv(10, 0, 0)
+    self.assertAlmostEqual(memo.bbox()[0], shape.bbox()[0] + 10, places=3)
+    self.assertIsNone(SHAPE_REGISTRY.get(Tube(args=['-i', 'mf', '-nc', '-C'])))
+    SHAPE_REGISTRY.clear()
+
+def test_primitive_cache(self):
+    """ Test PrimitiveCache """
+    from b13d.api.core import Implementation
+    from b13d.api.mf import MF_PRIMITIVES
+    from b13d.api.tm import TM_PRIMITIVES
+
+    cache = PrimitiveCache(max_size=2)
+    self.assertEqual(cache.get(("a",), lambda: "A"), "A")
+    cache.get(("b",), lambda: "B")
+    self.assertEqual(cache.get(("a",), lambda: "X"), "A")
+    cache.get(("c",), lambda: "C")
+    # b is the least recently used
+    self.assertEqual(list(cache.meshes.keys()), [("a",), ("c",)])
+    self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    for impl, primitives in [(Implementation.MANIFOLD, MF_PRIMITIVES), (Implementation.TRIMESH, TM_PRIMITIVES)]:
+        api = impl.get_api()
+        primitives.clear()
+        first = api.cylinder_z(10, 2).mv(5, 0, 0)
+        second = api.cylinder_z(10, 2)
+        api.sphere(3)
+        self.assertEqual((primitives.hits, primitives.misses), (1, 2))
+
+        # shapes built from a shared mesh are independent
+        self.assertAlmostEqual(first.left(), 3, places=3)
+        self.assertAlmostEqual(second.left(), -2, places=3)
+        second.cut(api.box(10, 10, 2))
+        self.assertAlmostEqual(api.cylinder_z(10, 2).height(), 10, places=3)
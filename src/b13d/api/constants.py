@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import os
 from enum import Enum
 
 FIT_TOL = 0.3
@@ -6,6 +7,16 @@ FILLET_RAD = 0.4
 
 DEFAULT_TEST_DIR = "test"
 DEFAULT_BUILD_DIR = "build"
+DEFAULT_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "b13d",
+)
+DEFAULT_CACHE_MAX_SIZE_MB = 512
+# fonts of this directory take precedence over the system fonts
+DEFAULT_FONT_DIR = os.getenv("B13D_FONT_DIR")
+# test cases run in isolated processes when more than one job or a timeout is set
+DEFAULT_TEST_JOBS = int(os.getenv("B13D_TEST_JOBS", "1"))
+DEFAULT_TEST_TIMEOUT = float(os.getenv("B13D_TEST_TIMEOUT", "0")) or None
 
 
 # Colors
@@ -2,17 +2,30 @@ from __future__ import annotations
 
 import os
 import sys
+import functools
 import importlib
-from math import inf, fabs
+import importlib.util
+from math import acos, ceil, inf, fabs, pi
 from enum import Enum
 from pathlib import Path
 from abc import ABC, abstractmethod
 from typing import Union
 
+import numpy as np
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
 from b13d.api.constants import DEFAULT_TEST_DIR, ColorEnum
-from b13d.api.utils import getFontname2FilepathMap
+from b13d.api.fonts import FONT_INDEX
+from b13d.api.utils import lineSplineXYArray
+from b13d.api.trace import traced, trace_methods
+from b13d.api.bbox import broadphase, broadphase_difference, broadphase_methods, bbox_cache_methods
+from b13d.api.bbox import BROADPHASE_CUTS, BROADPHASE_INTERSECTIONS, BROADPHASE_DIFFERENCES
+
+# methods traced when tracing is enabled, see b13d.api.trace
+TRACED_SHAPE_BOOLEANS = ["cut", "join", "intersection"]
+TRACED_API_BOOLEANS = ["union_all", "difference_all", "trim_by_plane", "split_by_plane"]
+TRACED_API_EXPORTS = ["export", "export_stl", "export_best"]
 
 # consider update to StrEnum for python 3.11 and above
 # https://tsak.dev/posts/python-enum/
@@ -52,6 +65,16 @@ class Fidelity(StringEnum):
             case Fidelity.HIGH:
                 return 17 # 18 causes weird chamber for blender, also too slow
 
+    def chord_tolerance(self) -> float:
+        """ Maximum distance between curves and their discretization [mm] """
+        match self:
+            case Fidelity.LOW:
+                return 0.1
+            case Fidelity.MEDIUM:
+                return 0.05
+            case Fidelity.HIGH:
+                return 0.02
+
     def code(self) -> str:
         return str(self)[0].upper()
 
@@ -90,11 +113,15 @@ class Implementation(StringEnum):
         """Returns the class name of the API"""
         return APIS_INFO[self]["class"]
 
+    def is_available(self) -> bool:
+        """ True if the backend packages are installed, without importing them """
+        return backend_available(self)
+
     def tolerance(self) -> float:
         """ Tolerance for joins to have a little overlap """
         return 0 if self == Implementation.CADQUERY else 0.02
 
-    def get_api(self, fidelity: Fidelity = Fidelity.LOW) -> ShapeAPI:
+    def get_api(self, fidelity: Fidelity = Fidelity.LOW, chord_tol: float = None) -> ShapeAPI:
         """ Get the handler to the selected implementation API """
         try:
             mod = importlib.import_module(self.module_name())
@@ -104,7 +131,7 @@ class Implementation(StringEnum):
                 f"Install the required package to use it. Error: {e}"
             )
         api = getattr(mod, self.class_name())
-        return api(implementation = self, fidelity=fidelity)
+        return api(implementation = self, fidelity=fidelity, chord_tol=chord_tol)
     
     def has_fillet(self):
         """Returns True if API supports fillet"""
@@ -114,43 +141,58 @@ class Implementation(StringEnum):
         """Returns True if API supports hull"""
         return APIS_INFO[self]["hull"]
 
+    def can_memoize(self):
+        """Returns True if generated shapes can be duplicated and reused within a process"""
+        return APIS_INFO[self]["memoize"]
+
+    def has_native_spline(self):
+        """Returns True if API draws splines natively, instead of discretizing them to polygons"""
+        return APIS_INFO[self]["native_spline"]
+
 APIS_INFO = {
-    Implementation.MOCK      : {"module": "b13d.api.mock", "class": "MockShapeAPI", "fillet": False, "hull" : True, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
-    Implementation.CADQUERY  : {"module": "b13d.api.cq", "class": "CQShapeAPI", "fillet": True, "hull" : False, "linear_extrude": True, "rotate_extrude": True, "offset": True, "offset_volume": True, "projection": True, "minkowski": False},
-    Implementation.BLENDER   : {"module": "b13d.api.bpy", "class": "BlenderShapeAPI", "fillet": True, "hull" : False, "linear_extrude": True, "rotate_extrude": True, "offset": True, "offset_volume": True, "projection": True, "minkowski": False},
-    Implementation.TRIMESH   : {"module": "b13d.api.tm", "class": "TMShapeAPI", "fillet": False, "hull" : True, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
-    Implementation.SOLID2    : {"module": "b13d.api.sp2", "class": "Sp2ShapeAPI", "fillet": False, "hull" : True, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": True},
-    Implementation.MANIFOLD  : {"module": "b13d.api.mf", "class": "MFShapeAPI", "fillet": False, "hull" : True, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
-    Implementation.BUILD123D : {"module": "b13d.api.bd", "class": "BDShapeAPI", "fillet": True, "hull" : True, "linear_extrude": True, "rotate_extrude": True, "offset": True, "offset_volume": False, "projection": True, "minkowski": True},
-    Implementation.PYVISTA   : {"module": "b13d.api.pv", "class": "PVShapeAPI", "fillet": False, "hull" : True, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
+    Implementation.MOCK      : {"module": "b13d.api.mock", "class": "MockShapeAPI", "requires": [], "memoize": True, "fillet": False, "hull" : True, "native_spline": False, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
+    Implementation.CADQUERY  : {"module": "b13d.api.cq", "class": "CQShapeAPI", "requires": ["OCP", "cadquery"], "memoize": True, "fillet": True, "hull" : False, "native_spline": True, "linear_extrude": True, "rotate_extrude": True, "offset": True, "offset_volume": True, "projection": True, "minkowski": False},
+    Implementation.BLENDER   : {"module": "b13d.api.bpy", "class": "BlenderShapeAPI", "requires": ["bpy"], "memoize": False, "fillet": True, "hull" : False, "native_spline": False, "linear_extrude": True, "rotate_extrude": True, "offset": True, "offset_volume": True, "projection": True, "minkowski": False},
+    Implementation.TRIMESH   : {"module": "b13d.api.tm", "class": "TMShapeAPI", "requires": ["trimesh"], "memoize": True, "fillet": False, "hull" : True, "native_spline": False, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
+    Implementation.SOLID2    : {"module": "b13d.api.sp2", "class": "Sp2ShapeAPI", "requires": ["solid2"], "memoize": True, "fillet": False, "hull" : True, "native_spline": False, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": True},
+    Implementation.MANIFOLD  : {"module": "b13d.api.mf", "class": "MFShapeAPI", "requires": ["manifold3d"], "memoize": True, "fillet": False, "hull" : True, "native_spline": False, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
+    Implementation.BUILD123D : {"module": "b13d.api.bd", "class": "BDShapeAPI", "requires": ["build123d"], "memoize": True, "fillet": True, "hull" : True, "native_spline": False, "linear_extrude": True, "rotate_extrude": True, "offset": True, "offset_volume": False, "projection": True, "minkowski": True},
+    Implementation.PYVISTA   : {"module": "b13d.api.pv", "class": "PVShapeAPI", "requires": ["pyvista"], "memoize": True, "fillet": False, "hull" : True, "native_spline": False, "linear_extrude": False, "rotate_extrude": False, "offset": False, "projection": False, "minkowski": False},
 }
 
+def module_available(name: str) -> bool:
+    """ True if a top level module can be imported, without importing it """
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+@functools.lru_cache(maxsize=None)
+def backend_available(impl: Implementation) -> bool:
+    """ True if the packages required by an implementation are installed, cached """
+    return all(module_available(name) for name in APIS_INFO[impl]["requires"])
+
 def supported_apis() -> list:
-    """Returns the list of supported apis, probing which backends are actually installed"""
+    """Returns the list of supported apis, probing which backends are actually installed.
+    Backend modules are imported by Implementation.get_api only"""
     ver = sys.version_info
     assert ver[0] == 3
 
     # Always available (mandatory dependencies)
     apis = [Implementation.TRIMESH]
 
-    # Probe optional backends by trying to import their modules
-    # and checking the module's *_AVAILABLE flag (since the module file
-    # itself may import successfully even when the backend package is missing)
+    # Optional backends, found by their packages
     optional_impls = [
-        (Implementation.SOLID2, "SP2_AVAILABLE"),
-        (Implementation.MANIFOLD, "MF_AVAILABLE"),
-        (Implementation.CADQUERY, "CQ_AVAILABLE"),
-        (Implementation.BUILD123D, "BD_AVAILABLE"),
-        (Implementation.BLENDER, "BPY_AVAILABLE"),
-        (Implementation.PYVISTA, "PV_AVAILABLE"),
+        Implementation.SOLID2,
+        Implementation.MANIFOLD,
+        Implementation.CADQUERY,
+        Implementation.BUILD123D,
+        Implementation.BLENDER,
+        Implementation.PYVISTA,
     ]
-    for impl, avail_flag in optional_impls:
-        try:
-            mod = importlib.import_module(impl.module_name())
-            if getattr(mod, avail_flag, False):
-                apis.append(impl)
-        except ImportError:
-            pass
+    apis += [impl for impl in optional_impls if backend_available(impl)]
 
     # Python version gate for Blender (only supported with 3.10 and 3.11)
     # if Implementation.BLENDER in apis and ver[1] not in (10, 11):
@@ -214,7 +256,11 @@ class Shape(ABC):
     api = None
     color : tuple[int, int, int] = None
     name : str = None
-    solid = None
+    _solid = None
+    _pending = None     # 4x4 transform not yet applied to _solid
+    broadphase = False  # skip booleans of shapes with disjoint bounding boxes
+    bbox_cache = True   # memoize bbox until the shape is changed
+    _bbox_cache = None
 
     def __init__(self,
                  api: ShapeAPI,
@@ -224,6 +270,50 @@ class Shape(ABC):
         self.solid = solid
         self.color = color
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_methods(cls, TRACED_SHAPE_BOOLEANS, "boolean")
+        if cls.bbox_cache:
+            bbox_cache_methods(cls)
+        if cls.broadphase:
+            broadphase_methods(cls, BROADPHASE_CUTS, broadphase("cut"))
+            broadphase_methods(cls, BROADPHASE_INTERSECTIONS, broadphase("intersection"))
+
+    @property
+    def solid(self):
+        """ Implementation solid, with the pending transform applied """
+        self.flush_transform()
+        return self._solid
+
+    @solid.setter
+    def solid(self, solid):
+        self._pending = None
+        self._bbox_cache = None
+        self._solid = solid
+
+    def defer_transform(self, matrix) -> Shape:
+        """ Compose matrix with the pending transform, applied once by the
+            transform method of the implementation when solid is read:
+            by booleans, hull, export and mesh access. bbox, dup and triangle_count
+            never apply it, so that observing, duplicating or tracing a shape
+            does not change its geometry """
+        self._pending = matrix if self._pending is None else matrix @ self._pending
+        self._bbox_cache = None
+        return self
+
+    def flush_transform(self) -> Shape:
+        """ Apply the pending transform """
+        if self._pending is not None:
+            matrix, self._pending = self._pending, None
+            bbox = self._bbox_cache
+            self.transform(matrix)
+            self._bbox_cache = bbox
+        return self
+
+    def has_solid(self) -> bool:
+        """ True if the shape has an implementation solid, without applying pending transforms """
+        return self._solid is not None
+
     @abstractmethod
     def cut(self, cutter: Shape) -> Shape: ...
 
@@ -239,6 +329,9 @@ class Shape(ABC):
         return self
 
     def half(self, plane: tuple[bool, bool, bool] = (False, True, False)) -> Shape:
+        if sum(bool(p) for p in plane) == 1:
+            # keep the negative side of a single plane
+            return self.api.trim_by_plane(self, tuple(-1 if p else 0 for p in plane))
         halfCutter = (
             self.api
             .box(self.MAX_DIM, self.MAX_DIM, self.MAX_DIM)
@@ -345,49 +438,49 @@ class Shape(ABC):
         
     def top(self) -> float:
         """Get the top Z coordinate of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MAXZ.value]
     
     def bottom(self) -> float:  
         """Get the bottom Z coordinate of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MINZ.value]
     
     def left(self) -> float:
         """Get the left X coordinate of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MINX.value]
     
     def right(self) -> float:
         """Get the right X coordinate of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MAXX.value]
     
     def front(self) -> float:       
         """Get the front Y coordinate of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MINY.value]
     
     def back(self) -> float:    
         """Get the back Y coordinate of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MAXY.value]
     
     def center(self) -> tuple[float, float, float]:
         """Get the center of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0, 0, 0
         bbox = self.bbox()
         return (
@@ -398,21 +491,21 @@ class Shape(ABC):
     
     def length(self) -> float:
         """Get the length (X) of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MAXX.value] - bbox[BBoxEnum.MINX.value]
 
     def width(self) -> float:
         """Get the width (Y) of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MAXY.value] - bbox[BBoxEnum.MINY.value]
 
     def height(self) -> float:
         """Get the height (Z) of the bounding box."""
-        if self.solid is None:
+        if not self.has_solid():
             return 0
         bbox = self.bbox()
         return bbox[BBoxEnum.MAXZ.value] - bbox[BBoxEnum.MINZ.value]
@@ -439,15 +532,30 @@ class ShapeAPI(ABC):
 
     implementation = None
     fidelity = None
-    font2path = getFontname2FilepathMap()
+    chord_tol = None  # maximum chord deviation [mm], None for fidelity segment counts
+    broadphase = False  # drop cutters of difference_all disjoint from base
 
     def __init__(
         self,
         implementation : Implementation,
         fidelity: Fidelity = Fidelity.LOW,
+        chord_tol: float = None,
     ):
         self.implementation = implementation
         self.fidelity = fidelity
+        self.chord_tol = chord_tol
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        trace_methods(cls, TRACED_API_BOOLEANS, "boolean")
+        trace_methods(cls, TRACED_API_EXPORTS, "export")
+        if cls.broadphase:
+            broadphase_methods(cls, BROADPHASE_DIFFERENCES, broadphase_difference)
+
+    @property
+    def font2path(self) -> dict[str, str]:
+        """ Map of font names to font files, built on first use """
+        return FONT_INDEX.font2path()
 
     def getFontPath(self, fontName: str) -> str:
         """
@@ -478,10 +586,33 @@ class ShapeAPI(ABC):
         assembly_name: str,
         path: Union[str, Path],
     ) -> None:
+        self.export_stl(shape=self.union_all(shapes), path=path)
+
+    @traced("boolean")
+    def union_all(self, shapes: list[Shape]) -> Shape:
+        """
+            Join a list of shapes, None entries are skipped.
+            Default implementation folds pairwise joins, implementations
+            supporting n-ary booleans should override it.
+        """
         joined: Shape = None
         for s in shapes:
+            if s is None:
+                continue
             joined = s if joined is None else joined.join(s)
-        self.export_stl(shape=joined, path=path)
+        return joined
+
+    @traced("boolean")
+    def difference_all(self, base: Shape, cutters: list[Shape]) -> Shape:
+        """
+            Cut a list of shapes from base, None entries are skipped.
+            Default implementation folds pairwise cuts, implementations
+            supporting n-ary booleans should override it.
+        """
+        for c in cutters:
+            if c is not None:
+                base = base.cut(c)
+        return base
 
     @abstractmethod
     def sphere(self, r: float) -> Shape: ...
@@ -678,9 +809,113 @@ class ShapeAPI(ABC):
         )
         return rod.cut(cutter)
 
+    def trim_by_plane(self, shape: Shape, normal: tuple[float, float, float], offset: float = 0) -> Shape:
+        """
+            Keep the part of shape on the side normal points to, of the plane
+            at distance offset from the origin along normal. Changes and returns shape, like cut.
+            By default cut with a box, for planes normal to an axis
+        """
+        axes = [i for i, n in enumerate(normal) if n != 0]
+        if len(axes) != 1:
+            raise ValueError(f"{self.implementation} only trims by planes normal to an axis, not {normal}")
+        axis = axes[0]
+        sign = 1 if normal[axis] > 0 else -1
+        maxDim = Shape.MAX_DIM
+        center = [0, 0, 0]
+        center[axis] = sign * (offset - maxDim / 2)
+        return shape.cut(self.box(maxDim, maxDim, maxDim).mv(*center))
+
+    def split_by_plane(self, shape: Shape, normal: tuple[float, float, float], offset: float = 0) -> tuple[Shape, Shape]:
+        """
+            Return the parts of shape on the side normal points to, and on the other side,
+            of the plane at distance offset from the origin along normal. shape is unchanged
+        """
+        opposite = tuple(-n for n in normal)
+        return (
+            self.trim_by_plane(shape.dup(), normal, offset),
+            self.trim_by_plane(shape.dup(), opposite, -offset),
+        )
+
     def tolerance(self):
         return self.implementation.tolerance()
 
+    def smoothing_segments(self, dim: float) -> int:
+        """
+            Number of segments of a curve of length dim [mm].
+            With a chord tolerance, the curve is taken as a circle of circumference dim,
+            the tightest bend of that length
+        """
+        if self.chord_tol is None:
+            return ceil(abs(dim) ** 0.5 * self.fidelity.smoothing_segments())
+        return self.revolve_segments(abs(dim) / (2 * pi))
+
+    def chord_tolerance(self) -> float:
+        """ Maximum distance between curves and their discretization [mm] """
+        return self.fidelity.chord_tolerance() if self.chord_tol is None else self.chord_tol
+
+    def mesh_tolerance(self) -> float:
+        """ Linear deflection of the tessellation of exact geometry [mm] """
+        return self.fidelity.tolerance() if self.chord_tol is None else self.chord_tol
+
+    def segments_key(self) -> tuple:
+        """ Key identifying the segment counts of smoothing_segments, e.g. for caches """
+        return (self.implementation, self.fidelity, self.chord_tol)
+
+    def revolve_segments(self, rad: float, deg: float = 360) -> int:
+        """ Number of segments of an arc of radius rad [mm] and deg degrees, within chord tolerance """
+        rad = abs(rad)
+        tol = self.chord_tolerance()
+        # the sagitta of a segment spanning angle a is rad * (1 - cos(a/2))
+        full = 3 if rad <= tol else max(3, ceil(pi / acos(1 - tol / rad)))
+        return max(1, ceil(full * min(abs(deg), 360) / 360))
+
+    def spline_polygon(
+        self,
+        start: tuple[float, float],
+        path: list[Union[tuple[float, float], list[tuple[float, float, float, float]]]],
+    ):
+        """
+            Return the closed (N, 2) polygon of a spline path, as discretized
+            by spline_extrusion and spline_revolve of implementations without native splines,
+            sampled adaptively within chord tolerance.
+            Coincident consecutive samples, e.g. a spline starting at the
+            previous point, are dropped, as they make degenerate faces
+        """
+        path = [list(p) if isinstance(p, list) else p for p in path]
+        polygon = lineSplineXYArray(start, path, tolerance=self.chord_tolerance())
+        distinct = np.linalg.norm(np.diff(polygon, axis=0), axis=1) > 1e-6
+        return polygon[np.concatenate([[True], distinct])]
+
+    def mesh_arrays(self, shape: Shape):
+        """
+            Return the triangle mesh of shape as MeshData, unpacking as
+            (vertices, faces) numpy arrays, or None if the implementation
+            does not expose a triangle mesh
+        """
+        return None
+
+    def mesh_from_arrays(self, vertices, faces) -> Shape:
+        """
+            Build a shape from vertices and faces numpy arrays,
+            or return None if the implementation does not support it
+        """
+        return None
+
+    def triangle_count(self, shape: Shape) -> int:
+        """ Return the number of triangles of shape, or None if not available """
+        arrays = self.mesh_arrays(shape)
+        if arrays is None:
+            return None
+        return len(arrays[1])
+
+    def empty_solid(self):
+        """ Return an empty implementation solid, or None if not supported """
+        return None
+
+    def supports_mesh_arrays(self) -> bool:
+        """ Return True if the implementation exposes triangle meshes as numpy arrays """
+        return type(self).mesh_arrays is not ShapeAPI.mesh_arrays
+
     def _validate_stl(self, stl_path: Path, name: str, min_volume: float | None = 0):
         """Validate an STL file using trimesh: check watertightness and volume.
         
@@ -1202,6 +1437,14 @@ class ShapeAPI(ABC):
         obj15 = self.sphere(5) << (0,1,2)
         self._export_and_validate(obj15, expDir, "obj15", min_volume=100)
 
+        # n-ary booleans
+        rods = [self.cylinder_z(10, 1).mv(x, 0, 0) for x in range(0, 20, 5)]
+        obj16 = self.union_all(rods).mv(0, -40, 0)
+        self._export_and_validate(obj16, expDir, "obj16", min_volume=100)
+        holes = [self.cylinder_z(20, 1).mv(x, 0, 0) for x in range(-6, 7, 4)]
+        obj17 = self.difference_all(self.box(20, 10, 10), holes).mv(0, 40, 0)
+        self._export_and_validate(obj17, expDir, "obj17", min_volume=1000)
+
         self._export_and_validate(joined, expDir, "all", min_volume=10000)
 
         
@@ -62,7 +62,7 @@ class CQShapeAPI(ShapeAPI):
             shape.solid,
             file_ensure_extension(path, fmt),
             CQ_EXPORTERS[fmt],
-            tolerance=self.fidelity.tolerance(),
+            tolerance=self.mesh_tolerance(),
             opt={
                 "showAxes": False,
                 "projectionDir": (0, 0, 1),
@@ -245,6 +245,8 @@ class CQShape(Shape):
         return self
 
     def _smoothing_segments(self, dim: float) -> int:
+        if self.api.chord_tol is not None:
+            return self.api.smoothing_segments(dim)
         # Since CadQuery isusing Spline to connect pts for curves so use less segments
         return math.ceil(abs(dim) ** 0.25 * self.api.fidelity.smoothing_segments())
 
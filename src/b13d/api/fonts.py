@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""
+    Index of font names to font files, built on first use and saved on disk
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from b13d.api.constants import DEFAULT_CACHE_DIR, DEFAULT_FONT_DIR
+from b13d.api.utils import fontDirectories, listFonts, make_or_exist_path
+
+FONT_INDEX_VERSION = 1
+FONT_INDEX_FILE = 'font_index.json'
+
+def directory_mtimes(directory: str) -> dict[str, float]:
+    """ Modification times of a directory and of its subdirectories """
+    return {root: os.stat(root).st_mtime for root, _, _ in os.walk(directory)}
+
+class FontIndex:
+    """
+    Map of font names to font files, built on the first lookup.
+    The fonts of each directory are saved in an index file, and read again
+    only when the directory or one of its subdirectories is modified.
+    Fonts of the explicit font directory take precedence over system fonts.
+    """
+
+    def __init__(self, index_dir: str = DEFAULT_CACHE_DIR, font_dir: str = DEFAULT_FONT_DIR):
+        self.index_dir = index_dir
+        self.font_dir = font_dir
+        self._font2path = None
+
+    def path(self) -> str:
+        """ Return the index file name """
+        return os.path.join(self.index_dir, FONT_INDEX_FILE)
+
+    def directories(self) -> list[str]:
+        """ Return the existing font directories, in increasing precedence """
+        dirs = fontDirectories()
+        if self.font_dir is not None:
+            dirs.append(self.font_dir)
+        return [d for d in dirs if os.path.isdir(d)]
+
+    def set_font_dir(self, font_dir: str) -> None:
+        """ Search font_dir too, its fonts take precedence over the system fonts """
+        if font_dir != self.font_dir:
+            self.font_dir = font_dir
+            self._font2path = None
+
+    def font2path(self) -> dict[str, str]:
+        """ Return the map of font names to font files """
+        if self._font2path is None:
+            self._font2path = self.build()
+        return self._font2path
+
+    def build(self) -> dict[str, str]:
+        """ Build the map from the index file, reading the fonts of modified directories """
+        index = self.load()
+        modified = False
+        font2path = {}
+        for directory in self.directories():
+            mtimes = directory_mtimes(directory)
+            entry = index.get(directory)
+            if entry is None or entry['mtimes'] != mtimes:
+                entry = {'mtimes': mtimes, 'fonts': listFonts(directory)}
+                index[directory] = entry
+                modified = True
+            for name, path in entry['fonts']:
+                font2path[name] = path
+        if modified:
+            self.save(index)
+        return font2path
+
+    def load(self) -> dict:
+        """ Return the fonts and mtimes of each directory in the index file """
+        try:
+            with open(self.path()) as f:
+                data = json.load(f)
+            if data['version'] == FONT_INDEX_VERSION:
+                return data['directories']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return {}
+
+    def save(self, index: dict) -> None:
+        """ Save the index file, a read only index directory is not an error """
+        try:
+            make_or_exist_path(self.index_dir)
+            # atomic write, concurrent processes may build the index
+            fd, tmpname = tempfile.mkstemp(dir=self.index_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'version': FONT_INDEX_VERSION, 'directories': index}, f)
+            os.replace(tmpname, self.path())
+        except (OSError, AssertionError):
+            pass
+
+    def clear(self) -> None:
+        """ Build the map again on the next lookup """
+        self._font2path = None
+
+FONT_INDEX = FontIndex()
+
+def test_font_index(self):
+    """ Test FontIndex """
+    import shutil
+    from b13d.api import fonts
+
+    scanned = []
+    list_fonts = fonts.listFonts
+    def scan(directory):
+        scanned.append(directory)
+        return list_fonts(directory)
+
+    with tempfile.TemporaryDirectory() as index_dir, tempfile.TemporaryDirectory() as font_dir:
+        system_fonts = FontIndex(index_dir=index_dir, font_dir=None).font2path()
+        if len(system_fonts) == 0:
+            self.skipTest('no fonts installed')
+        name, path = sorted(system_fonts.items())[0]
+        copy = os.path.join(font_dir, 'explicit' + os.path.splitext(path)[1])
+        shutil.copy(path, copy)
+
+        fonts.listFonts = scan
+        try:
+            index = FontIndex(index_dir=index_dir, font_dir=font_dir)
+            self.assertEqual(len(scanned), 0)
+            self.assertEqual(index.font2path()[name], copy)
+            self.assertEqual(scanned, [font_dir])
+            self.assertTrue(os.path.isfile(index.path()))
+
+            # unmodified directories are read from the index file
+            scanned.clear()
+            self.assertEqual(FontIndex(index_dir=index_dir, font_dir=font_dir).font2path(), index.font2path())
+            self.assertEqual(scanned, [])
+
+            # a modified directory is read again, alone
+            os.makedirs(os.path.join(font_dir, 'more'))
+            self.assertEqual(len(FontIndex(index_dir=index_dir, font_dir=font_dir).font2path()), len(index.font2path()))
+            self.assertEqual(scanned, [font_dir])
+
+            index.set_font_dir(None)
+            self.assertEqual(index.font2path()[name], path)
+        finally:
+            fonts.listFonts = list_fonts
+
+def test_glyph_cache(self):
+    """ Test glyph contours cached across texts, and text extruded in one step """
+    from b13d.api import utils
+    from b13d.api.core import Implementation
+
+    font2path = FONT_INDEX.font2path()
+    if len(font2path) == 0:
+        self.skipTest('no fonts installed')
+    path = sorted(font2path.values())[0]
+    dim2segs = lambda dim: max(1, int(abs(dim) ** 0.5 * 4))
+
+    utils._GLYPH_CONTOURS.clear()
+    uncached = utils.textToGlyphsPaths(path, 'Pylele 2024', 12, (5, -3), dimToSegs=dim2segs)
+    self.assertEqual(len(utils._GLYPH_CONTOURS), 0)
+    cached = utils.textToGlyphsPaths(path, 'Pylele 2024', 12, (5, -3), dimToSegs=dim2segs, segsKey='test')
+    # 'e' and 'l' are flattened once
+    self.assertEqual(len(utils._GLYPH_CONTOURS), len(set('Pylele 2024')))
+    self.assertEqual(cached, utils.textToGlyphsPaths(path, 'Pylele 2024', 12, (5, -3), dimToSegs=dim2segs, segsKey='test'))
+    self.assertEqual(len(uncached), len(cached))
+    for glyph_a, glyph_b in zip(uncached, cached):
+        for contour_a, contour_b in zip(glyph_a, glyph_b):
+            self.assertEqual(len(contour_a), len(contour_b))
+            for (xa, ya), (xb, yb) in zip(contour_a, contour_b):
+                self.assertAlmostEqual(xa, xb, places=9)
+                self.assertAlmostEqual(ya, yb, places=9)
+    utils._GLYPH_CONTOURS.clear()
+
+    # one extrusion of all glyphs, as the sum of the glyph extrusions
+    api = Implementation.MANIFOLD.get_api()
+    text = api.text('Ab1', 10, 2, None)
+    glyphs = [api.text(c, 10, 2, None) for c in 'Ab1']
+    self.assertAlmostEqual(text.solid.volume(), sum(g.solid.volume() for g in glyphs), places=3)
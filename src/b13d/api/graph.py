@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+"""
+    Build Graph: declarative boolean composition of Solids,
+    with per node timings and critical path of a build
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from b13d.api.core import Shape
+
+JOIN = "join"
+CUT = "cut"
+TRANSFORM = "transform"
+
+class BuildNode:
+    """
+    A node of a build graph: a Solid, then transformed, joined with
+    or cut by other nodes in order of declaration
+    """
+
+    def __init__(self, graph: BuildGraph, solid, name: str = None):
+        self.graph = graph
+        self.solid = solid
+        self.name = solid.fileNameBase if name is None else name
+        self.ops = []           # (JOIN | CUT, BuildNode) or (TRANSFORM, (method, args))
+        self.shape: Shape = None
+        self.gen_time = 0
+        self.reduce_time = 0
+        self.finish = None      # earliest completion time, for critical path
+
+    def _transform(self, method: str, *args) -> BuildNode:
+        self.ops.append((TRANSFORM, (method, args)))
+        return self
+
+    def mv(self, x: float, y: float, z: float) -> BuildNode:
+        return self._transform("mv", x, y, z)
+
+    def rotate_x(self, ang: float) -> BuildNode:
+        return self._transform("rotate_x", ang)
+
+    def rotate_y(self, ang: float) -> BuildNode:
+        return self._transform("rotate_y", ang)
+
+    def rotate_z(self, ang: float) -> BuildNode:
+        return self._transform("rotate_z", ang)
+
+    def join(self, *joiners: BuildNode) -> BuildNode:
+        """ Join nodes, None entries are skipped """
+        self.ops += [(JOIN, n) for n in joiners if n is not None]
+        return self
+
+    def cut(self, *cutters: BuildNode) -> BuildNode:
+        """ Cut nodes, None entries are skipped """
+        self.ops += [(CUT, n) for n in cutters if n is not None]
+        return self
+
+    def deps(self) -> list:
+        return [n for op, n in self.ops if op != TRANSFORM]
+
+    def __add__(self, operand: BuildNode) -> BuildNode:
+        return self.join(operand)
+
+    def __sub__(self, operand: BuildNode) -> BuildNode:
+        return self.cut(operand)
+
+    def __lshift__(self, operand: tuple[float, float, float]) -> BuildNode:
+        return self.mv(*operand)
+
+class BuildGraph:
+    """
+    Graph of Solids where nodes are sub-solids and edges are boolean operations.
+
+    Leaves are generated first, then the graph is reduced in dependency order,
+    one boolean at a time, as the Solids it replaces would. Per node timings and
+    the critical path are available once the graph has been generated.
+    """
+
+    def __init__(self):
+        self.nodes: list[BuildNode] = []
+
+    def node(self, solid, name: str = None) -> BuildNode:
+        """ Add a Solid to the graph """
+        node = BuildNode(self, solid, name=name)
+        self.nodes.append(node)
+        return node
+
+    def _order(self) -> list:
+        """ Return all nodes in dependency order """
+        order = []
+        visiting = set()
+        def visit(node):
+            if node in order:
+                return
+            assert node not in visiting, f"Build graph cycle at {node.name}"
+            visiting.add(node)
+            for dep in node.deps():
+                visit(dep)
+            visiting.discard(node)
+            order.append(node)
+        for node in self.nodes:
+            visit(node)
+        return order
+
+    def _gen_leaves(self, order: list):
+        for node in order:
+            start_time = time.time()
+            node.solid.gen_full()
+            node.gen_time = time.time() - start_time
+
+    def gen(self, root: BuildNode) -> Shape:
+        """ Generate all nodes, reduce them in dependency order and return the shape of root.
+            The Solid of each node is updated with the reduced shape of the node """
+        order = self._order()
+        self._gen_leaves(order)
+
+        # number of consumers of each node, shared nodes are duplicated when consumed
+        consumers = {node: 0 for node in order}
+        for node in order:
+            for dep in node.deps():
+                consumers[dep] += 1
+
+        for node in order:
+            start_time = time.time()
+            shape = node.solid.shape
+            # booleans are not batched in n-ary ones: the Solids replaced by the graph
+            # are touching, and a different evaluation order pinches their union
+            for op, arg in node.ops:
+                if op == TRANSFORM:
+                    method, args = arg
+                    shape = getattr(shape, method)(*args)
+                    continue
+                consumers[arg] -= 1
+                operand = arg.shape if consumers[arg] == 0 else arg.shape.dup()
+                shape = shape.join(operand) if op == JOIN else shape.cut(operand)
+
+            node.shape = shape
+            node.solid.shape = shape
+            node.reduce_time = time.time() - start_time
+            node.finish = node.gen_time + node.reduce_time
+            if len(node.deps()) > 0:
+                # as if leaves were generated concurrently, reductions wait for all their dependencies
+                node.finish = max(node.gen_time, max(d.finish for d in node.deps())) + node.reduce_time
+
+        return root.shape
+
+    def critical_path(self, root: BuildNode) -> list:
+        """ Return the chain of nodes that would determine the build time of root
+            if independent nodes were generated concurrently """
+        path = [root]
+        node = root
+        while len(node.deps()) > 0:
+            dep = max(node.deps(), key=lambda d: d.finish)
+            if dep.finish <= node.gen_time:
+                break
+            path.insert(0, dep)
+            node = dep
+        return path
+
+    def report(self, root: BuildNode) -> dict:
+        """ Return per node timings and the critical path to root of the last generation """
+        return {
+            "nodes": [
+                {
+                    "name": node.name,
+                    "gen_time": node.gen_time,
+                    "reduce_time": node.reduce_time,
+                    "finish": node.finish,
+                }
+                for node in self._order()
+            ],
+            "critical_path": [node.name for node in self.critical_path(root)],
+        }
+
+    def print_report(self, root: BuildNode):
+        """ Print per node timings and critical path of the last generation """
+        rpt = self.report(root)
+        print(f"# Build graph {root.name}")
+        for n in rpt["nodes"]:
+            print(f"#   {n['name']:32s} gen {n['gen_time']:7.3f}s reduce {n['reduce_time']:7.3f}s")
+        print("# Critical path: " + " -> ".join(rpt["critical_path"]))
+
+def test_build_graph(self):
+    """ Test dependency order, sharing of nodes and report of a build graph """
+    from unittest import mock
+    from b13d.api.mf import MFShape
+    from b13d.parts.tube import Tube
+
+    def tube(*args):
+        return Tube(args=['-i', 'mf', '-nc', '-odoff', *args])
+
+    graph = BuildGraph()
+    pin = graph.node(tube('-out', '8', '-H', '40', '-d', 'Y'), name='pin')
+    a = graph.node(tube('-out', '20', '-H', '10'), name='a').cut(pin)
+    b = graph.node(tube('-out', '20', '-H', '10'), name='b').mv(0, 12, 0).cut(pin)
+    root = a + b
+    self.assertIs(root, a)
+
+    order = graph._order()
+    self.assertEqual(len(order), 3)
+    self.assertLess(order.index(pin), order.index(b))
+    self.assertLess(order.index(b), order.index(a))
+
+    for node in order:
+        node.solid.gen_full()
+    pin_volume = pin.solid.shape.solid.volume()
+
+    # pin is cut from a and b, only its first consumer gets a copy
+    with mock.patch.object(MFShape, 'dup', autospec=True, side_effect=MFShape.dup) as dup:
+        shape = graph.gen(root)
+        self.assertEqual(dup.call_count, 1)
+    self.assertIs(shape, a.solid.shape)
+    self.assertAlmostEqual(pin.shape.solid.volume(), pin_volume, places=3)
+
+    # same as the Solids reduced one boolean at a time
+    p = tube('-out', '8', '-H', '40', '-d', 'Y')
+    expected = tube('-out', '20', '-H', '10') - p
+    expected += tube('-out', '20', '-H', '10').mv(0, 12, 0) - p
+    self.assertAlmostEqual(shape.solid.volume(), expected.gen_full().solid.volume(), places=3)
+
+    rpt = graph.report(root)
+    self.assertEqual([n["name"] for n in rpt["nodes"]], ["pin", "b", "a"])
+    for n in rpt["nodes"]:
+        self.assertGreaterEqual(n["finish"], n["reduce_time"])
+    self.assertEqual(rpt["critical_path"][-1], "a")
+    self.assertEqual(rpt["critical_path"], [n.name for n in graph.critical_path(root)])
+    graph.print_report(root)
@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+
+"""
+    Lazy CSG: Shape operations recorded as an expression DAG,
+    optimized and evaluated by the wrapped implementation when a result is needed
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import os
+import sys
+from enum import Enum
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from b13d.api.bbox import bbox_bounds, disjoint
+from b13d.api.core import Shape, ShapeAPI, Direction
+from b13d.api.matrix import transform_matrix
+from b13d.api.trace import TRACER
+
+LEAF = "leaf"
+CONST = "const"
+TRANSFORM = "transform"
+UNION = "union"
+DIFFERENCE = "difference"
+INTERSECTION = "intersection"
+APPLY = "apply"
+
+# python recursion limit while evaluating deep expressions
+EVAL_RECURSION_LIMIT = 10000
+
+def freeze(value):
+    """ Hashable representation of a leaf or apply argument """
+    if isinstance(value, LazyShape):
+        return value.node.key()
+    if isinstance(value, Enum):
+        return (type(value).__name__, value.value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, np.ndarray):
+        return (value.shape, value.tobytes())
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("id", id(value))
+
+def apply_transforms(shape: Shape, ops: tuple) -> Shape:
+    """ Apply a chain of transforms, as a single matrix if the implementation supports it """
+    if len(ops) > 1 and hasattr(shape, "transform"):
+        return shape.transform(transform_matrix(ops))
+    for method, args in ops:
+        shape = getattr(shape, method)(*args)
+    return shape
+
+def transform_bounds(bounds: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """ Bounds of a transformed box """
+    corners = np.array([[x, y, z, 1] for x in bounds[0] for y in bounds[1] for z in bounds[2]])
+    pts = (matrix @ corners.T).T[:, :3]
+    return np.stack([pts.min(axis=0), pts.max(axis=0)], axis=1)
+
+_UNKNOWN = object()
+
+class LazyNode:
+    """
+    Node of a lazy CSG expression DAG.
+
+    The geometry of a node never changes: the optimizer may rewrite its
+    children in place only into an equivalent expression. Persistent nodes
+    are referenced by more than one shape and keep their evaluated value.
+    """
+
+    __slots__ = ["op", "children", "args", "value", "persist", "optimized", "_key", "_bounds"]
+
+    def __init__(self, op: str, children: tuple = (), args: tuple = (), value: Shape = None):
+        self.op = op
+        self.children = tuple(children)
+        self.args = args
+        self.value = value
+        self.persist = False
+        self.optimized = False
+        self._key = None
+        self._bounds = _UNKNOWN
+
+    def key(self) -> tuple:
+        """ Structural key, nodes with equal keys have the same geometry """
+        if self._key is None:
+            if self.op == CONST:
+                self._key = (CONST, id(self))
+            elif self.op == LEAF:
+                self._key = (LEAF, freeze(self.args))
+            else:
+                self._key = (self.op, freeze(self.args)) + tuple(c.key() for c in self.children)
+        return self._key
+
+class LazyEvaluator:
+    """
+    Optimizes and evaluates lazy CSG expressions with a ShapeAPI.
+
+    The optimizer flattens nested unions, differences and intersections
+    into n-ary operations, folds chains of transforms into one matrix, and
+    drops cutters whose bounding box misses the shape they cut.
+    Identical subtrees are evaluated once: the last consumer takes the
+    result, previous consumers modifying it get a duplicate.
+    """
+
+    def __init__(self, api: ShapeAPI, stats: dict = None):
+        self.api = api
+        self.stats = {} if stats is None else stats
+        self.values = {}     # key -> value of non persistent nodes
+        self.remaining = {}  # key -> consumers left in this evaluation
+        self.borrowed = set()
+        self.visited = set()
+
+    def count_stat(self, name: str, n: int = 1):
+        self.stats[name] = self.stats.get(name, 0) + n
+
+    def bounds(self, node: LazyNode) -> np.ndarray:
+        """ Conservative bounds of a node, None if unknown """
+        if node._bounds is not _UNKNOWN:
+            return node._bounds
+        bounds = None
+        if node.value is not None:
+            bounds = bbox_bounds(node.value.bbox())
+        elif node.op == LEAF:
+            bounds = bbox_bounds(self.value(node).bbox())
+        elif node.op == TRANSFORM:
+            child = self.bounds(node.children[0])
+            if child is not None:
+                bounds = transform_bounds(child, transform_matrix(node.args))
+        elif node.op == UNION:
+            children = [self.bounds(c) for c in node.children]
+            if all(c is not None for c in children):
+                bounds = np.stack([
+                    np.min([c[:, 0] for c in children], axis=0),
+                    np.max([c[:, 1] for c in children], axis=0),
+                ], axis=1)
+        elif node.op == DIFFERENCE:
+            bounds = self.bounds(node.children[0])
+        elif node.op == INTERSECTION:
+            children = [b for b in (self.bounds(c) for c in node.children) if b is not None]
+            if len(children) > 0:
+                bounds = np.stack([
+                    np.max([c[:, 0] for c in children], axis=0),
+                    np.min([c[:, 1] for c in children], axis=0),
+                ], axis=1)
+        node._bounds = bounds
+        return bounds
+
+    def _flattenable(self, node: LazyNode, op: str) -> bool:
+        return node.op == op and node.value is None and not node.persist
+
+    def optimize(self, node: LazyNode):
+        """ Rewrite a DAG in place into an equivalent, cheaper expression """
+        if node.optimized or node.value is not None:
+            return
+        node.optimized = True
+        for c in node.children:
+            self.optimize(c)
+
+        if node.op == TRANSFORM:
+            child = node.children[0]
+            if self._flattenable(child, TRANSFORM):
+                node.children = child.children
+                node.args = child.args + node.args
+                self.count_stat("folded_transforms")
+
+        elif node.op in [UNION, INTERSECTION]:
+            children = []
+            for c in node.children:
+                if self._flattenable(c, node.op):
+                    children += c.children
+                    self.count_stat("flattened")
+                else:
+                    children.append(c)
+            node.children = tuple(children)
+
+        elif node.op == DIFFERENCE:
+            base, cutters = node.children[0], list(node.children[1:])
+            if self._flattenable(base, DIFFERENCE):
+                cutters = list(base.children[1:]) + cutters
+                base = base.children[0]
+                self.count_stat("flattened")
+            # cutting a union is cutting each of its shapes
+            flat = []
+            for c in cutters:
+                if self._flattenable(c, UNION):
+                    flat += c.children
+                    self.count_stat("flattened")
+                else:
+                    flat.append(c)
+            base_bounds = self.bounds(base)
+            kept = [c for c in flat if not disjoint(base_bounds, self.bounds(c))]
+            self.count_stat("dropped_cuts", len(flat) - len(kept))
+            node.children = (base, *kept)
+
+    def count(self, node: LazyNode):
+        """ Count the consumers of each subtree """
+        if node.persist:
+            if node.value is None and id(node) not in self.visited:
+                self.visited.add(id(node))
+                for c in node.children:
+                    self.count(c)
+            return
+        k = node.key()
+        self.remaining[k] = self.remaining.get(k, 0) + 1
+        if self.remaining[k] == 1:
+            for c in node.children:
+                self.count(c)
+        elif self.remaining[k] == 2:
+            self.count_stat("shared")
+
+    def value(self, node: LazyNode) -> Shape:
+        """ Evaluate a node, without consuming it """
+        if node.value is not None:
+            return node.value
+        assert node.op != CONST, "Lazy shape consumed twice"
+        k = node.key()
+        if not node.persist and k in self.values:
+            return self.values[k]
+        value = self.compute(node)
+        if node.persist:
+            node.value = value
+        else:
+            self.values[k] = value
+        return value
+
+    def take(self, node: LazyNode, mutable: bool) -> Shape:
+        """ Consume the value of a node, duplicated if it is still needed and will be modified """
+        value = self.value(node)
+        if node.persist:
+            return value.dup() if mutable else value
+        k = node.key()
+        self.remaining[k] -= 1
+        if self.remaining[k] > 0 or (mutable and k in self.borrowed):
+            if not mutable:
+                self.borrowed.add(k)
+                return value
+            return value.dup()
+        # last consumer takes the value
+        self.values.pop(k, None)
+        node.value = None
+        return value
+
+    def compute(self, node: LazyNode) -> Shape:
+        self.count_stat("nodes")
+        if node.op == LEAF:
+            method, args, kwargs = node.args
+            return getattr(self.api, method)(*args, **kwargs)
+        if node.op == TRANSFORM:
+            return apply_transforms(self.take(node.children[0], True), node.args)
+        if node.op == UNION:
+            shapes = [self.take(node.children[0], True)]
+            shapes += [self.take(c, False) for c in node.children[1:]]
+            return self.api.union_all(shapes)
+        if node.op == DIFFERENCE:
+            base = self.take(node.children[0], True)
+            cutters = [self.take(c, False) for c in node.children[1:]]
+            if len(cutters) == 0:
+                return base
+            return self.api.difference_all(base, cutters)
+        if node.op == INTERSECTION:
+            shape = self.take(node.children[0], True)
+            for c in node.children[1:]:
+                shape = shape.intersection(self.take(c, False))
+            return shape
+        if node.op == APPLY:
+            method, args, kwargs = node.args
+            shape = self.take(node.children[0], True)
+            operands = [self.take(c, False) for c in node.children[1:]]
+            return getattr(shape, method)(*operands, *args, **kwargs)
+        raise ValueError(f"Unknown lazy node {node.op}")
+
+    def evaluate(self, node: LazyNode) -> Shape:
+        """ Optimize and evaluate a DAG, return its value.
+            The value is owned by the caller unless the node is persistent """
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, EVAL_RECURSION_LIMIT))
+        try:
+            with TRACER.span("LazyEvaluator.evaluate", "lazy") as span_args:
+                self.optimize(node)
+                self.count(node)
+                if node.persist:
+                    value = self.value(node)
+                else:
+                    value = self.take(node, True)
+                self.count_stat("evaluations")
+                span_args.update(self.stats)
+        finally:
+            sys.setrecursionlimit(limit)
+            self.values.clear()
+        return value
+
+class LazyShape(Shape):
+    """
+    Shape recording operations in a lazy CSG expression.
+
+    Like the shapes of the implementations, booleans and transforms modify
+    the shape and return it, while dup and mirror return a new shape.
+    The expression is evaluated when the geometry is needed: bbox, export,
+    or access to implementation specific attributes.
+    """
+
+    bbox_cache = False  # bbox of the evaluated shape is cached by the implementation
+
+    def __init__(self, api: LazyShapeAPI, node: LazyNode, color: tuple[int, int, int] = None):
+        self.api: LazyShapeAPI = api
+        self.node: LazyNode = node
+        self.color = color
+
+    def _derive(self, node: LazyNode) -> LazyShape:
+        derived = LazyShape(self.api, node, color=self.color)
+        derived.name = self.name
+        return derived
+
+    def _force(self) -> Shape:
+        """ Evaluate and return the shape of the implementation, not to be modified """
+        node = self.node
+        if node.value is None:
+            value = self.api.evaluate(node)
+            if not node.persist:
+                node = self.node = LazyNode(CONST, value=value)
+        value = node.value
+        if self.color is not None and value.color != self.color:
+            value.set_color(self.color)
+        if self.name is not None:
+            value.name = self.name
+        return value
+
+    def _own(self) -> Shape:
+        """ Evaluate and return the shape of the implementation, owned by this shape """
+        value = self._force()
+        if self.node.persist:
+            self.node = LazyNode(CONST, value=value.dup())
+        return self.node.value
+
+    def _combine(self, op: str, operands: list) -> LazyShape:
+        nodes = [self.api.share(o) for o in operands if o is not None]
+        if len(nodes) == 0:
+            return self
+        node = self.node
+        if node.op == op and node.value is None and not node.persist:
+            self.node = LazyNode(op, node.children + tuple(nodes))
+            self.api.count_stat("flattened")
+        else:
+            self.node = LazyNode(op, (node, *nodes))
+        return self
+
+    def _transform(self, method: str, *args) -> LazyShape:
+        node = self.node
+        op = (method, args)
+        if node.op == TRANSFORM and node.value is None and not node.persist:
+            self.node = LazyNode(TRANSFORM, node.children, node.args + (op,))
+            self.api.count_stat("folded_transforms")
+        else:
+            self.node = LazyNode(TRANSFORM, (node,), (op,))
+        return self
+
+    def _apply(self, method: str, *args, operands: list = (), **kwargs) -> LazyShape:
+        nodes = [self.api.share(o) for o in operands]
+        self.node = LazyNode(APPLY, (self.node, *nodes), (method, copy.deepcopy(args), kwargs))
+        return self
+
+    @property
+    def solid(self):
+        return self._force().solid
+
+    @solid.setter
+    def solid(self, solid):
+        self._own().solid = solid
+
+    def __getattr__(self, name: str):
+        # implementation specific attributes of the evaluated shape
+        if name.startswith("__") or name == "node":
+            raise AttributeError(name)
+        attr = getattr(self._own(), name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def method(*args, **kwargs):
+            result = attr(*self.api.concrete(args), **self.api.concrete(kwargs))
+            if result is self.node.value:
+                return self
+            return self.api.lazy(result)
+        return method
+
+    def cut(self, cutter: Shape) -> LazyShape:
+        return self._combine(DIFFERENCE, [cutter])
+
+    def dup(self) -> LazyShape:
+        self.node.persist = True
+        return self._derive(self.node)
+
+    def fillet(
+        self,
+        nearestPts: list[tuple[float, float, float]],
+        rad: float,
+    ) -> LazyShape:
+        return self._apply("fillet", nearestPts, rad)
+
+    def join(self, joiner: Shape) -> LazyShape:
+        return self._combine(UNION, [joiner])
+
+    def intersection(self, intersector: Shape) -> LazyShape:
+        return self._combine(INTERSECTION, [intersector])
+
+    def mirror(self, normal: tuple[float, float, float] = (0, 1, 0)) -> LazyShape:
+        self.node.persist = True
+        return self._derive(LazyNode(TRANSFORM, (self.node,), (("mirror", (tuple(normal),)),)))
+
+    def mv(self, x: float, y: float, z: float) -> LazyShape:
+        if x == 0 and y == 0 and z == 0:
+            return self
+        return self._transform("mv", x, y, z)
+
+    def rotate_x(self, ang: float) -> LazyShape:
+        if ang == 0:
+            return self
+        return self._transform("rotate_x", ang)
+
+    def rotate_y(self, ang: float) -> LazyShape:
+        if ang == 0:
+            return self
+        return self._transform("rotate_y", ang)
+
+    def rotate_z(self, ang: float) -> LazyShape:
+        if ang == 0:
+            return self
+        return self._transform("rotate_z", ang)
+
+    def rotate(self, ang: float | tuple[float, float, float], direction: Direction = Direction.Z) -> LazyShape:
+        if isinstance(ang, (int, float)):
+            return Shape.rotate(self, ang, direction)
+        return self._transform("rotate", tuple(ang), direction)
+
+    def scale(self, x: float, y: float, z: float) -> LazyShape:
+        if x == 1 and y == 1 and z == 1:
+            return self
+        return self._transform("scale", x, y, z)
+
+    def transform(self, matrix) -> LazyShape:
+        return self._apply("transform", np.asarray(matrix))
+
+    def set_color(self, rgb: tuple[int, int, int] = None) -> LazyShape:
+        if rgb is not None:
+            self.color = rgb
+        return self
+
+    def show(self):
+        self._force().show()
+
+    def bbox(self) -> tuple[float, float, float, float, float, float]:
+        return self._force().bbox()
+
+    def has_solid(self) -> bool:
+        return self._force().has_solid()
+
+    def hull(self) -> LazyShape:
+        return self._apply("hull")
+
+    def linear_extrude(self, height=None, center=False, twist=0, scale=1.0, slices=None) -> LazyShape:
+        return self._apply("linear_extrude", height, center, twist, scale, slices)
+
+    def rotate_extrude(self, angle=360, convexity=1) -> LazyShape:
+        return self._apply("rotate_extrude", angle, convexity)
+
+    def offset(self, r=None, chamfer=False) -> LazyShape:
+        return self._apply("offset", r, chamfer)
+
+    def projection(self, cut=False) -> LazyShape:
+        return self._apply("projection", cut)
+
+    def minkowski(self, other: Shape = None) -> LazyShape:
+        if other is None:
+            return self
+        return self._apply("minkowski", operands=[other])
+
+def _leaf(method: str):
+    """ ShapeAPI constructor recorded as a leaf of the expression """
+    def constructor(self, *args, **kwargs) -> LazyShape:
+        node = LazyNode(LEAF, args=(method, copy.deepcopy(args), copy.deepcopy(kwargs)))
+        return LazyShape(self, node)
+    constructor.__name__ = method
+    constructor.__qualname__ = f"LazyShapeAPI.{method}"
+    return constructor
+
+class LazyShapeAPI(ShapeAPI):
+    """
+    Lazy wrapper of the ShapeAPI of an implementation.
+
+    Shapes record their operations in an expression DAG, optimized and
+    evaluated with the wrapped implementation on export, bbox, or access to
+    the implementation shape. Solids work unchanged on top of it.
+    """
+
+    def __init__(self, api: ShapeAPI):
+        super().__init__(api.implementation, api.fidelity, api.chord_tol)
+        self.api = api
+        self.stats = {}
+
+    def __getattr__(self, name: str):
+        # implementation specific attributes
+        if name.startswith("__") or name == "api":
+            raise AttributeError(name)
+        attr = getattr(self.api, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def delegate(*args, **kwargs):
+            return self.lazy(attr(*self.concrete(args), **self.concrete(kwargs)))
+        return delegate
+
+    def count_stat(self, name: str, n: int = 1):
+        self.stats[name] = self.stats.get(name, 0) + n
+
+    def evaluate(self, node: LazyNode) -> Shape:
+        """ Optimize and evaluate an expression with the wrapped implementation """
+        return LazyEvaluator(self.api, self.stats).evaluate(node)
+
+    def lazy(self, value):
+        """ Wrap a shape of the implementation, other values are returned unchanged """
+        if isinstance(value, Shape) and not isinstance(value, LazyShape):
+            shape = LazyShape(self, LazyNode(CONST, value=value), color=value.color)
+            shape.name = value.name
+            return shape
+        return value
+
+    def share(self, shape: Shape) -> LazyNode:
+        """ Node of a shape used as operand, its value is kept once evaluated """
+        if not isinstance(shape, LazyShape):
+            shape = self.lazy(shape)
+        shape.node.persist = True
+        return shape.node
+
+    def concrete(self, value):
+        """ Replace lazy shapes by their evaluated implementation shapes """
+        if isinstance(value, LazyShape):
+            return value._force()
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.concrete(v) for v in value)
+        if isinstance(value, dict):
+            return {k: self.concrete(v) for k, v in value.items()}
+        return value
+
+    def export(self, shape: Shape, path: Union[str, Path], fmt: str = ".stl") -> None:
+        return self.api.export(self.concrete(shape), path, fmt)
+
+    def export_stl(self, shape: Shape, path: Union[str, Path]) -> None:
+        return self.api.export_stl(self.concrete(shape), path)
+
+    def export_best(self, shape: Shape, path: Union[str, Path]) -> None:
+        return self.api.export_best(self.concrete(shape), path)
+
+    def export_best_multishapes(
+        self,
+        shapes: list[Shape],
+        assembly_name: str,
+        path: Union[str, Path],
+    ) -> None:
+        return self.api.export_best_multishapes(self.concrete(shapes), assembly_name, path)
+
+    def union_all(self, shapes: list[Shape]) -> Shape:
+        shapes = [s for s in shapes if s is not None]
+        if len(shapes) == 0:
+            return None
+        first = self.lazy(shapes[0])
+        return first._combine(UNION, shapes[1:])
+
+    def difference_all(self, base: Shape, cutters: list[Shape]) -> Shape:
+        return self.lazy(base)._combine(DIFFERENCE, cutters)
+
+    def mesh_arrays(self, shape: Shape):
+        return self.api.mesh_arrays(self.concrete(shape))
+
+    def mesh_from_arrays(self, vertices, faces) -> Shape:
+        return self.lazy(self.api.mesh_from_arrays(vertices, faces))
+
+    def triangle_count(self, shape: Shape) -> int:
+        # never evaluates, so that tracing does not change when shapes are evaluated
+        if isinstance(shape, LazyShape):
+            if shape.node.value is None:
+                return None
+            shape = shape.node.value
+        return self.api.triangle_count(shape)
+
+    def supports_mesh_arrays(self) -> bool:
+        return self.api.supports_mesh_arrays()
+
+    def tolerance(self):
+        return self.api.tolerance()
+
+    def smoothing_segments(self, dim: float) -> int:
+        return self.api.smoothing_segments(dim)
+
+    def chord_tolerance(self) -> float:
+        return self.api.chord_tolerance()
+
+    def mesh_tolerance(self) -> float:
+        return self.api.mesh_tolerance()
+
+    def segments_key(self) -> tuple:
+        return self.api.segments_key()
+
+    def revolve_segments(self, rad: float, deg: float = 360) -> int:
+        return self.api.revolve_segments(rad, deg)
+
+    def spline_polygon(self, start, path):
+        return self.api.spline_polygon(start, path)
+
+    def getFontPath(self, fontName: str) -> str:
+        return self.api.getFontPath(fontName)
+
+    sphere = _leaf("sphere")
+    box = _leaf("box")
+    cube = _leaf("cube")
+    cone_x = _leaf("cone_x")
+    cone_y = _leaf("cone_y")
+    cone_z = _leaf("cone_z")
+    cone = _leaf("cone")
+    regpoly_extrusion_x = _leaf("regpoly_extrusion_x")
+    regpoly_extrusion_y = _leaf("regpoly_extrusion_y")
+    regpoly_extrusion_z = _leaf("regpoly_extrusion_z")
+    cylinder = _leaf("cylinder")
+    cylinder_x = _leaf("cylinder_x")
+    cylinder_y = _leaf("cylinder_y")
+    cylinder_z = _leaf("cylinder_z")
+    rounded_edge_mask = _leaf("rounded_edge_mask")
+    cylinder_rounded_x = _leaf("cylinder_rounded_x")
+    cylinder_rounded_y = _leaf("cylinder_rounded_y")
+    cylinder_rounded_z = _leaf("cylinder_rounded_z")
+    polygon_extrusion = _leaf("polygon_extrusion")
+    spline_extrusion = _leaf("spline_extrusion")
+    spline_revolve = _leaf("spline_revolve")
+    regpoly_sweep = _leaf("regpoly_sweep")
+    text = _leaf("text")
+    polyhedron = _leaf("polyhedron")
+    rectangle = _leaf("rectangle")
+    circle = _leaf("circle")
+    polygon = _leaf("polygon")
+    genImport = _leaf("genImport")
+    sphere_quadrant = _leaf("sphere_quadrant")
+    cylinder_half = _leaf("cylinder_half")
+
+def test_lazy(self):
+    """ Test Lazy CSG evaluation against eager evaluation """
+    from b13d.api.core import Implementation
+
+    def build(api):
+        base = api.box(40, 30, 20)
+        base <<= (5, 0, 0)
+        base = base.rotate_z(90).rotate_x(90).mv(0, 0, 3)
+        holes = api.cylinder_z(30, 3).mv(5, 0, 0)
+        holes += api.cylinder_z(30, 3).mv(-5, 0, 0)
+        base -= holes
+        base -= api.cylinder_z(30, 3).mv(500, 0, 0)   # misses
+        base = base.cut(api.box(4, 4, 4).mv(0, 0, 20))
+        base = base.mirror_and_join()
+        return base.join(api.sphere(6).dup().mv(0, 0, 25))
+
+    for impl in [Implementation.MANIFOLD, Implementation.TRIMESH]:
+        api = impl.get_api()
+        eager = build(api)
+        lazy_api = LazyShapeAPI(api)
+        lazy = build(lazy_api)
+        self.assertIsNone(lazy.node.value)
+        self.assertIsNone(lazy_api.triangle_count(lazy))
+        for a, b in zip(eager.bbox(), lazy.bbox()):
+            self.assertAlmostEqual(a, b, places=3)
+        vertices, faces = lazy_api.mesh_arrays(lazy)
+        self.assertGreater(len(faces), 0)
+        self.assertEqual(lazy_api.stats["dropped_cuts"], 1)
+        self.assertGreaterEqual(lazy_api.stats["folded_transforms"], 1)
+        self.assertEqual(lazy_api.stats["evaluations"], 1)
+
+    # identical subtrees are evaluated once, operands are not modified
+    api = LazyShapeAPI(Implementation.MANIFOLD.get_api())
+    rod = api.cylinder_z(10, 1)
+    joined = api.union_all([api.cylinder_z(10, 1).mv(3, 0, 0), api.cylinder_z(10, 1).mv(-3, 0, 0), rod])
+    self.assertEqual(api.stats.get("shared"), None)
+    joined.bbox()
+    self.assertEqual(api.stats["shared"], 1)
+    self.assertAlmostEqual(rod.bbox()[0], -1, places=3)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+    4x4 Affine Transformation Matrices of Shape operations
+"""
+
+from __future__ import annotations
+
+from math import cos, sin, radians
+
+import numpy as np
+
+def _cos_sin(ang: float) -> tuple[float, float]:
+    """ cos and sin of ang [deg], exact for multiples of 90 """
+    if ang % 90 == 0:
+        return [(1, 0), (0, 1), (-1, 0), (0, -1)][int(ang // 90) % 4]
+    return cos(radians(ang)), sin(radians(ang))
+
+def translation_matrix(x: float, y: float, z: float) -> np.ndarray:
+    m = np.eye(4)
+    m[:3, 3] = (x, y, z)
+    return m
+
+def scale_matrix(x: float, y: float, z: float) -> np.ndarray:
+    return np.diag([x, y, z, 1.0])
+
+def rotation_matrix(axis: int, ang: float) -> np.ndarray:
+    """ Right handed rotation of ang [deg] around axis 0, 1 or 2 """
+    c, s = _cos_sin(ang)
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    m = np.eye(4)
+    m[i, i] = c
+    m[i, j] = -s
+    m[j, i] = s
+    m[j, j] = c
+    return m
+
+def euler_matrix(ang: tuple[float, float, float]) -> np.ndarray:
+    """ Rotation around x, then y, then z [deg] """
+    return rotation_matrix(2, ang[2]) @ rotation_matrix(1, ang[1]) @ rotation_matrix(0, ang[0])
+
+def mirror_matrix(normal: tuple[float, float, float]) -> np.ndarray:
+    """ Reflection on the plane through the origin with normal """
+    n = np.array(normal, dtype=float)
+    n /= np.linalg.norm(n)
+    m = np.eye(4)
+    m[:3, :3] -= 2 * np.outer(n, n)
+    return m
+
+def op_matrix(method: str, args: tuple) -> np.ndarray:
+    """ Matrix of a Shape transform method called with args """
+    if method == "mv":
+        return translation_matrix(*args)
+    if method == "scale":
+        return scale_matrix(*args)
+    if method in ["rotate_x", "rotate_y", "rotate_z"]:
+        return rotation_matrix("xyz".index(method[-1]), args[0])
+    if method == "rotate":
+        return euler_matrix(args[0])
+    if method == "mirror":
+        return mirror_matrix(args[0])
+    raise ValueError(f"Unknown transform {method}")
+
+def transform_matrix(ops: tuple) -> np.ndarray:
+    """ Matrix of a chain of (method, args) Shape transforms """
+    m = np.eye(4)
+    for method, args in ops:
+        m = op_matrix(method, args) @ m
+    return m
+
+def test_deferred_transform(self):
+    """ Test transforms accumulated and applied once """
+    from b13d.api.core import Implementation
+
+    for impl in [Implementation.MANIFOLD, Implementation.TRIMESH]:
+        api = impl.get_api()
+        shape = api.box(10, 20, 30).mv(5, 0, 0).rotate_z(90).rotate_x(30).scale(2, 1, 1).mv(0, 0, 7)
+        self.assertIsNotNone(shape._pending)
+
+        ops = (("mv", (5, 0, 0)), ("rotate_z", (90,)), ("rotate_x", (30,)), ("scale", (2, 1, 1)), ("mv", (0, 0, 7)))
+        corners = np.array([[x, y, z, 1] for x in (-5, 5) for y in (-10, 10) for z in (-15, 15)])
+        pts = (transform_matrix(ops) @ corners.T).T[:, :3]
+        expected = np.stack([pts.min(axis=0), pts.max(axis=0)], axis=1).flatten()
+
+        # bbox sees the pending transform without applying it
+        bbox = shape.bbox()
+        self.assertIsNotNone(shape._pending)
+        for a, b in zip(bbox, expected):
+            self.assertAlmostEqual(a, b, places=3)
+
+        # duplicates and booleans see the pending transform, booleans apply it
+        moved = api.box(10, 10, 10).mv(100, 0, 0)
+        self.assertAlmostEqual(moved.dup().bbox()[0], 95, places=3)
+        self.assertIsNotNone(moved._pending)
+        joined = api.box(10, 10, 10).join(moved)
+        self.assertIsNone(moved._pending)
+        self.assertAlmostEqual(joined.bbox()[1], 105, places=3)
+
+        # observing a shape between transforms does not change the result
+        def build(observe: bool):
+            shape = api.box(10, 10, 10).rotate_x(30)
+            for x, y, z in [(5, 0, 0), (-3, 4, 2), (0, -5, 3), (2, 2, -6)]:
+                shape = shape.join(api.sphere(3).mv(x, y, z))
+                if observe:
+                    shape.bbox()
+            return api.mesh_arrays(shape.rotate_z(15))
+        for observed, blind in zip(build(True), build(False)):
+            self.assertTrue(np.array_equal(observed, blind))
+
+    # cross sections transform in their plane, other transforms extrude them
+    api = Implementation.MANIFOLD.get_api()
+    matrix = transform_matrix((("rotate_z", (90,)), ("mv", (5, 0, 0))))
+    section = api.rectangle((2, 4)).transform(matrix)
+    self.assertIsNotNone(section.cross_section)
+    for a, b in zip(section.bbox(), (1, 5, 0, 2, 0, 0)):
+        self.assertAlmostEqual(a, b, places=3)
+    section = api.rectangle((2, 4)).transform(transform_matrix((("rotate_x", (90,)),)))
+    self.assertIsNone(section.cross_section)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+"""
+    Triangle mesh interchange between mesh libraries, without disk I/O
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+VERTEX_DTYPE = np.float32
+FACE_DTYPE = np.int32
+
+class MeshData:
+    """
+    Triangle mesh as contiguous (n, 3) float32 vertices and (m, 3) int32 faces.
+
+    Arrays already in this layout are shared, not copied, by the adapters
+    from and to manifold3d Mesh, trimesh.Trimesh and pyvista.PolyData.
+    Unpacks as (vertices, faces), like the mesh arrays of the implementations.
+    """
+
+    __slots__ = ["vertices", "faces"]
+
+    def __init__(self, vertices, faces):
+        self.vertices = np.ascontiguousarray(np.asarray(vertices, dtype=VERTEX_DTYPE).reshape(-1, 3))
+        self.faces = np.ascontiguousarray(np.asarray(faces, dtype=FACE_DTYPE).reshape(-1, 3))
+
+    def __iter__(self):
+        return iter((self.vertices, self.faces))
+
+    def triangle_count(self) -> int:
+        return len(self.faces)
+
+    @staticmethod
+    def from_manifold(solid) -> MeshData:
+        """ Mesh of a manifold3d Manifold """
+        mesh = solid.to_mesh()
+        return MeshData(mesh.vert_properties[:, :3], mesh.tri_verts)
+
+    def to_manifold(self):
+        """ manifold3d Manifold of the mesh """
+        from manifold3d import Manifold, Mesh
+        # manifold3d rejects the read only arrays it returns from to_mesh
+        vertices, faces = [a if a.flags.writeable else a.copy() for a in self]
+        return Manifold(Mesh(vert_properties=vertices, tri_verts=faces))
+
+    @staticmethod
+    def from_trimesh(mesh) -> MeshData:
+        """ Mesh of a trimesh.Trimesh """
+        return MeshData(mesh.vertices, mesh.faces)
+
+    def to_trimesh(self, process: bool = False):
+        """ trimesh.Trimesh of the mesh, vertices are merged only if process,
+            as needed by watertightness and volume of meshes with split points """
+        import trimesh
+        return trimesh.Trimesh(vertices=self.vertices, faces=self.faces, process=process)
+
+    @staticmethod
+    def from_polydata(mesh) -> MeshData:
+        """ Mesh of a pyvista.PolyData, triangulated if needed """
+        if not mesh.is_all_triangles:
+            mesh = mesh.triangulate()
+        return MeshData(mesh.points, mesh.faces.reshape(-1, 4)[:, 1:])
+
+    def to_polydata(self):
+        """ pyvista.PolyData of the mesh """
+        import pyvista as pv
+        cells = np.empty((len(self.faces), 4), dtype=FACE_DTYPE)
+        cells[:, 0] = 3
+        cells[:, 1:] = self.faces
+        return pv.PolyData(self.vertices, cells.ravel())
+
+def test_mesh_data(self):
+    """ Test mesh interchange between mesh libraries """
+    import pickle
+    from b13d.api.core import Implementation
+
+    mf_api = Implementation.MANIFOLD.get_api()
+    tm_api = Implementation.TRIMESH.get_api()
+
+    box = mf_api.box(10, 20, 30).cut(mf_api.cylinder_z(40, 2))
+    data = mf_api.mesh_arrays(box)
+    self.assertIsInstance(data, MeshData)
+    self.assertEqual(data.vertices.dtype, VERTEX_DTYPE)
+    self.assertEqual(data.faces.dtype, FACE_DTYPE)
+    self.assertTrue(data.vertices.flags.c_contiguous and data.faces.flags.c_contiguous)
+
+    # already converted arrays are shared
+    self.assertTrue(np.shares_memory(MeshData(*data).vertices, data.vertices))
+    vertices, faces = data
+    self.assertIs(faces, data.faces)
+
+    volume = box.solid.volume()
+    self.assertAlmostEqual(data.to_manifold().volume(), volume, places=2)
+    self.assertAlmostEqual(data.to_trimesh().volume, volume, places=2)
+    self.assertAlmostEqual(MeshData.from_trimesh(data.to_trimesh()).to_manifold().volume(), volume, places=2)
+
+    # round trip through trimesh shapes and pickling, as done by the build graph
+    tm_box = tm_api.mesh_from_arrays(*pickle.loads(pickle.dumps(data)))
+    self.assertAlmostEqual(tm_box.solid.volume, volume, places=2)
+    self.assertEqual(tm_api.mesh_arrays(tm_box).triangle_count(), data.triangle_count())
+
+    try:
+        import pyvista  # noqa: F401
+    except ImportError:
+        return
+    poly = data.to_polydata()
+    self.assertEqual(poly.n_cells, data.triangle_count())
+    self.assertAlmostEqual(MeshData.from_polydata(poly).to_manifold().volume(), volume, places=2)
+
+def test_pv_split_points(self):
+    """ Test pyvista trimesh fallbacks on meshes with a point per face corner """
+    import trimesh
+
+    box = trimesh.creation.box((10, 10, 10))
+    split = MeshData(box.vertices[box.faces].reshape(-1, 3), np.arange(3 * len(box.faces)).reshape(-1, 3))
+    self.assertFalse(split.to_trimesh().is_watertight)
+    self.assertTrue(split.to_trimesh(process=True).is_watertight)
+
+    try:
+        import pyvista  # noqa: F401
+    except ImportError:
+        self.skipTest('pyvista not installed')
+    from b13d.api.core import Implementation
+
+    api = Implementation.PYVISTA.get_api()
+    shape = api.mesh_from_arrays(*split)
+    cutter = api.box(20, 20, 20).mv(10, 0, 0)
+    cut = shape._cut_trimesh_fallback(shape.solid, cutter.solid)
+    self.assertAlmostEqual(MeshData.from_polydata(cut.solid).to_trimesh(process=True).volume, 500, places=1)
+
+    # inward faces are flipped
+    inward = api.polyhedron(split.vertices.tolist(), split.faces[:, ::-1].tolist())
+    self.assertGreater(MeshData.from_polydata(inward.solid).to_trimesh(process=True).volume, 0)
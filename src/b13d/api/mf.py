@@ -2,9 +2,9 @@
 
 from __future__ import annotations
 import copy
-from math import pi, ceil
+from math import pi
 try:
-    from manifold3d import Manifold, CrossSection, FillRule, Mesh, JoinType
+    from manifold3d import Manifold, CrossSection, FillRule, Mesh, JoinType, OpType
     MF_AVAILABLE = True
 except ImportError:
     Manifold = None
@@ -12,6 +12,7 @@ except ImportError:
     FillRule = None
     Mesh = None
     JoinType = None
+    OpType = None
     MF_AVAILABLE = False
 import numpy as np
 import os
@@ -26,7 +27,10 @@ from enum import Enum
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import ShapeAPI, Shape, run_api_test, Direction, Implementation
-from b13d.api.utils import dimXY, file_ensure_extension, lineSplineXY, textToGlyphsPaths
+from b13d.api.matrix import translation_matrix, scale_matrix, rotation_matrix, euler_matrix, mirror_matrix
+from b13d.api.mesh import MeshData
+from b13d.api.cache import PrimitiveCache
+from b13d.api.utils import dimXY, file_ensure_extension, textToGlyphsPaths
 
 def _triangulate_faces(faces: list[list[int]]) -> np.ndarray:
     triangles = []
@@ -43,8 +47,16 @@ def _triangulate_faces(faces: list[list[int]]) -> np.ndarray:
 """
 
 
+# primitive manifolds, immutable and shared by the shapes built from them
+MF_PRIMITIVES = PrimitiveCache()
+
+def mf_sphere(rad: float, segs: int) -> Manifold:
+    return MF_PRIMITIVES.get(("sphere", rad, segs), lambda: Manifold.sphere(rad, circular_segments=segs))
+
 class MFShapeAPI(ShapeAPI):
 
+    broadphase = True
+
     def export_stl(self, shape: MFShape, path: Union[str, Path]) -> None:
 
         def calculate_normals(vertices, faces):
@@ -121,6 +133,43 @@ class MFShapeAPI(ShapeAPI):
     def export(self, shape: MFShape, path: Union[str, Path],fmt=".stl") -> None:
         self.export_stl(shape=shape,path=path)
 
+    def union_all(self, shapes: list[MFShape]) -> MFShape:
+        shapes = [s for s in shapes if s is not None]
+        if len(shapes) == 0:
+            return None
+        if any(s.solid is None for s in shapes):
+            # 2D cross sections
+            return super().union_all(shapes)
+        joined = shapes[0]
+        joined.solid = Manifold.batch_boolean([s.solid for s in shapes], OpType.Add)
+        return joined
+
+    def difference_all(self, base: MFShape, cutters: list[MFShape]) -> MFShape:
+        cutters = [c for c in cutters if c is not None]
+        if base.solid is None or any(c.solid is None for c in cutters):
+            # 2D cross sections
+            return super().difference_all(base, cutters)
+        base.solid = Manifold.batch_boolean(
+            [base.solid] + [c.solid for c in cutters], OpType.Subtract
+        )
+        return base
+
+    def trim_by_plane(self, shape: MFShape, normal: tuple[float, float, float], offset: float = 0) -> MFShape:
+        if shape.solid is None:
+            # 2D cross sections
+            return super().trim_by_plane(shape, normal, offset)
+        shape.solid = shape.solid.trim_by_plane(normal, offset)
+        return shape
+
+    def split_by_plane(self, shape: MFShape, normal: tuple[float, float, float], offset: float = 0) -> tuple[MFShape, MFShape]:
+        if shape.solid is None:
+            # 2D cross sections
+            return super().split_by_plane(shape, normal, offset)
+        # manifolds are immutable, the parts share the other attributes of shape
+        above, below = copy.copy(shape), copy.copy(shape)
+        above.solid, below.solid = shape.solid.split_by_plane(normal, offset)
+        return above, below
+
     def sphere(self, r: float) -> MFShape:
         return MFBall(r, self)
 
@@ -229,14 +278,45 @@ class MFShapeAPI(ShapeAPI):
     def genImport(self, infile: str, extrude: float = None) -> MFShape:
         return MFImport(infile, extrude=extrude, api=self)
 
+    def mesh_arrays(self, shape: MFShape):
+        if shape.solid is None:
+            return None
+        return MeshData.from_manifold(shape.solid)
+
+    def triangle_count(self, shape: MFShape) -> int:
+        # counted without applying the pending transform, which does not change it
+        if not shape.has_solid():
+            return None
+        return shape._solid.num_tri()
+
+    def empty_solid(self) -> Manifold:
+        return Manifold()
+
+    def mesh_from_arrays(self, vertices, faces) -> MFShape:
+        return MFShape(self, solid=MeshData(vertices, faces).to_manifold())
+
 class MFShape(Shape):
 
+    broadphase = True
+
     def __init__(self, api: MFShapeAPI, solid: Manifold = None,
                  color: tuple[int, int, int] = None,
                  cross_section: CrossSection = None):
         super().__init__(api, solid=solid, color=color)
         self.cross_section: CrossSection = cross_section
 
+    @property
+    def solid(self) -> Manifold:
+        return Shape.solid.fget(self)
+
+    @solid.setter
+    def solid(self, solid: Manifold):
+        # evaluate the lazy CSG tree of manifold3d now: it reorders chains of unions
+        # when evaluated, so evaluating it later, e.g. on a bounding box, changes the result
+        if solid is not None:
+            solid.num_tri()
+        Shape.solid.fset(self, solid)
+
     def getAPI(self) -> MFShapeAPI:
         return self.api
 
@@ -244,7 +324,7 @@ class MFShape(Shape):
         return self.solid
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.smoothing_segments(dim)
 
     def _ensure3d(self) -> MFShape:
         """If cross_section is set but solid is None, convert to 3D via dummy extrude."""
@@ -267,16 +347,8 @@ class MFShape(Shape):
         return self
 
     def dup(self) -> MFShape:
-        duplicate = copy.copy(self)
-        if duplicate.cross_section is not None:
-            duplicate.cross_section = CrossSection(
-                duplicate.cross_section.decompose(), FillRule.EvenOdd
-            )
-        elif duplicate.solid is not None:
-            duplicate.solid = Manifold.compose(
-                self.solid.decompose()
-            )
-        return duplicate
+        # manifolds and cross sections are immutable, and so is the pending transform
+        return copy.copy(self)
 
     def join(self, joiner: MFShape) -> MFShape:
         if self.cross_section is not None and joiner is not None and joiner.cross_section is not None:
@@ -302,8 +374,8 @@ class MFShape(Shape):
         dup = copy.copy(self)
         if self.cross_section is not None:
             dup.cross_section = self.cross_section.mirror((1, 0))
-        elif self.solid is not None:
-            dup.solid = self.solid.mirror(normal)
+        elif self._solid is not None:
+            dup.defer_transform(mirror_matrix(normal))
         return dup
 
     def mv(self, x: float, y: float, z: float) -> MFShape:
@@ -311,29 +383,29 @@ class MFShape(Shape):
             return self
         if self.cross_section is not None:
             self.cross_section = self.cross_section.translate((x, y))
-        elif self.solid is not None:
-            self.solid = self.solid.translate((x, y, z))
+        elif self._solid is not None:
+            self.defer_transform(translation_matrix(x, y, z))
         return self
 
     def rotate_x(self, ang: float) -> MFShape:
         if self.cross_section is not None:
             self._ensure3d()
-        if self.solid is not None:
-            self.solid = self.solid.rotate((ang, 0, 0))
+        if self._solid is not None:
+            self.defer_transform(rotation_matrix(0, ang))
         return self
 
     def rotate_y(self, ang: float) -> MFShape:
         if self.cross_section is not None:
             self._ensure3d()
-        if self.solid is not None:
-            self.solid = self.solid.rotate((0, ang, 0))
+        if self._solid is not None:
+            self.defer_transform(rotation_matrix(1, ang))
         return self
 
     def rotate_z(self, ang: float) -> MFShape:
         if self.cross_section is not None:
             self.cross_section = self.cross_section.rotate(ang)
-        elif self.solid is not None:
-            self.solid = self.solid.rotate((0, 0, ang))
+        elif self._solid is not None:
+            self.defer_transform(rotation_matrix(2, ang))
         return self
     
     def rotate(self, ang: float | int | tuple[float,float,float], direction: Direction = Direction.Z) -> MFShape:
@@ -341,8 +413,8 @@ class MFShape(Shape):
             return Shape.rotate(self, ang, direction)
         if self.cross_section is not None:
             self._ensure3d()
-        if self.solid is not None:
-            self.solid = self.solid.rotate((ang[0], ang[1], ang[2]))
+        if self._solid is not None:
+            self.defer_transform(euler_matrix(ang))
         return self
 
     def scale(self, x: float, y: float, z: float) -> MFShape:
@@ -350,8 +422,20 @@ class MFShape(Shape):
             return self
         if self.cross_section is not None:
             self.cross_section = self.cross_section.scale((x, y))
-        elif self.solid is not None:
-            self.solid = self.solid.scale((x, y, z))
+        elif self._solid is not None:
+            self.defer_transform(scale_matrix(x, y, z))
+        return self
+
+    def transform(self, matrix) -> MFShape:
+        matrix = np.asarray(matrix)
+        if self.cross_section is not None:
+            if not matrix[2, :2].any() and not matrix[:2, 2].any():
+                # keeps the XY plane, like mv and scale ignore Z for cross sections
+                self.cross_section = self.cross_section.transform(matrix[np.ix_((0, 1), (0, 1, 3))])
+                return self
+            self._ensure3d()
+        if self.solid is not None:
+            self.solid = self.solid.transform(matrix[:3, :4])
         return self
     
     def hull(self) -> MFShape:
@@ -363,13 +447,13 @@ class MFShape(Shape):
 
     def bbox(self) -> tuple[float, float, float, float, float, float]:
         if self.cross_section is not None:
-            bb_rect = self.cross_section.bounding_box()
-            return (bb_rect[0], bb_rect[1],
-                    bb_rect[2], bb_rect[3],
-                    0.0, 0.0)
-        if self.solid is None:
+            xmin, ymin, xmax, ymax = self.cross_section.bounds()
+            return (xmin, xmax, ymin, ymax, 0.0, 0.0)
+        if self._solid is None:
             return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
-        mf_bb = self.solid.bounding_box()
+        # bounds of the transformed solid, leaving the pending transform to the next boolean
+        solid = self._solid if self._pending is None else self._solid.transform(self._pending[:3, :4])
+        mf_bb = solid.bounding_box()
         return (mf_bb[MFBBoxEnum.MINX.value],
                 mf_bb[MFBBoxEnum.MAXX.value],
                 mf_bb[MFBBoxEnum.MINY.value],
@@ -447,7 +531,7 @@ class MFBall(MFShape):
     def __init__(self, rad: float, api: MFShapeAPI):
         super().__init__(api)
         segs = self._smoothing_segments(2 * pi * rad)
-        self.solid = Manifold.sphere(rad, circular_segments=segs)
+        self.solid = mf_sphere(rad, segs)
 
 
 class MFBox(MFShape):
@@ -456,9 +540,14 @@ class MFBox(MFShape):
         self.ln = l
         self.wth = wth
         self.ht = ht
-        self.solid = Manifold.cube((l, wth, ht))
+        self.solid = MF_PRIMITIVES.get(("box", l, wth, ht, center), lambda: self._box(l, wth, ht, center))
+
+    @staticmethod
+    def _box(l: float, wth: float, ht: float, center: bool) -> Manifold:
+        box = Manifold.cube((l, wth, ht))
         if center:
-            self.solid = self.solid.translate((-l / 2, -wth / 2, -ht / 2))
+            box = box.translate((-l / 2, -wth / 2, -ht / 2))
+        return box
 
 
 class MFConeZ(MFShape):
@@ -472,7 +561,10 @@ class MFConeZ(MFShape):
     ):
         super().__init__(api)
         segs = sides if sides is not None else self._smoothing_segments(2 * pi * max(r1, r2))
-        self.solid = Manifold.cylinder(l, r1, r2, circular_segments=segs)
+        self.solid = MF_PRIMITIVES.get(
+            ("cone", l, r1, r2, segs),
+            lambda: Manifold.cylinder(l, r1, r2, circular_segments=segs),
+        )
 
 
 class MFPolyExtrusionZ(MFShape):
@@ -486,8 +578,9 @@ class MFRodZ(MFShape):
     def __init__(self, l: float, rad: float, sides: float, api: MFShapeAPI):
         super().__init__(api)
         segs = sides if sides is not None else self._smoothing_segments(2 * pi * rad)
-        self.solid = Manifold.cylinder(l, rad, circular_segments=segs).translate(
-            (0, 0, -l / 2)
+        self.solid = MF_PRIMITIVES.get(
+            ("rod", l, rad, segs),
+            lambda: Manifold.cylinder(l, rad, circular_segments=segs).translate((0, 0, -l / 2)),
         )
 
 class MFPolyhedron(MFShape):
@@ -528,7 +621,7 @@ class MFLineSplineExtrusionZ(MFShape):
         super().__init__(api)
         self.path = path
         self.ht = ht
-        approx_curve_path = lineSplineXY(start, path, self._smoothing_segments)
+        approx_curve_path = self.api.spline_polygon(start, path)
         polygon = CrossSection([approx_curve_path], FillRule.EvenOdd)
         self.solid = Manifold.extrude(polygon, ht)
 
@@ -547,11 +640,10 @@ class MFLineSplineRevolveX(MFShape):
         _, dimY = dimXY(start, path)
         neg_deg = deg < 0
         deg = -deg if neg_deg else deg
-        segs = ceil(self._smoothing_segments(2 * pi * dimY) * deg / 360.0)
+        segs = self.api.revolve_segments(dimY, deg)
         self.path = path
         self.deg = deg
-        approx_curve_path = lineSplineXY(start, path, self._smoothing_segments)
-        approx_curve_path = [(y, x) for x, y in approx_curve_path]  # swap X, Y
+        approx_curve_path = self.api.spline_polygon(start, path)[:, ::-1]  # swap X, Y
         polygon = CrossSection([approx_curve_path], FillRule.EvenOdd)
         solid = Manifold.revolve(polygon, revolve_degrees=deg, circular_segments=segs)
         solid = solid.rotate((0, 0, 90)).rotate((0, 90, 0))
@@ -571,19 +663,10 @@ class MFCirclePolySweep(MFShape):
         self.path = path
         self.rad = rad
         segs = self._smoothing_segments(2 * pi * rad)
-        sweep_shape = None
-        for i, (x, y, z) in enumerate(path):
-            if i == 0:
-                last_ball = Manifold.sphere(rad, circular_segments=segs).translate(
-                    (x, y, z)
-                )
-                sweep_shape = last_ball
-            else:
-                ball = Manifold.sphere(rad, circular_segments=segs).translate((x, y, z))
-                hull2balls = (last_ball + ball).hull()
-                sweep_shape += hull2balls
-                last_ball = ball
-        self.solid = sweep_shape
+        ball = mf_sphere(rad, segs)
+        balls = [ball.translate((x, y, z)) for x, y, z in path]
+        hulls = [Manifold.batch_hull([b0, b1]) for b0, b1 in zip(balls[:-1], balls[1:])]
+        self.solid = Manifold.batch_boolean(balls[:1] + hulls, OpType.Add)
 
 
 class MFTextZ(MFShape):
@@ -608,7 +691,8 @@ class MFTextZ(MFShape):
             print(f"Can't find font {fontName}, substitude with {fontPath}")
 
         glyphs_paths = textToGlyphsPaths(
-            fontPath, txt, fontSize, dimToSegs=self._smoothing_segments
+            fontPath, txt, fontSize, dimToSegs=self._smoothing_segments,
+            segsKey=self.api.segments_key(),
         )
 
         if tck == 0:
@@ -626,17 +710,13 @@ class MFTextZ(MFShape):
                 print('# WARNING! Text Generation failed!!! ')
                 self.cross_section = CrossSection([[(0, 0), (fontSize, 0), (fontSize, fontSize), (0, fontSize)]], FillRule.EvenOdd)
         else:
-            text3d: Manifold = None
-            for glyph_paths in glyphs_paths:
-
-                glyph3d: Manifold = None
+            # glyphs are filled one by one, then extruded together
+            sections = [CrossSection(glyph_paths, FillRule.EvenOdd) for glyph_paths in glyphs_paths]
+            sections = [cs for cs in sections if cs.area() > 0]
 
-                cross_section = CrossSection(glyph_paths, FillRule.EvenOdd)
-                if cross_section.area() > 0:
-                    glyph3d = Manifold.extrude(cross_section, tck)
-
-                if glyph3d is not None:
-                    text3d = glyph3d if text3d is None else text3d + glyph3d
+            text3d: Manifold = None
+            if sections:
+                text3d = Manifold.extrude(CrossSection.batch_boolean(sections, OpType.Add), tck)
 
             if text3d is not None:
                 (_, _, _, xmax, ymax, _) = text3d.bounding_box()
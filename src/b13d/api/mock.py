@@ -126,6 +126,8 @@ class MockShape(Shape):
     Mock Pylele Shape implementation for test
     """
 
+    bbox_cache = False  # bbox is the mock state
+
     def __init__(self, api, bbox=None):
         """Initialize mock shape with optional bounding box."""
         solid = object() if bbox is not None else None
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 import copy
-from math import pi, ceil
-import tempfile
+from math import pi
 pv = None
 PV_AVAILABLE = False
 try:
@@ -24,7 +23,9 @@ PYVISTA_BOOLEAN_OPS_EN = False
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import ShapeAPI, Shape, run_api_test, Direction, Implementation
-from b13d.api.utils import dimXY, file_ensure_extension, lineSplineXY
+from b13d.api.matrix import translation_matrix, scale_matrix, rotation_matrix, euler_matrix
+from b13d.api.mesh import MeshData
+from b13d.api.utils import dimXY, file_ensure_extension, pointList
 
 
 def _ensure_cw_winding_2d(points_2d):
@@ -47,6 +48,8 @@ def _ensure_cw_winding_2d(points_2d):
 
 class PVShapeAPI(ShapeAPI):
 
+    broadphase = True
+
     def export_stl(self, shape: PVShape, path: Union[str, Path]) -> None:
         mesh = shape.getImplSolid()
         if mesh is None:
@@ -160,6 +163,20 @@ class PVShapeAPI(ShapeAPI):
     def tolerance(self) -> float:
         return self.implementation.tolerance()
 
+    def mesh_arrays(self, shape: PVShape):
+        if shape.solid is None:
+            return None
+        return MeshData.from_polydata(shape.solid)
+
+    def triangle_count(self, shape: PVShape) -> int:
+        # counted without applying the pending transform, which does not change it
+        if shape._solid is None:
+            return None
+        return len(MeshData.from_polydata(shape._solid).faces)
+
+    def mesh_from_arrays(self, vertices, faces) -> PVShape:
+        return PVShape(self, mesh=MeshData(vertices, faces).to_polydata())
+
     def genImport(self, infile: str, extrude: float = None) -> PVShape:
         return PVImport(infile, extrude=extrude, api=self)
 
@@ -194,6 +211,8 @@ class PVShapeAPI(ShapeAPI):
 
 class PVShape(Shape):
 
+    broadphase = True
+
     def __init__(self, api: PVShapeAPI, mesh=None):
         super().__init__(api, solid=mesh)
 
@@ -204,7 +223,7 @@ class PVShape(Shape):
         return self.solid
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.smoothing_segments(dim)
 
     def cut(self, cutter: PVShape) -> PVShape:
         if cutter is None:
@@ -239,19 +258,12 @@ class PVShape(Shape):
     def _cut_trimesh_fallback(self, self_solid, cutter_solid) -> PVShape:
         """Fallback cut operation using trimesh boolean_difference."""
         try:
-            import trimesh
-            with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp1:
-                with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp2:
-                    self_solid.save(tmp1.name)
-                    cutter_solid.save(tmp2.name)
-                    mesh1 = trimesh.load(tmp1.name)
-                    mesh2 = trimesh.load(tmp2.name)
-                    result = mesh1.difference(mesh2)
-                    if result is not None and result.is_watertight:
-                        with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp_out:
-                            result.export(tmp_out.name)
-                            self.solid = pv.read(tmp_out.name)
-                            return self
+            mesh1 = MeshData.from_polydata(self_solid).to_trimesh(process=True)
+            mesh2 = MeshData.from_polydata(cutter_solid).to_trimesh(process=True)
+            result = mesh1.difference(mesh2)
+            if result is not None and result.is_watertight:
+                self.solid = MeshData.from_trimesh(result).to_polydata()
+                return self
         except Exception as e:
             print(f"Warning: trimesh difference failed: {e}")
         self.solid = self_solid
@@ -294,19 +306,12 @@ class PVShape(Shape):
     def _join_trimesh_fallback(self, self_solid, joiner_solid) -> PVShape:
         """Fallback join operation using trimesh boolean_union."""
         try:
-            import trimesh
-            with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp1:
-                with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp2:
-                    self_solid.save(tmp1.name)
-                    joiner_solid.save(tmp2.name)
-                    mesh1 = trimesh.load(tmp1.name)
-                    mesh2 = trimesh.load(tmp2.name)
-                    result = mesh1.union(mesh2)
-                    if result is not None and result.is_watertight:
-                        with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp_out:
-                            result.export(tmp_out.name)
-                            self.solid = pv.read(tmp_out.name)
-                            return self
+            mesh1 = MeshData.from_polydata(self_solid).to_trimesh(process=True)
+            mesh2 = MeshData.from_polydata(joiner_solid).to_trimesh(process=True)
+            result = mesh1.union(mesh2)
+            if result is not None and result.is_watertight:
+                self.solid = MeshData.from_trimesh(result).to_polydata()
+                return self
         except Exception as e:
             print(f"Warning: trimesh union failed: {e}")
         # Fallback: merge without boolean
@@ -346,28 +351,22 @@ class PVShape(Shape):
     def _intersect_trimesh_fallback(self, self_solid, intersector_solid) -> PVShape:
         """Fallback intersection operation using trimesh boolean_intersection."""
         try:
-            import trimesh
-            with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp1:
-                with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp2:
-                    self_solid.save(tmp1.name)
-                    intersector_solid.save(tmp2.name)
-                    mesh1 = trimesh.load(tmp1.name)
-                    mesh2 = trimesh.load(tmp2.name)
-                    result = mesh1.intersection(mesh2)
-                    if result is not None and result.is_watertight:
-                        with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp_out:
-                            result.export(tmp_out.name)
-                            self.solid = pv.read(tmp_out.name)
-                            return self
+            mesh1 = MeshData.from_polydata(self_solid).to_trimesh(process=True)
+            mesh2 = MeshData.from_polydata(intersector_solid).to_trimesh(process=True)
+            result = mesh1.intersection(mesh2)
+            if result is not None and result.is_watertight:
+                self.solid = MeshData.from_trimesh(result).to_polydata()
+                return self
         except Exception as e:
             print(f"Warning: trimesh intersection failed: {e}")
         self.solid = self_solid
         return self
 
     def dup(self) -> PVShape:
+        # keeps the pending transform
         duplicate = copy.copy(self)
-        if self.solid is not None:
-            duplicate.solid = self.solid.copy()
+        if self._solid is not None:
+            duplicate._solid = self._solid.copy()
         return duplicate
 
 
@@ -384,37 +383,42 @@ class PVShape(Shape):
     def mv(self, x: float, y: float, z: float) -> PVShape:
         if x == 0 and y == 0 and z == 0:
             return self
-        if self.solid is not None:
-            self.solid = self.solid.translate((x, y, z))
+        if self._solid is not None:
+            self.defer_transform(translation_matrix(x, y, z))
         return self
 
     def rotate_x(self, ang: float) -> PVShape:
-        if self.solid is not None:
-            self.solid = self.solid.rotate_x(ang)
+        if self._solid is not None:
+            self.defer_transform(rotation_matrix(0, ang))
         return self
 
     def rotate_y(self, ang: float) -> PVShape:
-        if self.solid is not None:
-            self.solid = self.solid.rotate_y(ang)
+        if self._solid is not None:
+            self.defer_transform(rotation_matrix(1, ang))
         return self
 
     def rotate_z(self, ang: float) -> PVShape:
-        if self.solid is not None:
-            self.solid = self.solid.rotate_z(ang)
+        if self._solid is not None:
+            self.defer_transform(rotation_matrix(2, ang))
         return self
 
     def rotate(self, ang: float | tuple[float, float, float], direction: Direction = Direction.Z) -> PVShape:
         if isinstance(ang, (float, int)):
             return Shape.rotate(self, ang, direction)
-        if self.solid is not None:
-            self.solid = self.solid.rotate(ang)
+        if self._solid is not None:
+            self.defer_transform(euler_matrix(ang))
         return self
 
     def scale(self, x: float, y: float, z: float) -> PVShape:
         if x == 1 and y == 1 and z == 1:
             return self
+        if self._solid is not None:
+            self.defer_transform(scale_matrix(x, y, z))
+        return self
+
+    def transform(self, matrix) -> PVShape:
         if self.solid is not None:
-            self.solid = self.solid.scale((x, y, z))
+            self.solid = self.solid.transform(matrix, inplace=False)
         return self
 
     def hull(self) -> PVShape:
@@ -431,9 +435,11 @@ class PVShape(Shape):
         return self
 
     def bbox(self) -> tuple[float, float, float, float, float, float]:
-        if self.solid is None:
+        if self._solid is None:
             return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
-        bounds = self.solid.bounds
+        # bounds of the transformed mesh, leaving the pending transform to the next boolean
+        solid = self._solid if self._pending is None else self._solid.transform(self._pending, inplace=False)
+        bounds = solid.bounds
         return (bounds[0], bounds[1], bounds[2], bounds[3], bounds[4], bounds[5])
 
     def linear_extrude(self, height=None, center=False, twist=0, scale=1.0, slices=None) -> PVShape:
@@ -636,12 +642,9 @@ class PVPolyhedron(PVShape):
         self.solid = pv.PolyData(np.array(points, dtype=np.float32), np.array(faces_arr, dtype=np.int64))
         # Ensure outward-facing normals: check with trimesh and flip if volume is negative.
         try:
-            import tempfile, trimesh
-            with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp:
-                self.solid.save(tmp.name)
-                tm = trimesh.load(tmp.name)
-                if tm.is_watertight and tm.volume < 0:
-                    self.solid = self.solid.flip_faces()
+            tm = MeshData.from_polydata(self.solid).to_trimesh(process=True)
+            if tm.is_watertight and tm.volume < 0:
+                self.solid = self.solid.flip_faces()
         except Exception:
             pass
 
@@ -653,8 +656,8 @@ class PVLineSplineExtrusionZ(PVShape):
         self.ht = ht
         import numpy as np
 
-        approx_curve_path = lineSplineXY(start, path, self._smoothing_segments)
-        # lineSplineXY already closes the path via ensureClosed2DPath
+        approx_curve_path = pointList(self.api.spline_polygon(start, path))
+        # spline_polygon already closes the path
         # Close the path if not already closed (redundant safety)
         if approx_curve_path[0] != approx_curve_path[-1]:
             closed_path = approx_curve_path + [approx_curve_path[0]]
@@ -687,16 +690,14 @@ class PVLineSplineRevolveX(PVShape):
         import numpy as np
 
         _, dimY = dimXY(start, path)
-        n_theta = max(3, ceil(
-            self._smoothing_segments(2 * pi * dimY) * abs(deg) / 360.0
-        ))
+        n_theta = max(3, self.api.revolve_segments(dimY, deg))
 
         try:
             # Build the revolve mesh manually.
             # The profile is a closed 2D path (x, y) where X is the revolve axis
             # and Y is the radius from the axis. The revolve sweeps the profile
             # around the X axis by |deg| degrees.
-            profile = lineSplineXY(start, path, self._smoothing_segments)
+            profile = pointList(self.api.spline_polygon(start, path))
             # Ensure the profile is closed
             if profile[0] != profile[-1]:
                 profile.append(profile[0])
@@ -802,12 +803,9 @@ class PVLineSplineRevolveX(PVShape):
                 self.solid = self.solid.flip_faces()
             # Ensure outward normals by checking the volume sign via trimesh
             try:
-                import trimesh
-                with tempfile.NamedTemporaryFile(suffix='.stl', delete=True) as tmp:
-                    self.solid.save(tmp.name)
-                    mesh = trimesh.load(tmp.name)
-                    if mesh.is_watertight and mesh.volume < 0:
-                        self.solid = self.solid.flip_faces()
+                mesh = MeshData.from_polydata(self.solid).to_trimesh(process=True)
+                if mesh.is_watertight and mesh.volume < 0:
+                    self.solid = self.solid.flip_faces()
             except Exception:
                 pass
 
@@ -865,7 +863,8 @@ class PVTextZ(PVShape):
 
         from b13d.api.utils import textToGlyphsPaths
         glyphs_paths = textToGlyphsPaths(
-            fontPath, txt, fontSize, dimToSegs=self._smoothing_segments
+            fontPath, txt, fontSize, dimToSegs=self._smoothing_segments,
+            segsKey=self.api.segments_key(),
         )
 
         text3d = None
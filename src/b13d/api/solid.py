@@ -6,13 +6,16 @@
 
 from __future__ import annotations
 
+import contextlib
 import datetime
 import importlib
+import multiprocessing
+import multiprocessing.connection
 import platform
 import time
 from numpy import angle
 import trimesh
-from json_tricks import dumps
+from json_tricks import dumps, load as json_load
 
 from pathlib import Path
 from abc import ABC, abstractmethod
@@ -20,6 +23,7 @@ from argparse import ArgumentParser, Namespace
 from copy import deepcopy
 import inspect
 from typing import get_type_hints, Type
+from concurrent.futures import ProcessPoolExecutor
 
 import os
 import sys
@@ -27,12 +31,49 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
                 
 from b13d.api.core import ShapeAPI, Shape, Fidelity, Implementation, StringEnum, supported_apis
 from b13d.api.constants import ColorEnum, FIT_TOL, FILLET_RAD, DEFAULT_BUILD_DIR, DEFAULT_TEST_DIR, ColorEnum
+from b13d.api.constants import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_SIZE_MB, DEFAULT_FONT_DIR
+from b13d.api.constants import DEFAULT_TEST_JOBS, DEFAULT_TEST_TIMEOUT
+from b13d.api.cache import shape_cache_from_cli, SHAPE_REGISTRY
+from b13d.api.lazy import LazyShapeAPI
+from b13d.api.fonts import FONT_INDEX
+from b13d.api.trace import TRACER, triangle_count
+from b13d.api.bbox import BOOLEAN_STATS, shape_bounds
 from b13d.api.utils import make_or_exist_path, wait_assert_file_exist
 from b13d.conversion.scad2stl import scad2stl_parser
 
 MAX_SECTION = 1000
 SECTION_LIMITS = [-MAX_SECTION, MAX_SECTION]
 
+# worker processes of the running build, see build_executor_scope
+_BUILD_EXECUTOR = None
+# minimum number of parts of an assembly still to be generated to export them in workers
+MIN_WORKER_PARTS = 2
+
+def build_executor() -> ProcessPoolExecutor:
+    """ Return the worker processes of the running build, None for a serial build """
+    return _BUILD_EXECUTOR
+
+@contextlib.contextmanager
+def build_executor_scope(jobs: int):
+    """ Create the worker processes shared by all assemblies of a build,
+        once, when jobs > 1. Workers start on the first task, and are stopped on exit """
+    global _BUILD_EXECUTOR
+    # workers beyond the available cores only add start up and regeneration time
+    jobs = min(jobs, os.cpu_count() or 1)
+    if jobs <= 1 or _BUILD_EXECUTOR is not None:
+        yield _BUILD_EXECUTOR
+        return
+    # spawn, since forking a process running threaded geometry kernels is unsafe
+    _BUILD_EXECUTOR = ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    try:
+        yield _BUILD_EXECUTOR
+    finally:
+        executor, _BUILD_EXECUTOR = _BUILD_EXECUTOR, None
+        executor.shutdown()
+
 def main_maker(module_name, class_name, args=None):
     """Generate a main function for a Solid instance
     
@@ -51,6 +92,9 @@ def main_maker(module_name, class_name, args=None):
     """
     solid = None
     out_fname = None
+
+    # shapes generated by a previous build are not reused
+    SHAPE_REGISTRY.clear()
     
     try:
         # Import module and get class
@@ -78,7 +122,8 @@ def main_maker(module_name, class_name, args=None):
         
         # Export STL file
         try:
-            out_fname = solid.export_stl()
+            with build_executor_scope(getattr(solid.cli, "jobs", 1)):
+                out_fname = solid.export_stl()
         except Exception as e:
             raise ValueError(f"Failed to export STL for {class_name}: {e}")
         
@@ -112,6 +157,10 @@ def main_maker(module_name, class_name, args=None):
             except Exception as cleanup_err:
                 print(f"WARNING: Error during cleanup: {cleanup_err}", file=sys.stderr)
 
+def test_out_path(component, test, api) -> str:
+    """Return the output directory of a testcase"""
+    return os.path.join(DEFAULT_TEST_DIR,component,test,api)
+
 def test_iteration(module, component, test, api, args=None):
     """Helper to generate a testcase launching the main function in a module"""
     mod = importlib.import_module(module)
@@ -122,20 +171,105 @@ def test_iteration(module, component, test, api, args=None):
         largs = deepcopy(args)
 
     print(f'#### Test {component} {test} {api}')
-    outdir = os.path.join(DEFAULT_TEST_DIR,component,test,api)
+    outdir = test_out_path(component, test, api)
     largs += [
         '-o', outdir,
         '-i', api,
         '-odoff', # do not append date
-        '-stlc' # enable stl volume analysis during test
+        '-stlc', # enable stl volume analysis during test
+        '-nc', # do not read or fill the on-disk cache of the user
                 ]
     print(largs)
     mod.main(args=largs)
     pass
 
+def test_iteration_worker(conn, module, component, test, api, args=None):
+    """Run a testcase in an isolated process, send back the error if any"""
+    error = None
+    try:
+        test_iteration(module=module, component=component, test=test, api=api, args=args)
+    except Exception as exc:
+        error = (type(exc).__name__, str(exc))
+    conn.send(error)
+    conn.close()
+
+def test_reports(outdir) -> dict:
+    """Return the _rpt.json reports found in a testcase output directory"""
+    rpts = {}
+    for root, _, files in os.walk(outdir):
+        for fname in files:
+            if fname.endswith('_rpt.json'):
+                with open(os.path.join(root, fname), 'r', encoding='UTF8') as f:
+                    rpts[fname] = json_load(f)
+    return rpts
+
+def test_error_message(module, test, api, args, error_name, error) -> str:
+    """Error message of a failed testcase"""
+    return (
+        f'module: {module}, test: {test}, api: {api},\n'
+        f'args:{args}\n'
+        f'Error: {error_name}: {error}'
+    )
+
+def test_loop_isolated(module, cases, jobs=1, timeout=None) -> list:
+    """Run testcases each in its own process, up to jobs at a time.
+    A testcase running for longer than timeout [s] is terminated.
+    Return the error messages of failed testcases, in testcase order"""
+
+    # spawn, since forking a process running threaded geometry kernels is unsafe
+    ctx = multiprocessing.get_context("spawn")
+    pending = list(enumerate(cases))
+    running = {}
+    errors = {}
+
+    while len(pending) > 0 or len(running) > 0:
+        while len(pending) > 0 and len(running) < jobs:
+            idx, case = pending.pop(0)
+            recv_conn, send_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=test_iteration_worker,
+                args=(send_conn, module, module, case['test_dir'], case['api'], case['args']),
+            )
+            proc.start()
+            send_conn.close()
+            running[proc] = (idx, case, recv_conn, time.time())
+
+        multiprocessing.connection.wait([p.sentinel for p in running], timeout=1)
+
+        for proc, (idx, case, recv_conn, start_time) in list(running.items()):
+            elapsed = time.time() - start_time
+            if not proc.is_alive():
+                proc.join()
+                try:
+                    error = recv_conn.recv()
+                except EOFError:
+                    # process died before reporting, e.g. on exit from argument parsing
+                    error = ('ProcessError', f'test process exited with code {proc.exitcode}')
+            elif timeout is not None and elapsed > timeout:
+                proc.terminate()
+                proc.join()
+                error = ('TimeoutError', f'test exceeded timeout of {timeout} [s]')
+            else:
+                continue
+
+            recv_conn.close()
+            del running[proc]
+            status = 'PASS' if error is None else 'FAIL'
+            print(f'#### Test {module} {case["test_dir"]} {case["api"]}: {status} in {elapsed:.1f} [s]')
+            if error is not None:
+                errors[idx] = test_error_message(
+                    module, case['test'], case['api'], case['args'], *error
+                )
+
+    return [errors[idx] for idx in sorted(errors)]
+
+def test_loop(module, apis=None, tests=None, jobs=None, timeout=None) -> dict:  # ,component):
+    """loop over a list of tests.
 
-def test_loop(module, apis=None, tests=None):  # ,component):
-    """loop over a list of tests"""
+    With more than one job, or a timeout [s], each testcase runs in its own process
+    and all testcases run before failing. Defaults are taken from the
+    B13D_TEST_JOBS and B13D_TEST_TIMEOUT environment variables.
+    Return the _rpt.json reports of each testcase, by (test, api)"""
 
     # generate a default testcase if not specified
     if tests is None:
@@ -152,25 +286,44 @@ def test_loop(module, apis=None, tests=None):  # ,component):
         supported = set(supported_apis()) | {Implementation.MOCK}
         apis = [a for a in apis if a in supported]
 
-    test_count = 0
-    for test,args in tests.items():
+    if jobs is None:
+        jobs = DEFAULT_TEST_JOBS
+    if timeout is None:
+        timeout = DEFAULT_TEST_TIMEOUT
+
+    cases = []
+    for test_count, (test, args) in enumerate(tests.items()):
         for api in apis:
+            cases.append({
+                'test': test,
+                'test_dir': f'{test_count:02d}_{test}',
+                'api': api,
+                'args': args,
+            })
+
+    if jobs > 1 or timeout is not None:
+        errors = test_loop_isolated(module, cases, jobs=jobs, timeout=timeout)
+        if len(errors) > 0:
+            raise AssertionError('\n\n'.join(errors))
+    else:
+        for case in cases:
             try:
                 test_iteration(
                             module=module,
                             component=module,
-                            test=f'{test_count:02d}_{test}',
-                            api=api,
-                            args=args,
+                            test=case['test_dir'],
+                            api=case['api'],
+                            args=case['args'],
                             )
             except Exception as exc:
-                raise AssertionError(
-                    f'module: {module}, test: {test}, api: {api},\n'
-                    f'args:{args}\n'
-                    f'Error: {type(exc).__name__}: {exc}'
-                ) from exc
-            
-        test_count += 1
+                raise AssertionError(test_error_message(
+                    module, case['test'], case['api'], case['args'], type(exc).__name__, exc
+                )) from exc
+
+    return {
+        (case['test'], case['api']): test_reports(test_out_path(module, case['test_dir'], case['api']))
+        for case in cases
+    }
 
 
 class PrettyPrintDict(dict):
@@ -261,6 +414,37 @@ def stl_check_volume(
 
     return rpt
 
+def part_report(part, fname: str, export_time: float) -> dict:
+    """Return the file name, export time and size of an exported part,
+    with the reports of its own parts if any"""
+    rpt = {
+        "fname": fname,
+        "export_time": export_time,
+        "file_size": os.path.getsize(fname),
+    }
+    if part.parts_rpt:
+        rpt["parts"] = part.parts_rpt
+    return rpt
+
+def export_part(task: dict) -> dict:
+    """Generate and export a part of an assembly in a worker process.
+    The part is rebuilt from its class, isCut and cli, and traced if the build is,
+    the recorded spans are returned with its report"""
+    if task["trace"]:
+        trace_start = time.time()
+        TRACER.start()
+    try:
+        start_time = time.time()
+        part = task["class"](isCut=task["isCut"], cli=task["cli"])
+        out_fname = part.export(fmt=task["fmt"], out_path=task["out_path"])
+        rpt = part_report(part, out_fname, time.time() - start_time)
+    finally:
+        if task["trace"]:
+            TRACER.stop()
+    if task["trace"]:
+        rpt["trace"] = {"events": TRACER.events, "start_time": trace_start}
+    return rpt
+
 def solid_operand(joiner)->ShapeAPI:
     """ returns a ShapeAPI compatible operand """
     if joiner is None:
@@ -382,6 +566,13 @@ def lele_solid_parser(parser=None):
         choices=list(Fidelity),
         default=Fidelity.LOW,
     )
+    parser.add_argument(
+        "-tol",
+        "--tolerance",
+        help="Maximum chord deviation of curves [mm], sizing the segments of each curve from its radius instead of the fidelity, default off",
+        type=float,
+        default=None,
+    )
     parser.add_argument(
         "-c",
         "--color",
@@ -461,6 +652,54 @@ def lele_solid_parser(parser=None):
         help="Split in half",
         action="store_true",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of worker processes exporting assembly parts in parallel, up to the number of cores."
+        " Only worth it for cold builds of several separate parts,"
+        " as workers do not share the sub-solids generated by the assembly",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "-nc",
+        "--no_cache",
+        help="Disable reuse of generated shapes, in process and on-disk",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-cdir",
+        "--cache_dir",
+        help="On-disk cache directory of generated shapes",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+    )
+    parser.add_argument(
+        "-cms",
+        "--cache_max_size",
+        help="Maximum size of the on-disk cache of generated shapes [MB]",
+        type=float,
+        default=DEFAULT_CACHE_MAX_SIZE_MB,
+    )
+    parser.add_argument(
+        "-tr",
+        "--trace",
+        help="Trace solid generation, booleans and exports, saved next to the report",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-fd",
+        "--font_dir",
+        help="Directory of fonts, taking precedence over the system fonts",
+        type=str,
+        default=DEFAULT_FONT_DIR,
+    )
+    parser.add_argument(
+        "-lz",
+        "--lazy",
+        help="Record shape operations and evaluate an optimized expression on export",
+        action="store_true",
+    )
 
     parser = scad2stl_parser(parser=parser)
 
@@ -479,6 +718,7 @@ class Solid(ABC):
     api          : ShapeAPI = None
     shape        : Shape = None
     parts        : list = None
+    parts_rpt    : list = None      # file names and timings of exported parts
     _out_path    : str = None       # cached computed output path, computed once
 
     def __init__(
@@ -568,37 +808,83 @@ class Solid(ABC):
                 self.parts = parts
 
     def gen_section(self):
-        """Section the volume as specified by cli"""
+        """
+        Section the volume as specified by cli, trimming by the planes of the limits.
+        Planes with the shape already on their kept side are skipped, so a sectioned shape,
+        with its cached bounding box, is not trimmed again by later gen_full calls
+        """
         all_sections = [self.cli.section_x, self.cli.section_y, self.cli.section_z]
-        if any(item != SECTION_LIMITS for item in all_sections):
+        if all(item == SECTION_LIMITS for item in all_sections):
             # Do not execute section if all limits are default
-            xlen = abs(self.cli.section_x[1] - self.cli.section_x[0])
-            ylen = abs(self.cli.section_y[1] - self.cli.section_y[0])
-            zlen = abs(self.cli.section_z[1] - self.cli.section_z[0])
-            section =  self.api.box(xlen, ylen, zlen).mv(
-                min(self.cli.section_x)+xlen/2,
-                min(self.cli.section_y)+ylen/2,
-                min(self.cli.section_z)+zlen/2
-                )
-            self.shape = self.shape.intersection(section)
+            return
+        # lazy shapes would be evaluated by bbox
+        bounds = shape_bounds(self.shape) if self.shape.bbox_cache else None
+        tol = self.api.fidelity.tolerance()
+        for axis, limits in enumerate(all_sections):
+            if limits == SECTION_LIMITS:
+                continue
+            low, high = sorted(limits[:2])
+            normal = [0, 0, 0]
+            normal[axis] = 1
+            if bounds is None or bounds[axis, 0] < low - tol:
+                self.shape = self.api.trim_by_plane(self.shape, tuple(normal), low)
+            normal[axis] = -1
+            if bounds is None or bounds[axis, 1] > high + tol:
+                self.shape = self.api.trim_by_plane(self.shape, tuple(normal), -high)
 
     def gen_full(self):
         """ Generate shape if attribute not present """
         if not self.has_shape():
             print(f"# Shape missing: Generating {self.fileNameBase}... ")
 
-            if not self.has_api():
-                print(f"# Shape missing API: Configuring {self.fileNameBase}... ")
-                self.configure()
-                self.check_has_api()
-                print(f"# Done configuring API! {self.fileNameBase}")
+            with TRACER.span(self.fileNameBase, "solid", isCut=self.isCut) as span_args:
+                if not self.has_api():
+                    print(f"# Shape missing API: Configuring {self.fileNameBase}... ")
+                    self.configure()
+                    self.check_has_api()
+                    print(f"# Done configuring API! {self.fileNameBase}")
 
-            self.shape = self.gen()
+                self.shape = self.gen_cached()
+                if TRACER.enabled:
+                    span_args["triangles_out"] = triangle_count(self.shape)
             print(f"# Done generating shape! {self.fileNameBase}")
         self.check_has_shape()
         self.gen_section()
         return self.shape
 
+    def gen_cached(self) -> Shape:
+        """ Generate shape, reusing shapes already generated in this process
+            or stored in the on-disk cache, unless caching is disabled """
+        cache = shape_cache_from_cli(self.cli)
+        if cache is None:
+            return self.gen()
+
+        memoize = self.cli.implementation.can_memoize()
+        if memoize:
+            shape = SHAPE_REGISTRY.get(self)
+            if shape is not None:
+                print(f"# Shape already generated: {self.fileNameBase}")
+                return shape
+
+        shape = cache.load(self)
+        if shape is not None:
+            print(f"# Shape loaded from cache: {self.fileNameBase}")
+        else:
+            shape = self.gen()
+            if self.has_parts():
+                # assemblies register their parts while generating, cannot be skipped
+                return shape
+            if cache.store(self, shape) is not None:
+                # continue from the stored mesh, as later builds loading it will:
+                # rebuilding a solid from its mesh is not lossless
+                stored = cache.load(self)
+                if stored is not None:
+                    shape = stored
+
+        if memoize:
+            SHAPE_REGISTRY.put(self, shape)
+        return shape
+
     def gen_parser(self, parser=None):
         """
         Solid Command Line Interface
@@ -611,11 +897,14 @@ class Solid(ABC):
 
     def configure(self):
         """Configure Solid, and save self.cli"""
-        self.api:ShapeAPI = self.cli.implementation.get_api(self.cli.fidelity)
+        self.api:ShapeAPI = self.cli.implementation.get_api(self.cli.fidelity, getattr(self.cli, "tolerance", None))
         self.check_has_api()
         if self.cli.implementation == Implementation.SOLID2:
             self.api.setCommand(self.cli.openscad)
             self.api.setImplicit(self.cli.implicit)
+        if getattr(self.cli, "lazy", False):
+            self.api = LazyShapeAPI(self.api)
+        FONT_INDEX.set_font_dir(getattr(self.cli, "font_dir", DEFAULT_FONT_DIR))
 
         # cut tolerance
         self.cut_tolerance = 0.3
@@ -671,33 +960,47 @@ class Solid(ABC):
         report_en=True,
     ) -> str:
         """Generate .stl output file"""
-        start_time = time.time()
-
-        out_fname=self.export(fmt='.stl', out_path=out_path)
-        out_path, _ = os.path.split(out_fname)
+        if self.cli.trace:
+            TRACER.start()
+        try:
+            start_time = time.time()
+            booleans = BOOLEAN_STATS.snapshot()
+
+            out_fname=self.export(fmt='.stl', out_path=out_path)
+            out_path, _ = os.path.split(out_fname)
+
+            # checks
+            rpt = stl_check_volume(
+                out_fname=out_fname,
+                check_en=self.cli.stl_check_en
+                and not self.cli.implementation == Implementation.MOCK,
+                reference_volume=self.cli.reference_volume,
+                reference_volume_tolerance=self.cli.reference_volume_tolerance,
+            )
 
-        # checks
-        rpt = stl_check_volume(
-            out_fname=out_fname,
-            check_en=self.cli.stl_check_en
-            and not self.cli.implementation == Implementation.MOCK,
-            reference_volume=self.cli.reference_volume,
-            reference_volume_tolerance=self.cli.reference_volume_tolerance,
-        )
+            end_time = time.time()
+            # get the execution time
+            render_time = end_time - start_time
+            print(f"Rendering time: {render_time} [s]")
+            rpt["render_time"] = render_time
+            rpt['stl_file_size'] = os.path.getsize(out_fname)
+            rpt["datetime"] = datetime.datetime.now().strftime("%y-%m-%d/%H:%M:%S")
+            if self.parts_rpt:
+                rpt["parts"] = self.parts_rpt
+            rpt["booleans"] = BOOLEAN_STATS.since(booleans)
+            print(f"Booleans: {rpt['booleans']}")
+            rpt |= platform.uname()._asdict()
+
+            if report_en:
+                export_dict2text(
+                    outpath=out_path, fname=self.fileNameBase + "_rpt", dictdata=rpt,fmt='.json'
+                )
+        finally:
+            if self.cli.trace:
+                TRACER.stop()
 
-        end_time = time.time()
-        # get the execution time
-        render_time = end_time - start_time
-        print(f"Rendering time: {render_time} [s]")
-        rpt["render_time"] = render_time
-        rpt['stl_file_size'] = os.path.getsize(out_fname)
-        rpt["datetime"] = datetime.datetime.now().strftime("%y-%m-%d/%H:%M:%S")
-        rpt |= platform.uname()._asdict()
-
-        if report_en:
-            export_dict2text(
-                outpath=out_path, fname=self.fileNameBase + "_rpt", dictdata=rpt,fmt='.json'
-            )
+        if self.cli.trace:
+            TRACER.export(outpath=out_path, fname=self.fileNameBase)
 
         return out_fname
 
@@ -720,17 +1023,76 @@ class Solid(ABC):
 
         if self.has_parts():
             # this is an assembly, generate other parts
-            for part in self.parts:
-                if isinstance(part, Solid):
-                    part.export(fmt=fmt, out_path=out_path)
-                else:
-                    print(
-                        f"# WARNING: Cannot export {fmt} of class {type(part)} in assembly {self}"
-                    )
-                    print(self.parts)
+            self.parts_rpt = self.export_parts(fmt=fmt, out_path=out_path)
 
         return out_fname
 
+    def export_part_task(self, part: Solid, fmt: str, out_path: str) -> dict:
+        """Return the task to generate and export a part in a worker process,
+        or None if the part is exported by this process"""
+        if part.has_parts() or part.has_shape():
+            # parts of nested assemblies are only known to this process,
+            # and generated shapes are written here rather than shipped to a worker
+            return None
+        return {
+            "class": type(part),
+            "isCut": part.isCut,
+            "cli": part.cli,
+            "fmt": fmt,
+            "out_path": out_path,
+            "trace": TRACER.enabled,
+        }
+
+    def export_parts(self, fmt: str, out_path: str) -> list:
+        """Export the parts of an assembly. When at least MIN_WORKER_PARTS parts are
+        still to be generated, they are exported by the worker processes of the build,
+        if any, the others by this process.
+        Returns the list of file names and export times of the parts"""
+        parts = []
+        for part in self.parts:
+            if not isinstance(part, Solid):
+                print(
+                    f"# WARNING: Cannot export {fmt} of class {type(part)} in assembly {self}"
+                )
+                print(self.parts)
+                continue
+            parts.append(part)
+
+        executor = build_executor()
+        tasks = []
+        if executor is not None:
+            for part in parts:
+                task = self.export_part_task(part, fmt, out_path)
+                if task is not None:
+                    tasks.append((part, task))
+            if len(tasks) < MIN_WORKER_PARTS:
+                # starting a worker costs more than generating a single part here,
+                # where the sub-solids it shares with the assembly are already generated
+                tasks = []
+
+        futures = []
+        for part, task in tasks:
+            print(f"# Exporting {part.fileNameBase} of {self.fileNameBase} in a worker process")
+            futures.append(executor.submit(export_part, task))
+
+        rpts = []
+        worker_parts = [part for part, _ in tasks]
+        for part in parts:
+            if any(part is p for p in worker_parts):
+                continue
+            start_time = time.time()
+            fname = part.export(fmt=fmt, out_path=out_path)
+            rpts.append(part_report(part, fname, time.time() - start_time))
+
+        for future in futures:
+            rpt = future.result()
+            trace = rpt.pop("trace", None)
+            if trace is not None and TRACER.enabled:
+                TRACER.add_events(**trace)
+            rpts.append(rpt)
+
+        return rpts
+
     def fillet(
         self,
         nearestPts: list[tuple[float, float, float]],
@@ -813,6 +1175,47 @@ class Solid(ABC):
             return self
         return self.mv(*operand)
 
+def test_section(self):
+    """ Test plane trims and splits, half, and sections of solids """
+    from unittest import mock
+    from b13d.parts.tube import Tube
+
+    for impl in [Implementation.MANIFOLD, Implementation.TRIMESH]:
+        api = impl.get_api()
+
+        box = api.box(10, 20, 30)
+        trimmed = api.trim_by_plane(box, (1, 0, 0), 2)
+        self.assertIs(trimmed, box)
+        self.assertAlmostEqual(trimmed.left(), 2, places=3)
+        self.assertAlmostEqual(trimmed.right(), 5, places=3)
+
+        # same as the cut by a box of the default implementation
+        cut = ShapeAPI.trim_by_plane(api, api.box(10, 20, 30), (0, -1, 0), -3)
+        native = api.trim_by_plane(api.box(10, 20, 30), (0, -1, 0), -3)
+        for a, b in zip(cut.bbox(), native.bbox()):
+            self.assertAlmostEqual(a, b, places=3)
+        self.assertAlmostEqual(native.back(), 3, places=3)
+
+        rod = api.cylinder_z(10, 4)
+        above, below = api.split_by_plane(rod, (0, 0, 2), 1)
+        self.assertAlmostEqual(above.bottom(), 1, places=3)
+        self.assertAlmostEqual(below.top(), 1, places=3)
+        self.assertAlmostEqual(rod.top(), 5, places=3)
+        mesh_volume = lambda s: s.solid.volume() if impl == Implementation.MANIFOLD else s.solid.volume
+        self.assertAlmostEqual(mesh_volume(above) + mesh_volume(below), mesh_volume(rod), places=1)
+
+        self.assertAlmostEqual(api.box(10, 20, 30).half().back(), 0, places=3)
+
+    # sections trim the planes crossing the shape once, not on every gen_full
+    tube = Tube(args=['-i', 'mf', '-nc', '-odoff', '-secy', '0', '1000'])
+    tube.configure()
+    with mock.patch.object(tube.api, 'trim_by_plane', wraps=tube.api.trim_by_plane) as trim:
+        tube.gen_full()
+        self.assertEqual(trim.call_count, 1)
+        self.assertAlmostEqual(tube.shape.front(), 0, places=3)
+        tube.gen_full()
+        self.assertEqual(trim.call_count, 1)
+
 if __name__ == '__main__':
     prs = lele_solid_parser()
     print(prs.parse_args())
@@ -3,7 +3,7 @@
 from __future__ import annotations
 import copy
 from enum import Enum
-from math import pi, sqrt, ceil
+from math import pi, sqrt
 import os
 from pathlib import Path
 import sys
@@ -20,9 +20,12 @@ scad_render = None
 render = None
 square = None
 circle = None
+union = None
+difference = None
 SP2_AVAILABLE = False
 try:
     from solid2 import cube as _cube, sphere as _sphere, polygon as _polygon, text as _text, cylinder as _cylinder, polyhedron as _polyhedron, import_ as _import_, scad_render as _scad_render, render as _render, square as _square
+    from solid2 import union as _union, difference as _difference
     from solid2.extensions.bosl2 import circle as _circle
     cube = _cube
     sphere = _sphere
@@ -35,6 +38,8 @@ try:
     render = _render
     square = _square
     circle = _circle
+    union = _union
+    difference = _difference
     SP2_AVAILABLE = True
 except ImportError:
     pass
@@ -42,7 +47,7 @@ except ImportError:
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import ShapeAPI, Shape, run_api_test, Direction, Implementation
-from b13d.api.utils import dimXY, file_ensure_extension, lineSplineXY
+from b13d.api.utils import dimXY, file_ensure_extension, pointList
 from b13d.conversion.stlascii2stlbin import stlascii2stlbin
 from b13d.conversion.scad2stl import scad2stl, OPENSCAD
 from b13d.conversion.scad2csg import scad2csg
@@ -121,6 +126,28 @@ class Sp2ShapeAPI(ShapeAPI):
         assert os.path.isfile(fout), f"ERROR: file {fout} does not exist!"
         return fout
 
+    def union_all(self, shapes: list[Sp2Shape]) -> Sp2Shape:
+        shapes = [s for s in shapes if s is not None]
+        if len(shapes) == 0:
+            return None
+        joined = shapes[0]
+        if len(shapes) > 1:
+            joined.solid = union()(*[s.solid for s in shapes])
+            if all(s._check_backup_solid() for s in shapes):
+                joined.backup_solid = self.backup_api.union_all([s.backup_solid for s in shapes])
+        return joined
+
+    def difference_all(self, base: Sp2Shape, cutters: list[Sp2Shape]) -> Sp2Shape:
+        cutters = [c for c in cutters if c is not None]
+        if len(cutters) == 0:
+            return base
+        base.solid = difference()(base.solid, *[c.solid for c in cutters])
+        if base._check_backup_solid() and all(c._check_backup_solid() for c in cutters):
+            base.backup_solid = self.backup_api.difference_all(
+                base.backup_solid, [c.backup_solid for c in cutters]
+            )
+        return base
+
     def sphere(self, r: float) -> Sp2Shape:
         return Sp2Ball(r, self)
 
@@ -327,7 +354,7 @@ class Sp2Shape(Shape):
         return self
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.smoothing_segments(dim)
 
     def mirror(self, normal=(0, 1, 0)) -> Sp2Shape:
         cmirror = self.solid.mirror(list(normal))
@@ -553,7 +580,7 @@ class Sp2LineSplineExtrusionZ(Sp2Shape):
         super().__init__(api)
         self.path = path
         self.ht = ht
-        self.solid = polygon(lineSplineXY(start, path, self._smoothing_segments)).linear_extrude(
+        self.solid = polygon(pointList(self.api.spline_polygon(start, path))).linear_extrude(
             ht
         )
         if api.backup_api is not None:
@@ -575,9 +602,9 @@ class Sp2LineSplineRevolveX(Sp2Shape):
         self.path = path
         self.deg = deg
         _, dimY = dimXY(start, path)
-        segs = ceil(self._smoothing_segments(2 * pi * dimY) * abs(deg) / 360)
+        segs = self.api.revolve_segments(dimY, deg)
         self.solid = (
-            polygon(lineSplineXY(start, path, self._smoothing_segments))
+            polygon(pointList(self.api.spline_polygon(start, path)))
             .rotateZ(90)
             .rotate_extrude(deg, _fn=segs)
             .rotateY(90)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 import copy
-from math import pi, cos, sin, ceil
+from math import pi, cos, sin
 from enum import Enum
 import numpy as np
 NDArray = np.ndarray
@@ -17,12 +17,14 @@ from typing import Union
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import ShapeAPI, Shape, run_api_test, Implementation
+from b13d.api.matrix import translation_matrix, scale_matrix
+from b13d.api.mesh import MeshData
+from b13d.api.cache import PrimitiveCache
 from b13d.api.utils import (
     dimXY,
     ensureClosed2DPath,
     file_ensure_extension,
     isPathCounterClockwise,
-    lineSplineXY,
     pathBoundsArea,
     radians,
     textToGlyphsPaths,
@@ -31,7 +33,7 @@ from b13d.conversion.svg2dxf import svg2dxf_wrapper, SVG2DXF_AVAILABLE
 
 # Check if manifold3d is available for boolean operations
 try:
-    import manifold3d  # noqa: F401
+    from manifold3d import Manifold, OpType
     MANIFOLD3D_AVAILABLE = True
 except ImportError:
     MANIFOLD3D_AVAILABLE = False
@@ -50,10 +52,15 @@ _BOOL_OPS = {
 }
 
 
-def _boolean_op(op_name: str, meshes: list, **kwargs):
-    """Run a trimesh boolean operation with a clear error if manifold3d is missing."""
+def _check_manifold3d() -> None:
+    """Raise a clear error if manifold3d is missing."""
     if not MANIFOLD3D_AVAILABLE:
         raise ModuleNotFoundError(_MANIFOLD3D_INSTALL_HINT)
+
+
+def _boolean_op(op_name: str, meshes: list, **kwargs):
+    """Run a trimesh boolean operation with a clear error if manifold3d is missing."""
+    _check_manifold3d()
     op = _BOOL_OPS.get(op_name)
     if op is None:
         raise ValueError(f"Unknown boolean operation: {op_name}")
@@ -64,9 +71,14 @@ def _boolean_op(op_name: str, meshes: list, **kwargs):
     Encapsulate Trimesh implementation specific calls
 """
 
+# manifolds of primitive meshes, shared by the shapes starting from them
+TM_PRIMITIVES = PrimitiveCache()
+
 
 class TMShapeAPI(ShapeAPI):
 
+    broadphase = True
+
     rotZtoX: NDArray = tm.transformations.rotation_matrix(
         angle=radians(90),
         direction=(0, 1, 0),
@@ -105,6 +117,36 @@ class TMShapeAPI(ShapeAPI):
         # Export the assembly to a GLB file
         scene.export(file_ensure_extension(path, ".glb"))
 
+    def union_all(self, shapes: list[TMShape]) -> TMShape:
+        shapes = [s for s in shapes if s is not None and s.has_solid()]
+        if len(shapes) == 0:
+            return None
+        for s in shapes:
+            s.ensureVolume()
+        joined = shapes[0]
+        if len(shapes) > 1:
+            _check_manifold3d()
+            joined.set_manifold(Manifold.batch_boolean([s.manifold() for s in shapes], OpType.Add))
+        return joined
+
+    def difference_all(self, base: TMShape, cutters: list[TMShape]) -> TMShape:
+        cutters = [c for c in cutters if c is not None and c.has_solid()]
+        if len(cutters) == 0:
+            return base
+        _check_manifold3d()
+        manifolds = [base.manifold()] + [c.manifold() for c in cutters]
+        base.set_manifold(Manifold.batch_boolean(manifolds, OpType.Subtract))
+        return base
+
+    def trim_by_plane(self, shape: TMShape, normal: tuple[float, float, float], offset: float = 0) -> TMShape:
+        if not shape.has_solid():
+            return shape
+        if MANIFOLD3D_AVAILABLE:
+            return shape.set_manifold(shape.manifold().trim_by_plane(normal, offset))
+        normal = np.asarray(normal, dtype=float) / np.linalg.norm(normal)
+        shape.solid = shape.solid.slice_plane(normal * offset, normal, cap=True)
+        return shape
+
     def sphere(self, r: float) -> TMShape:
         return TMBall(r, self)
 
@@ -220,20 +262,101 @@ class TMShapeAPI(ShapeAPI):
     def genImport(self, infile: str, extrude: float = None) -> TMShape:
         return TMImport(infile, extrude=extrude, api=self)
 
+    def mesh_arrays(self, shape: TMShape):
+        if not shape.has_solid():
+            return None
+        shape.flush_transform()
+        if shape.resident():
+            return MeshData.from_manifold(shape.manifold())
+        return MeshData.from_trimesh(shape.solid)
+
+    def triangle_count(self, shape: TMShape) -> int:
+        # counted without applying the pending transform, which does not change it
+        if not shape.has_solid():
+            return None
+        if shape.resident():
+            return shape._manifold.num_tri()
+        return len(shape._solid.faces)
+
+    def mesh_from_arrays(self, vertices, faces) -> TMShape:
+        shape = TMShape(self)
+        shape.solid = MeshData(vertices, faces).to_trimesh()
+        return shape
+
 class TMShape(Shape):
 
+    broadphase = True
+
     X_AXIS = (1, 0, 0)
     Y_AXIS = (0, 1, 0)
     Z_AXIS = (0, 0, 1)
 
+    # booleans run on a manifold kept between them, the trimesh is rebuilt when needed
+    _manifold = None
+    _volume_ok = False  # trimesh known to be a valid volume
+
     def __init__(self, api: TMShapeAPI = TMShapeAPI(implementation=Implementation.TRIMESH)):
         super().__init__(api)
         self.solid: tm.Trimesh = None
 
+    @property
+    def solid(self) -> tm.Trimesh:
+        """ Trimesh of the shape, rebuilt from the manifold of booleans if needed """
+        self.flush_transform()
+        if self.resident():
+            mesh = self._manifold.to_mesh()
+            self._solid = tm.Trimesh(vertices=mesh.vert_properties[:, :3], faces=mesh.tri_verts)
+            self._volume_ok = not self._manifold.is_empty()
+        return self._solid
+
+    @solid.setter
+    def solid(self, solid: tm.Trimesh):
+        Shape.solid.fset(self, solid)
+        self._manifold = None
+        self._volume_ok = False
+
+    def has_solid(self) -> bool:
+        return self._solid is not None or self._manifold is not None
+
+    def resident(self) -> bool:
+        """ True if the shape is only held by its manifold """
+        return self._solid is None and self._manifold is not None
+
+    def manifold(self) -> Manifold:
+        """ Manifold of the shape, converted from the trimesh once """
+        self.flush_transform()
+        if self._manifold is None:
+            self.ensureVolume()
+            self._manifold = MeshData.from_trimesh(self._solid).to_manifold()
+        return self._manifold
+
+    def set_manifold(self, manifold: Manifold) -> TMShape:
+        """ Replace the shape with a manifold, dropping the trimesh """
+        # evaluate the CSG tree of the manifold now, like MFShape
+        manifold.num_tri()
+        self.solid = None
+        self._manifold = manifold
+        return self
+
+    def set_primitive(self, key: tuple, build) -> TMShape:
+        """ Start from the cached manifold of a primitive trimesh built by build() """
+        if not MANIFOLD3D_AVAILABLE:
+            self.solid = build()
+            return self
+        return self.set_manifold(TM_PRIMITIVES.get(key, lambda: MeshData.from_trimesh(build()).to_manifold()))
+
     def ensureVolume(self) -> None:
+        if self._volume_ok or self.resident():
+            # checked since the last change, or a manifold, valid by construction
+            return
+        self._repair_volume()
+        self._volume_ok = True
+
+    def _repair_volume(self) -> None:
         if self.solid.is_volume:
             return
         else:
+            self._manifold = None
             print(
                 "warning: solid is NOT a valid volume, attempt minor repair...",
                 file=sys.stderr,
@@ -266,27 +389,25 @@ class TMShape(Shape):
             self.solid = self.solid.convex_hull
 
     def _smoothing_segments(self, dim: float) -> int:
-        return ceil(abs(dim) ** 0.5 * self.api.fidelity.smoothing_segments())
+        return self.api.smoothing_segments(dim)
 
     def cut(self, cutter: TMShape) -> TMShape:
-        if cutter is None or cutter.solid is None:
+        if cutter is None or not cutter.has_solid():
             return self
-        self.ensureVolume()
-        cutter.ensureVolume()
-        self.solid = _boolean_op("difference", [self.solid, cutter.solid])
-        return self
+        _check_manifold3d()
+        return self.set_manifold(self.manifold() - cutter.manifold())
 
     def intersection(self, intersector: TMShape) -> TMShape:
-        if intersector is None or intersector.solid is None:
+        if intersector is None or not intersector.has_solid():
             return self
-        self.ensureVolume()
-        intersector.ensureVolume()
-        self.solid = _boolean_op("intersection", [self.solid, intersector.solid])
-        return self
+        _check_manifold3d()
+        return self.set_manifold(self.manifold() ^ intersector.manifold())
 
     def dup(self) -> TMShape:
+        # manifolds are immutable and shared, and so is the pending transform
         duplicate = copy.copy(self)
-        duplicate.solid = self.solid.copy()
+        if self._solid is not None:
+            duplicate._solid = self._solid.copy()
         return duplicate
 
     def fillet(
@@ -343,32 +464,25 @@ class TMShape(Shape):
         return self
 
     def join(self, joiner: TMShape) -> TMShape:
-        if joiner is None or joiner.solid is None:
+        if joiner is None or not joiner.has_solid():
             return self
-
-        self.ensureVolume()
-        joiner.ensureVolume()
-        self.solid = _boolean_op("union", [self.solid, joiner.solid])
-        return self
+        _check_manifold3d()
+        return self.set_manifold(self.manifold() + joiner.manifold())
 
     def mirror(self, normal=(0, 1, 0)) -> TMShape:
-        dup = copy.copy(self)
         reflect_mat = tm.transformations.reflection_matrix([0, 0, 0], normal)
-        dup.solid = self.solid.copy().apply_transform(reflect_mat)
-        return dup
+        return self.dup().defer_transform(reflect_mat)
 
     def mv(self, x: float, y: float, z: float) -> TMShape:
         if x == 0 and y == 0 and z == 0:
             return self
-        self.solid = self.solid.apply_translation((x, y, z))
-        return self
+        return self.defer_transform(translation_matrix(x, y, z))
 
     def _rotate(self, ang: float, dir: tuple[float, float, float]) -> TMShape:
         if ang == 0:
             return self
         rotMat = tm.transformations.rotation_matrix(angle=radians(ang), direction=dir)
-        self.solid = self.solid.apply_transform(rotMat)
-        return self
+        return self.defer_transform(rotMat)
 
     def rotate_x(self, ang: float) -> TMShape:
         return self._rotate(ang, self.X_AXIS)
@@ -382,7 +496,14 @@ class TMShape(Shape):
     def scale(self, x: float, y: float, z: float) -> TMShape:
         if x == 1 and y == 1 and z == 1:
             return self
-        self.solid = self.solid.apply_scale((x, y, z))
+        return self.defer_transform(scale_matrix(x, y, z))
+
+    def transform(self, matrix) -> TMShape:
+        if self._manifold is not None:
+            return self.set_manifold(self._manifold.transform(np.asarray(matrix)[:3, :4]))
+        volume_ok = self._volume_ok
+        self.solid = self._solid.apply_transform(matrix)
+        self._volume_ok = volume_ok
         return self
 
     def set_color(self, rgb: tuple[int, int, int] | Enum = None) -> Shape:
@@ -395,7 +516,22 @@ class TMShape(Shape):
         return self
     
     def bbox(self) -> tuple[float, float, float]:
-        min_bounds, max_bounds = self.solid.bounds
+        # bounds of the transformed shape, leaving the pending transform to the next boolean
+        if self.resident():
+            if self._manifold.is_empty():
+                return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+            manifold = self._manifold
+            if self._pending is not None:
+                manifold = manifold.transform(self._pending[:3, :4])
+            xmin, ymin, zmin, xmax, ymax, zmax = manifold.bounding_box()
+            return (xmin, xmax, ymin, ymax, zmin, zmax)
+        if self._solid.bounds is None:
+            # empty mesh
+            return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        min_bounds, max_bounds = self._solid.bounds
+        if self._pending is not None:
+            vertices = tm.transform_points(self._solid.vertices, self._pending)
+            min_bounds, max_bounds = vertices.min(axis=0), vertices.max(axis=0)
         # print(f"min_bounds: {min_bounds}, max_bounds: {max_bounds}")
         return (min_bounds[0], max_bounds[0],
                 min_bounds[1], max_bounds[1],
@@ -470,8 +606,9 @@ class TMBall(TMShape):
     def __init__(self, rad: float, api: TMShapeAPI):
         super().__init__(api)
         segs = self._smoothing_segments(2 * pi * rad)
-        self.solid = tm.creation.uv_sphere(
-            radius=rad, count=(segs, segs), validate=True
+        self.set_primitive(
+            ("sphere", rad, segs),
+            lambda: tm.creation.uv_sphere(radius=rad, count=(segs, segs), validate=True),
         )
 
 
@@ -498,7 +635,7 @@ class TMBox(TMShape):
         self.ln = l
         self.wth = wth
         self.ht = ht
-        self.solid = tm.creation.box(extents=(l, wth, ht), validate=True)
+        self.set_primitive(("box", l, wth, ht), lambda: tm.creation.box(extents=(l, wth, ht), validate=True))
 
 
 class TMCone(TMShape):
@@ -514,8 +651,9 @@ class TMCone(TMShape):
         super().__init__(api)
         sects = self._smoothing_segments(2 * pi * max(r1, r2)) if sides is None else sides
         linestring = [[0, 0], [r1, 0], [r2, l], [0, l]]
-        self.solid = tm.creation.revolve(
-            linestring=linestring, sections=sects, transform=rotMat, validate=True
+        self.set_primitive(
+            ("cone", l, r1, r2, sects, None if rotMat is None else rotMat.tobytes()),
+            lambda: tm.creation.revolve(linestring=linestring, sections=sects, transform=rotMat, validate=True),
         )
 
 
@@ -536,8 +674,9 @@ class TMRod(TMShape):
     ):
         super().__init__(api)
         segs = self._smoothing_segments(2 * pi * rad) if sides is None else sides
-        self.solid = tm.creation.cylinder(
-            radius=rad, height=l, sections=segs, transform=rotMat, validate=True
+        self.set_primitive(
+            ("rod", l, rad, segs, None if rotMat is None else rotMat.tobytes()),
+            lambda: tm.creation.cylinder(radius=rad, height=l, sections=segs, transform=rotMat, validate=True),
         )
 
 
@@ -555,7 +694,7 @@ class TMLineSplineExtrusionZ(TMShape):
         super().__init__(api)
         self.path = path
         self.ht = ht
-        polygon = Polygon(lineSplineXY(start, path, self._smoothing_segments))
+        polygon = Polygon(self.api.spline_polygon(start, path))
         self.solid = tm.creation.extrude_polygon(polygon, ht)  # , validate=True)
 
 
@@ -571,11 +710,11 @@ class TMLineSplineRevolveX(TMShape):
     ):
         super().__init__(api)
         _, dimY = dimXY(start, path)
-        segsY = ceil(self._smoothing_segments(2 * pi * dimY) * abs(deg) / 360)
+        # full revolve, see below
+        segsY = self.api.revolve_segments(dimY)
         self.path = path
         self.deg = deg
-        linestring = lineSplineXY(start, path, self._smoothing_segments)
-        stringSwapXY = [(y, x) for x, y in linestring]
+        stringSwapXY = self.api.spline_polygon(start, path)[:, ::-1]
 
         # revolve by 360 then cut away wedge to get valid volume as work around for
         # https://github.com/mikedh/trimesh/issues/2269
@@ -679,7 +818,8 @@ class TMTextZ(TMShape):
             print(f"Can't find font {fontName}, substitude with {fontPath}")
 
         glyphs_paths = textToGlyphsPaths(
-            fontPath, txt, fontSize, dimToSegs=self._smoothing_segments
+            fontPath, txt, fontSize, dimToSegs=self._smoothing_segments,
+            segsKey=self.api.segments_key(),
         )
 
         text3d: tm.Trimesh = None
@@ -769,6 +909,42 @@ class TMImport(TMShape):
             self.solid = dxf2mesh(outfile, extrude)
         elif fext in [".dxf"]:
             self.solid = dxf2mesh(infile, extrude)
-        
+
+
+def test_tm_resident_manifold(self):
+    """ Test consecutive trimesh booleans on a resident manifold """
+    api = TMShapeAPI(implementation=Implementation.TRIMESH)
+
+    shape = api.box(10, 10, 10)
+    shape.cut(api.box(2, 2, 20)).cut(api.box(20, 2, 2).mv(0, 0, 3))
+    self.assertTrue(shape.resident())
+    manifold = shape.manifold()
+
+    # transforms and bounds stay on the manifold
+    shape.mv(0, 0, 5).rotate_z(90)
+    bbox = shape.bbox()
+    self.assertTrue(shape.resident())
+    self.assertAlmostEqual(bbox[4], 0, places=5)
+    self.assertAlmostEqual(bbox[5], 10, places=5)
+
+    # duplicates share the manifold and keep the pending transform
+    copy = shape.dup()
+    self.assertIs(copy._manifold, shape._manifold)
+    self.assertIsNotNone(copy._pending)
+    mirrored = shape.mirror((0, 0, 1))
+    self.assertAlmostEqual(mirrored.top(), 0, places=5)
+
+    # the trimesh is rebuilt once, valid, and keeps the manifold for the next boolean
+    volume = 1000 - 2 * 2 * 10 - 2 * 2 * 8
+    self.assertAlmostEqual(shape.solid.volume, volume, places=3)
+    self.assertAlmostEqual(mirrored.solid.volume, volume, places=3)
+    self.assertTrue(shape._volume_ok and not shape.resident())
+    self.assertIsNot(shape.manifold(), manifold)
+    self.assertIs(shape.manifold(), shape.manifold())
+
+    joined = api.union_all([shape, api.box(1, 1, 1).mv(0, 0, 20)])
+    self.assertAlmostEqual(joined.solid.volume, volume + 1, places=3)
+
+
 if __name__ == "__main__":
     run_api_test("trimesh")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+"""
+    Opt-in tracing of Solid generation, Shape booleans and exports
+"""
+
+from __future__ import annotations
+
+import csv
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from json_tricks import dumps
+
+TRACE_SUMMARY_COLS = [
+    "name",
+    "cat",
+    "calls",
+    "total_time",
+    "self_time",
+    "triangles_in",
+    "triangles_out",
+]
+
+def triangle_count(obj) -> int:
+    """ Triangle count of a Shape or list of Shapes, None if not available """
+    if isinstance(obj, (list, tuple)):
+        counts = [triangle_count(o) for o in obj]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if len(counts) > 0 else None
+    api = getattr(obj, "api", None)
+    if api is None or not hasattr(api, "triangle_count"):
+        return None
+    return api.triangle_count(obj)
+
+class Tracer:
+    """
+    Records nested timing spans while enabled.
+
+    Spans are exported as complete events of the Chrome trace format,
+    which can be opened with chrome://tracing, Perfetto or speedscope,
+    together with a flat summary of total and self time per span name.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self._stack = []
+        self._t0 = 0
+        self._start_time = 0
+
+    def start(self):
+        """ Clear recorded spans and start recording """
+        self.events = []
+        self._stack = []
+        self._t0 = time.perf_counter()
+        self._start_time = time.time()
+        self.enabled = True
+
+    def stop(self):
+        """ Stop recording """
+        self.enabled = False
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args):
+        """ Record a span, the yielded dict can be updated with more span arguments """
+        if not self.enabled:
+            yield args
+            return
+
+        frame = {"child_time": 0}
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            dur = time.perf_counter() - start
+            self._stack.pop()
+            if len(self._stack) > 0:
+                self._stack[-1]["child_time"] += dur
+            self.events.append({
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start - self._t0) * 1e6,
+                "dur": dur * 1e6,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": args | {"self_time": dur - frame["child_time"]},
+            })
+
+    def add_events(self, events: list, start_time: float):
+        """ Add spans recorded by the tracer of another process, started at start_time """
+        shift = (start_time - self._start_time) * 1e6
+        self.events += [e | {"ts": e["ts"] + shift} for e in events]
+
+    def summary(self) -> list:
+        """ Return total and self time per span name, largest self time first """
+        rows = {}
+        for e in self.events:
+            row = rows.setdefault((e["name"], e["cat"]), {
+                "name": e["name"],
+                "cat": e["cat"],
+                "calls": 0,
+                "total_time": 0,
+                "self_time": 0,
+                "triangles_in": 0,
+                "triangles_out": 0,
+            })
+            row["calls"] += 1
+            row["total_time"] += e["dur"] / 1e6
+            row["self_time"] += e["args"]["self_time"]
+            row["triangles_in"] += e["args"].get("triangles_in") or 0
+            row["triangles_out"] += e["args"].get("triangles_out") or 0
+        return sorted(rows.values(), key=lambda r: r["self_time"], reverse=True)
+
+    def export(self, outpath: str, fname: str) -> str:
+        """ Save recorded spans as Chrome trace .json and summary .csv, return .json file name """
+        json_fname = os.path.join(outpath, fname + "_trace.json")
+        with open(json_fname, "w", encoding="UTF8") as f:
+            f.write(dumps({"traceEvents": self.events, "displayTimeUnit": "ms"}, indent=1))
+
+        csv_fname = os.path.join(outpath, fname + "_trace.csv")
+        summary = self.summary()
+        with open(csv_fname, "w", newline="", encoding="UTF8") as f:
+            writer = csv.DictWriter(f, fieldnames=TRACE_SUMMARY_COLS)
+            writer.writeheader()
+            writer.writerows(summary)
+
+        print(f"# Trace: {json_fname}")
+        for row in summary:
+            print(
+                f"#   {row['name']:32s} {row['cat']:8s} x{row['calls']:<4d}"
+                f" total {row['total_time']:8.3f}s self {row['self_time']:8.3f}s"
+            )
+        return json_fname
+
+TRACER = Tracer()
+
+def traced(cat: str):
+    """ Decorator recording a span per call while TRACER is enabled,
+        with triangle counts of Shape arguments and result """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not TRACER.enabled:
+                return func(self, *args, **kwargs)
+            # operands are counted outside the span, so that lazy kernels
+            # evaluate them in the span that built them
+            triangles_in = triangle_count(
+                ([self] if cat == "boolean" and hasattr(self, "api") else [])
+                + [a for a in list(args) + list(kwargs.values()) if a is not None]
+            )
+            with TRACER.span(
+                func.__qualname__, cat, triangles_in=triangles_in
+            ) as span_args:
+                result = func(self, *args, **kwargs)
+                if cat == "boolean":
+                    span_args["triangles_out"] = triangle_count(result)
+            return result
+        wrapper.traced = True
+        return wrapper
+    return decorator
+
+def trace_methods(cls, names: list, cat: str):
+    """ Trace methods defined by a class, used by base classes on subclass creation """
+    for name in names:
+        func = cls.__dict__.get(name)
+        if func is not None and not getattr(func, "traced", False):
+            setattr(cls, name, traced(cat)(func))
+
+def test_tracer(self):
+    """ Test Tracer """
+    import tempfile
+    from unittest import mock
+    from b13d.parts.tube import Tube
+
+    with tempfile.TemporaryDirectory() as outdir:
+        tube = Tube(args=['-i', 'mf', '-nc', '-tr', '-o', outdir, '-odoff'])
+        tube.export_stl()
+        self.assertFalse(TRACER.enabled)
+
+        names = [e["name"] for e in TRACER.events]
+        self.assertIn("Tube", names)
+        self.assertIn("MFShape.cut", names)
+        self.assertIn("MFShapeAPI.export", names)
+
+        cut = next(e for e in TRACER.events if e["name"] == "MFShape.cut")
+        self.assertGreater(cut["args"]["triangles_in"], 0)
+        self.assertGreater(cut["args"]["triangles_out"], 0)
+
+        # spans are nested within the solid generation span
+        gen = next(e for e in TRACER.events if e["name"] == "Tube")
+        self.assertGreaterEqual(cut["ts"], gen["ts"])
+        self.assertLessEqual(cut["ts"] + cut["dur"], gen["ts"] + gen["dur"] + 1)
+
+        out_path = os.path.dirname(tube.export_stl())
+        self.assertTrue(os.path.isfile(os.path.join(out_path, "Tube_trace.json")))
+        self.assertTrue(os.path.isfile(os.path.join(out_path, "Tube_trace.csv")))
+
+        # counting triangles does not change the exported geometry
+        from b13d.parts.screw_holder import ScrewHolder
+        stls = []
+        for trace in [[], ['-tr']]:
+            holder = ScrewHolder(args=['-i', 'mf', '-nc', '-o', os.path.join(outdir, f'holder{len(stls)}'), '-odoff'] + trace)
+            with open(holder.export_stl(), 'rb') as f:
+                stls.append(f.read())
+        self.assertEqual(stls[0], stls[1])
+
+        # tracing stops when the export fails
+        failing = Tube(args=['-i', 'mf', '-nc', '-tr', '-o', outdir, '-odoff'])
+        with mock.patch.object(failing, 'export', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                failing.export_stl()
+        self.assertFalse(TRACER.enabled)
@@ -3,13 +3,16 @@
 from fontTools.ttLib import TTFont
 from fontTools.pens.basePen import BasePen
 from fontTools.misc.bezierTools import approximateQuadraticArcLength, quadraticPointAtT
-from math import ceil, inf, sqrt, pi
+from collections import OrderedDict
+from math import ceil, cos, inf, sqrt, pi
 import os
 from pathlib import Path
 import sys
-from typing import Callable, Union
+from typing import Callable, Hashable, Union
 import time
 
+import numpy as np
+
 def radians(deg: float = 0) -> float:
     return deg * pi / 180
 
@@ -88,16 +91,53 @@ def ensureClosed2DPath(path: list[tuple[float, float]]) -> list[tuple[float, flo
     return path
 
 
-def frange(start: float, stop: float, step: float):
-    count = 0
-    while True:
-        temp = float(start + count * step)
-        if step > 0 and temp >= stop:
-            break
-        elif step < 0 and temp <= stop:
-            break
-        yield temp
+def frangeCount(start: float, stop: float, step: float) -> int:
+    """ Number of values of frange """
+    if step == 0:
+        raise ValueError("frange step must not be zero")
+    inside = (lambda v: v < stop) if step > 0 else (lambda v: v > stop)
+    # the estimate may be off by one with rounding
+    count = max(0, ceil((stop - start) / step))
+    while count > 0 and not inside(start + (count - 1) * step):
+        count -= 1
+    while inside(start + count * step):
         count += 1
+    return count
+
+
+def frangeArray(start: float, stop: float, step: float) -> np.ndarray:
+    """ Array of start + i * step, for i = 0, 1, ... up to stop excluded """
+    return start + np.arange(frangeCount(start, stop, step)) * step
+
+
+def frange(start: float, stop: float, step: float):
+    return iter(frangeArray(start, stop, step).tolist())
+
+
+def pointList(points: np.ndarray) -> list[tuple[float, float]]:
+    """ List of point tuples of a (N, 2) array """
+    return list(map(tuple, points.tolist()))
+
+
+def cubicBezier(ctrlPts: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """
+    (N, 2) points of cubic Bézier curves at N parameters t.
+    ctrlPts are the (4, 2) control points of one curve, or (N, 4, 2) for each parameter
+    """
+    s = 1 - t
+    basis = np.stack([s * s * s, 3 * s * s * t, 3 * s * t * t, t * t * t], axis=-1)
+    if ctrlPts.ndim == 2:
+        return basis @ ctrlPts
+    return np.einsum("nk,nkd->nd", basis, ctrlPts)
+
+
+def bezierSegmentArray(p0, p1, p2, p3, num_points=50) -> np.ndarray:
+    """
+    Generate points along a cubic Bézier curve, as a (N, 2) array.
+    p0, p1, p2, p3 are the control points.
+    """
+    ctrlPts = np.array([p0[0:2], p1[0:2], p2[0:2], p3[0:2]], dtype=float)
+    return cubicBezier(ctrlPts, frangeArray(0.0, 1.0, 1.0 / num_points))
 
 
 def bezierSegment(p0, p1, p2, p3, num_points=50) -> list[tuple[float, float]]:
@@ -105,22 +145,54 @@ def bezierSegment(p0, p1, p2, p3, num_points=50) -> list[tuple[float, float]]:
     Generate points along a cubic Bézier curve.
     p0, p1, p2, p3 are the control points.
     """
-    curve_points = []
-    for t in frange(0.0, 1.0, 1.0 / num_points):
-        x = (
-            (1 - t) ** 3 * p0[0]
-            + 3 * (1 - t) ** 2 * t * p1[0]
-            + 3 * (1 - t) * t**2 * p2[0]
-            + t**3 * p3[0]
-        )
-        y = (
-            (1 - t) ** 3 * p0[1]
-            + 3 * (1 - t) ** 2 * t * p1[1]
-            + 3 * (1 - t) * t**2 * p2[1]
-            + t**3 * p3[1]
-        )
-        curve_points.append((x, y))
-    return curve_points
+    return pointList(bezierSegmentArray(p0, p1, p2, p3, num_points))
+
+
+def bezierFlatness(ctrlPts: np.ndarray) -> np.ndarray:
+    """
+    Bound of the distance between (N, 4, 2) cubic Bézier curves and their chords:
+    3/4 of the largest distance of the inner control points to the chord
+    """
+    p0 = ctrlPts[:, 0, None, :]
+    chord = ctrlPts[:, 3, None, :] - p0
+    inner = ctrlPts[:, 1:3, :] - p0
+    chordLen2 = np.sum(chord * chord, axis=-1)
+    # distance to the chord segment, not to its line, to catch curves folding back
+    t = np.clip(np.sum(inner * chord, axis=-1) / np.where(chordLen2 > 0, chordLen2, 1), 0, 1)
+    dist = np.linalg.norm(inner - t[..., None] * chord, axis=-1)
+    return 0.75 * np.max(dist, axis=-1)
+
+
+def bezierSplit(ctrlPts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """ Halves of (N, 4, 2) cubic Bézier curves, by de Casteljau subdivision """
+    p0, p1, p2, p3 = [ctrlPts[:, i] for i in range(4)]
+    p01, p12, p23 = (p0 + p1) / 2, (p1 + p2) / 2, (p2 + p3) / 2
+    p012, p123 = (p01 + p12) / 2, (p12 + p23) / 2
+    mid = (p012 + p123) / 2
+    return np.stack([p0, p01, p012, mid], axis=1), np.stack([mid, p123, p23, p3], axis=1)
+
+
+def adaptiveBezierArray(ctrlPts: np.ndarray, tolerance: float, maxDepth: int = 16) -> np.ndarray:
+    """
+    Points of a chain of (N, 4, 2) cubic Bézier curves, end points excluded,
+    subdivided until each chord is within tolerance [mm] of its curve.
+    Nearly straight spans get one chord, tight bends as many as they need.
+    """
+    curves = ctrlPts
+    for _ in range(maxDepth):
+        split = bezierFlatness(curves) > tolerance
+        if not np.any(split):
+            break
+        # each curve is kept, or replaced in place by its halves
+        counts = 1 + split
+        pos = np.cumsum(counts) - counts
+        left, right = bezierSplit(curves[split])
+        subdivided = np.empty((len(curves) + len(left), 4, 2))
+        subdivided[pos[~split]] = curves[~split]
+        subdivided[pos[split]] = left
+        subdivided[pos[split] + 1] = right
+        curves = subdivided
+    return curves[:, 0, :]
 
 
 def superGradient(dy: float, dx: float) -> float:
@@ -132,10 +204,11 @@ def superGradient(dy: float, dx: float) -> float:
         return dy / dx
 
 
-def descreteBezierChain(
+def descreteBezierChainArray(
     xyGradPrePost: list[tuple[float, ...]],
     segsByLenFunc: Callable[[float], float] = None,
-) -> list[tuple[float, float]]:
+    tolerance: float = None,
+) -> np.ndarray:
     """
     Generate a chain of cubic Bézier curves from a list of points with directional derivatives.
 
@@ -147,9 +220,12 @@ def descreteBezierChain(
         if no post-control span length ratio is given, .5 is assumed.
     segsByLenFunc (Callable[[float], float]):
         A function that determines the number of segments for a given length.
+    tolerance (float):
+        Maximum distance between the curves and their chords [mm].
+        If given, the curves are sampled adaptively and segsByLenFunc is ignored.
 
     Returns:
-    list[tuple[float, float]]: A list of points that make up the Bézier curves.
+    np.ndarray: (N, 2) array of the points that make up the Bézier curves.
 
     Notes:
     Using x0, y0, grad0, ctrlLen0 from ratio against span length, x1, y1, to compute dx0, dy0.
@@ -167,12 +243,15 @@ def descreteBezierChain(
     """
 
     if len(xyGradPrePost) <= 0:
-        return []
+        return np.empty((0, 2))
     elif len(xyGradPrePost) == 1:
         x0, y0 = xyGradPrePost[0][0:2]
-        return [(x0, y0)]
+        return np.array([(x0, y0)], dtype=float)
 
-    res: list[tuple[float, float]] = []
+    # control points, parameter step and number of points of each span
+    ctrlPts: list[tuple[tuple[float, float], ...]] = []
+    steps: list[float] = []
+    counts: list[int] = []
     prevX, prevY = xyGradPrePost[0][0:2]
     x1, y1 = xyGradPrePost[1][0:2]
     prevGrad = (
@@ -196,7 +275,6 @@ def descreteBezierChain(
         curPreRatio = 0.5 if len(xygpp) < 4 else xygpp[3]
         curPostRatio = 0.5 if len(xygpp) < 5 else xygpp[4]
         spanLen = sqrt((curX - prevX) ** 2 + (curY - prevY) ** 2)
-        segs = spanLen if segsByLenFunc is None else segsByLenFunc(spanLen)
         prevCtrlLen = prevPostRatio * spanLen
         prevDX = (
             0
@@ -215,14 +293,11 @@ def descreteBezierChain(
         curDY = sqrt(curCtrlLen**2 - curDX**2)
         curCtrlX = curX - curDX * (1 if curX >= prevX else -1)
         curCtrlY = curY - curDY * (1 if curY >= prevY else -1)
-        curvePts = bezierSegment(
-            (prevX, prevY),
-            (prevCtrlX, prevCtrlY),
-            (curCtrlX, curCtrlY),
-            (curX, curY),
-            segs,
-        )
-        res.extend(curvePts)
+        ctrlPts.append(((prevX, prevY), (prevCtrlX, prevCtrlY), (curCtrlX, curCtrlY), (curX, curY)))
+        if tolerance is None:
+            segs = spanLen if segsByLenFunc is None else segsByLenFunc(spanLen)
+            steps.append(1.0 / segs)
+            counts.append(frangeCount(0.0, 1.0, steps[-1]))
         prevX, prevY, prevGrad, prevPreRatio, prevPostRatio = (
             curX,
             curY,
@@ -230,7 +305,24 @@ def descreteBezierChain(
             curPreRatio,
             curPostRatio,
         )
-    return res
+
+    if tolerance is not None:
+        return adaptiveBezierArray(np.array(ctrlPts, dtype=float), tolerance)
+
+    # evaluate all spans at once, the parameters of a span are its point indices times its step
+    ends = np.cumsum(counts)
+    index = np.arange(ends[-1]) - np.repeat(ends - counts, counts)
+    t = index * np.repeat(steps, counts)
+    return cubicBezier(np.repeat(np.array(ctrlPts, dtype=float), counts, axis=0), t)
+
+
+def descreteBezierChain(
+    xyGradPrePost: list[tuple[float, ...]],
+    segsByLenFunc: Callable[[float], float] = None,
+    tolerance: float = None,
+) -> list[tuple[float, float]]:
+    """ List of points of descreteBezierChainArray """
+    return pointList(descreteBezierChainArray(xyGradPrePost, segsByLenFunc, tolerance))
 
 
 # draw mix of straight lines from pt to pt, draw spline when given list of (x,y,dx,dy)
@@ -243,9 +335,14 @@ def lineSplineXY(
     lineToFunc: Callable[[any, tuple[float, float]], any] = None,
     curveThruFunc: Callable[[any, list[tuple[float, float]]], any] = None,
     wrapUpFunc: Callable[[any], any] = None,
+    tolerance: float = None,
 ) -> any:
+    if initFunc is None and lineToFunc is None and curveThruFunc is None and wrapUpFunc is None:
+        return pointList(lineSplineXYArray(start, path, segsByLenFunc, tolerance))
+
     result = [start] if initFunc is None else initFunc(start)
 
+    lastX, lastY = start
     for p_or_s in path:
         if isinstance(p_or_s, tuple):
             # a point so draw line
@@ -264,7 +361,7 @@ def lineSplineXY(
                 dy0 = y1 - lastY
                 grad0 = superGradient(dy=dy0, dx=dx0)
                 spline.insert(0, (lastX, lastY, grad0, 0, 0.5))
-            curvePts = descreteBezierChain(spline, segsByLenFunc)
+            curvePts = descreteBezierChain(spline, segsByLenFunc, tolerance)
             if curveThruFunc is None:
                 result.extend(curvePts)
             else:
@@ -279,6 +376,92 @@ def lineSplineXY(
     return ensureClosed2DPath(result) if wrapUpFunc is None else wrapUpFunc(result)
 
 
+def lineSplineXYArray(
+    start: tuple[float, float],
+    path: list[Union[tuple[float, float], list[tuple[float, float, float, float]]]],
+    segsByLenFunc: Callable[[float], float] = None,
+    tolerance: float = None,
+) -> np.ndarray:
+    """ Closed path of lineSplineXY, as a (N, 2) array """
+    pieces: list[np.ndarray] = [np.array([start], dtype=float)]
+    linePts: list[tuple[float, float]] = []
+
+    lastX, lastY = start
+    for p_or_s in path:
+        if isinstance(p_or_s, tuple):
+            # a point so draw line
+            lastX, lastY = p_or_s
+            linePts.append((lastX, lastY))
+        elif isinstance(p_or_s, list):
+            # a list of points and gradients/tangents to trace spline thru
+            spline: list[tuple[float, ...]] = p_or_s
+            x1, y1 = spline[0][0:2]
+            # insert first point if diff from last
+            if lastX != x1 or lastY != y1:
+                grad0 = superGradient(dy=y1 - lastY, dx=x1 - lastX)
+                spline.insert(0, (lastX, lastY, grad0, 0, 0.5))
+            curvePts = descreteBezierChainArray(spline, segsByLenFunc, tolerance)
+            if len(linePts) > 0:
+                pieces.append(np.array(linePts, dtype=float))
+                linePts = []
+            pieces.append(curvePts)
+            lastX, lastY = spline[-1][0:2]
+            if lastX != curvePts[-1, 0] or lastY != curvePts[-1, 1]:
+                linePts.append((lastX, lastY))
+    if len(linePts) > 0:
+        pieces.append(np.array(linePts, dtype=float))
+
+    result = np.concatenate(pieces)
+    if not np.array_equal(result[0], result[-1]):
+        result = np.concatenate([result, result[:1]])
+    return result
+
+
+def polygonArea(points: np.ndarray) -> float:
+    """ Signed area of a polygon, positive if counter clockwise """
+    x, y = np.asarray(points, dtype=float)[:, 0:2].T
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def offsetPolygon(
+    points: np.ndarray,
+    delta: float,
+    bounds: tuple[tuple[float, float], tuple[float, float]] = None,
+) -> np.ndarray:
+    """
+    Closed polygon grown by delta, or shrunk if delta is negative, optionally clipped
+    to bounds ((minX, minY), (maxX, maxY)). Corners are mitered, so that smooth
+    outlines keep their number of points. Keeps the orientation of points,
+    and the largest polygon if the offset splits it
+    """
+    try:
+        from manifold3d import CrossSection, FillRule, JoinType
+    except ImportError:
+        CrossSection = None
+
+    if CrossSection is not None:
+        section = CrossSection([np.asarray(points, dtype=float)[:, 0:2]], FillRule.EvenOdd)
+        section = section.offset(delta, JoinType.Miter)
+        if bounds is not None:
+            (minX, minY), (maxX, maxY) = bounds
+            section = section ^ CrossSection.square((maxX - minX, maxY - minY)).translate((minX, minY))
+        polygons = [np.asarray(p, dtype=float) for p in section.to_polygons()]
+    else:
+        from shapely.geometry import Polygon, box
+        shape = Polygon(points).buffer(delta, join_style="mitre", mitre_limit=2)
+        if bounds is not None:
+            (minX, minY), (maxX, maxY) = bounds
+            shape = shape.intersection(box(minX, minY, maxX, maxY))
+        polygons = [np.array(g.exterior.coords)[:-1] for g in getattr(shape, "geoms", [shape]) if not g.is_empty]
+
+    if len(polygons) == 0:
+        return np.empty((0, 2))
+    polygon = max(polygons, key=lambda p: abs(polygonArea(p)))
+    if (polygonArea(polygon) > 0) != (polygonArea(points) > 0):
+        polygon = polygon[::-1]
+    return np.concatenate([polygon, polygon[:1]])
+
+
 def simplifyLineSpline(
     start: tuple[float, float],
     path: list[tuple[float, float] | list[tuple[float, ...]]],
@@ -572,66 +755,68 @@ END-ISO-10303-21;
     assert os.path.isfile(fout)
     return fout
 
-def getFontname2FilepathMap() -> dict[str, str]:
-
-    font2path: dict[str, str] = {}
-
-    # Define directories to search for fonts
+def fontDirectories() -> list[str]:
+    """ Platform directories searched for fonts """
     if sys.platform == "win32":
-        font_dirs = [os.path.join(os.environ["WINDIR"], "Fonts")]
+        return [os.path.join(os.environ["WINDIR"], "Fonts")]
     elif sys.platform == "darwin":
-        font_dirs = [
+        return [
             "/Library/Fonts",
             "/System/Library/Fonts",
             os.path.expanduser("~/Library/Fonts"),
         ]
     else:  # Assume Linux or other UNIX-like system
-        font_dirs = [
+        return [
             "/usr/share/fonts",
             "/usr/local/share/fonts",
             os.path.expanduser("~/.fonts"),
         ]
 
-    def list_fonts(directory):
-        fonts = []
+def listFonts(directory: str) -> list[tuple[str, str]]:
+    """ (font name, font path) of the TTF and OTF fonts in directory and its subdirectories """
+    fonts = []
 
-        # Helper function to get the string by its name ID
-        def get_name(font: TTFont, nameID: int):
+    # Helper function to get the string by its name ID
+    def get_name(font: TTFont, nameID: int):
+        name_record = font["name"].getName(
+            nameID=nameID, platformID=3, platEncID=1
+        )
+        if name_record is None:
             name_record = font["name"].getName(
-                nameID=nameID, platformID=3, platEncID=1
+                nameID=nameID, platformID=1, platEncID=0
             )
-            if name_record is None:
-                name_record = font["name"].getName(
-                    nameID=nameID, platformID=1, platEncID=0
-                )
-            return name_record.toStr() if name_record else "Unknown"
-
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.lower().endswith((".ttf", ".otf")):
-                    font_path = os.path.join(root, file)
-                    try:
-                        font = TTFont(font_path)
-                        # Get the Font Family Name (name ID 1)
-                        family = get_name(font, 1)
-                        # Get the Font Subfamily Name (Style) (name ID 2)
-                        style = get_name(font, 2)
-
-                        font_name = (
-                            family
-                            if style == "Normal" or style == "Regular"
-                            else family + " " + style
-                        )
-                        fonts.append((font_name, font_path))
-                    except Exception as e:
-                        print(f"Error reading {font_path}: {e}")
-        return fonts
+        return name_record.toStr() if name_record else "Unknown"
+
+    for root, _, files in os.walk(directory):
+        for file in files:
+            if file.lower().endswith((".ttf", ".otf")):
+                font_path = os.path.join(root, file)
+                try:
+                    font = TTFont(font_path)
+                    # Get the Font Family Name (name ID 1)
+                    family = get_name(font, 1)
+                    # Get the Font Subfamily Name (Style) (name ID 2)
+                    style = get_name(font, 2)
+
+                    font_name = (
+                        family
+                        if style == "Normal" or style == "Regular"
+                        else family + " " + style
+                    )
+                    fonts.append((font_name, font_path))
+                except Exception as e:
+                    print(f"Error reading {font_path}: {e}")
+    return fonts
+
+def getFontname2FilepathMap() -> dict[str, str]:
+
+    font2path: dict[str, str] = {}
 
     # Collect fonts from all directories
     all_fonts = []
-    for directory in font_dirs:
+    for directory in fontDirectories():
         if os.path.exists(directory):
-            all_fonts.extend(list_fonts(directory))
+            all_fonts.extend(listFonts(directory))
 
     # Print the font names and paths
     for name, path in all_fonts:
@@ -641,37 +826,111 @@ def getFontname2FilepathMap() -> dict[str, str]:
     return font2path
 
 
+class _PathExtractor(BasePen):
+    def __init__(self, glyphSet):
+        super().__init__(glyphSet)
+        self.paths = []
+
+    def _moveTo(self, p0):
+        self.current_path = [("moveTo", p0)]
+
+    def _lineTo(self, p1):
+        self.current_path.append(("lineTo", p1))
+
+    def _curveToOne(self, p1, p2, p3):
+        self.current_path.append(("curveTo", p1, p2, p3))
+
+    def _closePath(self):
+        self.current_path.append(("closePath",))
+        self.paths.append(self.current_path)
+        self.current_path = []
+
+# fonts parsed once per process: font path -> (glyph set, cmap, units per em)
+_PARSED_FONTS: dict[str, tuple] = {}
+
+# flattened glyph contours: (font path, glyph name, scale, segments key) -> (contours, advance width)
+GLYPH_CACHE_SIZE = 4096
+_GLYPH_CONTOURS: OrderedDict = OrderedDict()
+
+def parsedFont(font_path: str) -> tuple:
+    """ Return glyph set, character map and units per em of a font, parsed once """
+    parsed = _PARSED_FONTS.get(font_path)
+    if parsed is None:
+        font = TTFont(font_path)
+        parsed = (font.getGlyphSet(), font["cmap"].getBestCmap(), font['head'].unitsPerEm)
+        _PARSED_FONTS[font_path] = parsed
+    return parsed
+
+def glyphContours(
+    font_path: str,
+    glyph_name: str,
+    scale: float,
+    dimToSegs: Callable[[float], float],
+    segsKey: Hashable = None,
+) -> tuple[list[list[tuple[float, float]]], float]:
+    """
+        Return the contours of a glyph flattened at scale, relative to the glyph origin,
+        and its advance width. Cached when segsKey identifies dimToSegs
+    """
+    key = None if segsKey is None else (font_path, glyph_name, scale, segsKey)
+    if key in _GLYPH_CONTOURS:
+        _GLYPH_CONTOURS.move_to_end(key)
+        return _GLYPH_CONTOURS[key]
+
+    glyph_set = parsedFont(font_path)[0]
+    glyph = glyph_set[glyph_name]
+    extractor = _PathExtractor(glyph_set)
+    glyph.draw(extractor)
+    # Apply scaling
+    contours = []
+    for path in extractor.paths:
+        contour = []
+        assert path[0][0] == "moveTo"
+        start: tuple[float, float] = None
+        for i, cmd in enumerate(path):
+            if cmd[0] == "moveTo":
+                p = (cmd[1][0] * scale, cmd[1][1] * scale)
+                if i == 0:
+                    start = p
+                contour.append(p)
+            elif cmd[0] == "lineTo":
+                contour.append((cmd[1][0] * scale, cmd[1][1] * scale))
+            elif cmd[0] == "curveTo":
+                p1 = (cmd[1][0] * scale, cmd[1][1] * scale)
+                p2 = (cmd[2][0] * scale, cmd[2][1] * scale)
+                p3 = (cmd[3][0] * scale, cmd[3][1] * scale)
+                dim = approximateQuadraticArcLength(p1, p2, p3)
+                numSegs = ceil(dimToSegs(dim))
+                for t in frange(0., 1., 1./numSegs):
+                    contour.append(quadraticPointAtT(p1, p2, p3, t))
+                contour.append(p3)
+            elif cmd[0] == "closePath":
+                assert i == len(path) - 1
+                if contour[-1] != start:
+                    contour.append(start)
+        contours.append(contour)
+    result = (contours, glyph.width * scale)
+
+    if key is not None:
+        _GLYPH_CONTOURS[key] = result
+        if len(_GLYPH_CONTOURS) > GLYPH_CACHE_SIZE:
+            _GLYPH_CONTOURS.popitem(last=False)
+    return result
+
 def textToGlyphsPaths(
     font_path: str,
     text: str,
     font_size: float = 24, # in points
     translate: tuple[float, float]=(0, 0),
     dimToSegs: Callable[[float], float] = lambda x: 36*x,
+    segsKey: Hashable = None,
 ) -> list[list[tuple[float, float]]]:
-
-    class PathExtractor(BasePen):
-        def __init__(self, glyphSet):
-            super().__init__(glyphSet)
-            self.paths = []
-
-        def _moveTo(self, p0):
-            self.current_path = [("moveTo", p0)]
-
-        def _lineTo(self, p1):
-            self.current_path.append(("lineTo", p1))
-
-        def _curveToOne(self, p1, p2, p3):
-            self.current_path.append(("curveTo", p1, p2, p3))
-
-        def _closePath(self):
-            self.current_path.append(("closePath",))
-            self.paths.append(self.current_path)
-            self.current_path = []
-
-    font = TTFont(font_path)
-    glyph_set = font.getGlyphSet()
-    cmap = font["cmap"].getBestCmap()
-    units_per_em = font['head'].unitsPerEm
+    """
+        Return the flattened contours of each glyph of text.
+        segsKey identifies dimToSegs, e.g. ShapeAPI.segments_key(),
+        to reuse the glyph contours flattened by previous calls
+    """
+    glyph_set, cmap, units_per_em = parsedFont(font_path)
 
     # Simplistic approach: assume ASCII and get glyph names
     glyph_names = []
@@ -696,57 +955,13 @@ def textToGlyphsPaths(
     glyphs_paths = []
 
     for glyph_name in glyph_names:
-        glyph = glyph_set[glyph_name]
-        extractor = PathExtractor(glyph_set)
-        glyph.draw(extractor)
-        # Apply transformations (scaling and translation)
-        transformed_paths = []
-        for path in extractor.paths:
-            transformed_path = []
-            assert path[0][0] == "moveTo"
-            start: tuple[float, float] = None
-            for i, cmd in enumerate(path):
-                if cmd[0] == "moveTo":
-                    p = (
-                        cmd[1][0] * scale + current_x + translate[0],
-                        cmd[1][1] * scale + translate[1],
-                    )
-                    if i == 0:
-                        start = p
-                    transformed_path.append(p)
-                elif cmd[0] == "lineTo":
-                    p = (
-                        cmd[1][0] * scale + current_x + translate[0],
-                        cmd[1][1] * scale + translate[1],
-                    )
-                    transformed_path.append(p)
-                elif cmd[0] == "curveTo":
-                    p1 = (
-                        cmd[1][0] * scale + current_x + translate[0],
-                        cmd[1][1] * scale + translate[1],
-                    )
-                    p2 = (
-                        cmd[2][0] * scale + current_x + translate[0],
-                        cmd[2][1] * scale + translate[1],
-                    )
-                    p3 = (
-                        cmd[3][0] * scale + current_x + translate[0],
-                        cmd[3][1] * scale + translate[1],
-                    )
-                    dim = approximateQuadraticArcLength(p1, p2, p3)
-                    numSegs = ceil(dimToSegs(dim))
-                    for t in frange(0., 1., 1./numSegs):
-                        transformed_path.append(quadraticPointAtT(p1, p2, p3, t))
-                    transformed_path.append(p3)
-                elif cmd[0] == "closePath":
-                    assert i == len(path) - 1
-                    if transformed_path[-1] != start:
-                        transformed_path.append(start)
-            transformed_paths.append(transformed_path)
-        glyphs_paths.append(transformed_paths)
+        contours, advance_width = glyphContours(font_path, glyph_name, scale, dimToSegs, segsKey)
+        # Apply translation
+        dx = current_x + translate[0]
+        dy = translate[1]
+        glyphs_paths.append([[(x + dx, y + dy) for x, y in contour] for contour in contours])
 
         # Advance current_x based on glyph's advance width
-        advance_width = glyph.width * scale
         current_x += advance_width
 
     return glyphs_paths
@@ -789,3 +1004,133 @@ def wait_assert_file_exist(fname, timeout=1, nretry=10):
             break
 
     assert os.path.isfile(fname), f"Failed to detect file {fname}"
+
+def test_spline_arrays(self):
+    """ Test vectorized spline discretization """
+
+    def frangeLoop(start, stop, step):
+        values = []
+        while step > 0 and start + len(values) * step < stop or step < 0 and start + len(values) * step > stop:
+            values.append(float(start + len(values) * step))
+        return values
+
+    for start, stop, step in [(0, 1, .1), (0, 1, 1 / 3), (0, 1, 1 / 7), (0, 1, 1 / 12.5), (1, 0, -.1), (0, 1, 2), (.3, 5.2, .7), (0, 0, .1)]:
+        self.assertEqual(list(frange(start, stop, step)), frangeLoop(start, stop, step))
+
+    ctrl = [(0, 0), (1, 3), (4, -2), (5, 1)]
+    for num_points in [1, 7, 12.5, 50]:
+        points = bezierSegmentArray(*ctrl, num_points)
+        self.assertEqual(points.shape, (len(frangeLoop(0, 1, 1 / num_points)), 2))
+        for (x, y), t in zip(bezierSegment(*ctrl, num_points), frangeLoop(0, 1, 1 / num_points)):
+            basis = [(1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3]
+            self.assertAlmostEqual(x, sum(b * p[0] for b, p in zip(basis, ctrl)), places=12)
+            self.assertAlmostEqual(y, sum(b * p[1] for b, p in zip(basis, ctrl)), places=12)
+
+    # same points as the point by point implementation
+    path = [(10, 0), [(20, 5), (30, 10, 0), (40, 0, -inf, .3, .7), (50, -10, inf)], (50, -20)]
+    dim2segs = lambda dim: ceil(abs(dim) ** 0.5 * 6)
+    points = lineSplineXYArray((0, 0), [p if isinstance(p, tuple) else list(p) for p in path], dim2segs)
+    self.assertEqual(points.shape, (93, 2))
+    self.assertAlmostEqual(points[:, 0].sum(), 2807.490414113468, places=9)
+    self.assertAlmostEqual(points[:, 1].sum(), 206.21159419233587, places=9)
+    self.assertAlmostEqual(points[5, 0], 11.99708454810496, places=12)
+    self.assertAlmostEqual(points[5, 1], 0.8017492711370268, places=12)
+    self.assertEqual(tuple(points[0]), tuple(points[-1]))
+
+    # list api, with and without drawing functions
+    listed = lineSplineXY((0, 0), [p if isinstance(p, tuple) else list(p) for p in path], dim2segs)
+    self.assertEqual(listed, pointList(points))
+    drawn = lineSplineXY(
+        (0, 0), [p if isinstance(p, tuple) else list(p) for p in path], dim2segs,
+        lambda pt: [pt],
+        lambda trace, pt: trace + [pt],
+        lambda trace, pts: trace + pts,
+        ensureClosed2DPath,
+    )
+    self.assertEqual(len(drawn), len(listed))
+    for a, b in zip(drawn, listed):
+        self.assertAlmostEqual(a[0], b[0], places=12)
+        self.assertAlmostEqual(a[1], b[1], places=12)
+
+def test_adaptive_spline(self):
+    """ Test spline sampling within chord tolerance """
+    from b13d.api.core import Implementation
+
+    path = [(10, 0), [(20, 5), (30, 10, 0), (40, 0, -inf, .3, .7), (50, -10, inf)], (50, -20)]
+    fine = lineSplineXYArray((0, 0), [p if isinstance(p, tuple) else list(p) for p in path], lambda dim: 2000)
+    uniform = lineSplineXYArray((0, 0), [p if isinstance(p, tuple) else list(p) for p in path], lambda dim: ceil(abs(dim) ** 0.5 * 6))
+
+    def chordError(points):
+        """ largest distance of the finely sampled path to the segments of points """
+        a, ab = points[:-1], np.diff(points, axis=0)
+        ap = fine[:, None, :] - a[None]
+        t = np.clip(np.sum(ap * ab, axis=-1) / np.maximum(np.sum(ab * ab, axis=-1), 1e-12), 0, 1)
+        return np.linalg.norm(ap - t[..., None] * ab, axis=-1).min(axis=1).max()
+
+    for tol in [0.001, 0.01, 0.1]:
+        points = lineSplineXYArray((0, 0), [p if isinstance(p, tuple) else list(p) for p in path], tolerance=tol)
+        self.assertLessEqual(chordError(points), tol)
+        self.assertEqual(tuple(points[0]), tuple(points[-1]))
+    # fewer points than uniform sampling within the same error
+    tol = chordError(uniform)
+    points = lineSplineXYArray((0, 0), [p if isinstance(p, tuple) else list(p) for p in path], tolerance=tol)
+    self.assertLessEqual(chordError(points), tol)
+    self.assertLess(len(points), len(uniform))
+
+    # straight spans are not subdivided
+    straight = descreteBezierChainArray([(0, 0, 0), (10, 0, 0), (20, 0, 0)], tolerance=0.001)
+    self.assertEqual(straight.tolist(), [[0, 0], [10, 0]])
+
+    api = Implementation.MOCK.get_api()
+    rad = 100
+    segs = api.revolve_segments(rad)
+    self.assertLessEqual(rad * (1 - cos(pi / segs)), api.chord_tolerance())
+    self.assertGreater(rad * (1 - cos(pi / (segs - 1))), api.chord_tolerance())
+    self.assertEqual(api.revolve_segments(rad, -180), ceil(segs / 2))
+    self.assertLess(api.revolve_segments(2), segs)
+    self.assertEqual(api.revolve_segments(0), 3)
+
+def test_tolerance_segments(self):
+    """ Test segment counts from a chord tolerance instead of the fidelity """
+    from b13d.api.core import Implementation
+    from b13d.parts.tube import Tube
+
+    api = Implementation.MANIFOLD.get_api()
+    self.assertIsNone(api.chord_tol)
+    self.assertEqual(api.smoothing_segments(2 * pi * 10), ceil((2 * pi * 10) ** 0.5 * 6))
+
+    tol_api = Implementation.MANIFOLD.get_api(chord_tol=0.05)
+    self.assertEqual(tol_api.chord_tolerance(), 0.05)
+    self.assertNotEqual(api.segments_key(), tol_api.segments_key())
+    for rad in [1, 10, 100]:
+        segs = tol_api.smoothing_segments(2 * pi * rad)
+        self.assertEqual(segs, tol_api.revolve_segments(rad))
+        self.assertLessEqual(rad * (1 - cos(pi / segs)), 0.05)
+        self.assertEqual(tol_api.cylinder_z(10, rad).solid.num_vert(), 2 * segs)
+    # small holes get fewer segments
+    self.assertLess(tol_api.smoothing_segments(2 * pi), api.smoothing_segments(2 * pi))
+
+    tube = Tube(args=['-i', 'mf', '-tol', '0.05', '-odoff'])
+    tube.configure()
+    self.assertEqual(tube.api.chord_tolerance(), 0.05)
+    self.assertIsNone(Tube(args=['-i', 'mf', '-odoff']).cli.tolerance)
+
+def test_offset_polygon(self):
+    """ Test polygon offsets, with manifold3d and with shapely """
+    from unittest import mock
+
+    square = np.array([(0, 0), (0, 10), (10, 10), (10, 0), (0, 0)], dtype=float)
+    for modules in [{}, {"manifold3d": None}]:
+        with mock.patch.dict(sys.modules, modules):
+            grown = offsetPolygon(square, 1)
+            self.assertAlmostEqual(polygonArea(grown), -144, places=3)
+            self.assertEqual(tuple(grown[0]), tuple(grown[-1]))
+
+            shrunk = offsetPolygon(square, -2)
+            self.assertAlmostEqual(polygonArea(shrunk), -36, places=3)
+
+            clipped = offsetPolygon(square, 1, bounds=((-5, 0), (20, 20)))
+            self.assertAlmostEqual(polygonArea(clipped), -132, places=3)
+            self.assertAlmostEqual(clipped[:, 1].min(), 0, places=6)
+
+            self.assertEqual(len(offsetPolygon(square, -6)), 0)
@@ -46,25 +46,21 @@ class RoundedBox(Solid):
 
         xcoords,ycoords,zcoords = self._coords()
 
-        box = None
+        corners = []
         # put spheres on corners
         for x in xcoords:
             for y in ycoords:
                 for z in zcoords:
-                    corner = self.api.sphere(self.cli.r).mv(x,y,z)
-                    if box is None:
-                        box = corner
-                    else:
-                        box += corner
+                    corners.append(self.api.sphere(self.cli.r).mv(x,y,z))
         
         # hull from the corners
-        return box.hull()
+        return self.api.union_all(corners).hull()
 
     def gen_default(self) -> Shape:
         """ default implementation """
 
         # Main cube
-        box = None
+        box = []
         xcoords,ycoords,zcoords = self._coords()
 
         # lateral faces
@@ -73,21 +69,21 @@ class RoundedBox(Solid):
                                    self.cli.y - 2*self.cli.r,
                                    self.cli.z - 2*self.cli.r)
             lbox <<= (x,0,0)
-            box = lbox + box
+            box.append(lbox)
 
         for y in ycoords:
             lbox = self.api.box(self.cli.x - 2*self.cli.r,
                                                  2*self.cli.r,
                                    self.cli.z - 2*self.cli.r)
             lbox <<= (0,y,0)
-            box += lbox
+            box.append(lbox)
 
         for z in zcoords:
             lbox = self.api.box(self.cli.x - 2*self.cli.r,
                                    self.cli.y - 2*self.cli.r,
                                                  2*self.cli.r)
             lbox <<= (0,0,z)
-            box += lbox
+            box.append(lbox)
 
         # Add edges (cylinders) to connect the fillets
 
@@ -96,23 +92,23 @@ class RoundedBox(Solid):
             for y in ycoords:
                 edge = self.api.cylinder_rounded_x(self.cli.x, rad=self.cli.r)
                 edge <<= (0, y, z)
-                box += edge
+                box.append(edge)
 
         # Y-direction edges
         for x in xcoords:
             for z in zcoords:
                 edge = self.api.cylinder_y(self.cli.y - 2*self.cli.r, rad=self.cli.r)
                 edge <<= (x, 0, z)
-                box += edge
+                box.append(edge)
 
         # Z-direction edges
         for x in xcoords:
             for y in ycoords:
                 edge = self.api.cylinder_z(self.cli.z - 2*self.cli.r, rad=self.cli.r)
                 edge <<= (x, y, 0)
-                box += edge
+                box.append(edge)
                     
-        return box
+        return self.api.union_all(box)
 
     def gen(self) -> Shape:
         """ generate rounded box """
@@ -64,7 +64,7 @@ class RoundedRectangle(Solid):
         core_y = self.cli.y if self.cli.ry else self.cli.y - 2 * self.cli.r
         core_z = self.cli.z if self.cli.rz else self.cli.z - 2 * self.cli.r
 
-        box = self.api.box(core_x, core_y, core_z)
+        box = [self.api.box(core_x, core_y, core_z)]
         xcoords, ycoords, zcoords = self._coords()
 
         # Add lateral faces along X
@@ -72,21 +72,21 @@ class RoundedRectangle(Solid):
             for xpos in xcoords:
                 lbox = self.api.box(2 * self.cli.r, core_y, core_z)
                 lbox <<= (xpos, 0, 0)
-                box += lbox
+                box.append(lbox)
 
         # Add lateral faces along Y
         if not self.cli.ry:
             for ypos in ycoords:
                 lbox = self.api.box(core_x, 2 * self.cli.r, core_z)
                 lbox <<= (0, ypos, 0)
-                box += lbox
+                box.append(lbox)
 
         # Add lateral faces along Z
         if not self.cli.rz:
             for zpos in zcoords:
                 lbox = self.api.box(core_x, core_y, 2 * self.cli.r)
                 lbox <<= (0, 0, zpos)
-                box += lbox
+                box.append(lbox)
 
         # If rounding is enabled along an axis, add full-length cylinders
         if self.cli.rx:
@@ -94,23 +94,23 @@ class RoundedRectangle(Solid):
                 for zpos in zcoords:
                     edge = self.api.cylinder_x(self.cli.x, rad=self.cli.r)
                     edge <<= (0, ypos, zpos)
-                    box += edge
+                    box.append(edge)
 
         if self.cli.ry:
             for xpos in xcoords:
                 for zpos in zcoords:
                     edge = self.api.cylinder_y(self.cli.y, rad=self.cli.r)
                     edge <<= (xpos, 0, zpos)
-                    box += edge
+                    box.append(edge)
 
         if self.cli.rz:
             for xpos in xcoords:
                 for ypos in ycoords:
                     edge = self.api.cylinder_z(self.cli.z, rad=self.cli.r)
                     edge <<= (xpos, ypos, 0)
-                    box += edge
+                    box.append(edge)
         
-        return box
+        return self.api.union_all(box)
 
     def _coords(self):
         
@@ -125,14 +125,14 @@ class RoundedRectangle(Solid):
 
         xcoords,ycoords,zcoords = self._coords()
 
-        box = None
+        box = []
         # round edges along x
         if self.cli.rx:
             for y in ycoords:
                 for z in zcoords:
                     edge = self.api.cylinder_x(self.cli.x,self.cli.r)
                     edge <<= (0,y,z)
-                    box = edge + box
+                    box.append(edge)
 
         # round edges along y
         if self.cli.ry:
@@ -140,7 +140,7 @@ class RoundedRectangle(Solid):
                 for z in zcoords:
                     edge = self.api.cylinder_y(self.cli.y,self.cli.r)
                     edge <<= (x,0,z)
-                    box = edge + box
+                    box.append(edge)
 
         # round edges along y
         if self.cli.rz:
@@ -148,16 +148,16 @@ class RoundedRectangle(Solid):
                 for y in ycoords:
                     edge = self.api.cylinder_z(self.cli.z,self.cli.r)
                     edge <<= (x,y,0)
-                    box = edge + box
+                    box.append(edge)
 
-        if box is None:
+        if len(box) == 0:
             # no rounding
             return self.api.box(self.cli.x,
                               self.cli.y,
                               self.cli.z)
         else:
             # hull from the corners
-            return box.hull()
+            return self.api.union_all(box).hull()
 
     def gen(self) -> Shape:
         """ generate rounded box """
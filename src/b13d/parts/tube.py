@@ -53,5 +53,19 @@ def test_tube_mock(self):
     ## Cadquery and Blender
     test_tube(self, apis=['mock'])
 
+def test_tube_isolated_mock(self):
+    """ Test Tube Mock, each testcase in its own process """
+    tests={
+        'default': [],
+        'height': ['-H','20'],
+           }
+    rpts = test_loop(module=__name__,tests=tests,apis=['mock'],jobs=2,timeout=300)
+    self.assertEqual(len(rpts), 2)
+    for rpt in rpts.values():
+        self.assertIn('Tube_rpt.json', rpt)
+
+    with self.assertRaises(AssertionError):
+        test_loop(module=__name__,tests={'bad': ['-H','-1','-nope']},apis=['mock'],jobs=2)
+
 if __name__ == '__main__':
     main()
@@ -233,8 +233,41 @@ class B13DTestMethods(unittest.TestCase):
         """Test PyVista API"""
         run_api_test(api=Implementation.PYVISTA)
 
+    ## Cache
+    from b13d.api.cache import test_shape_cache, test_primitive_cache
+
+    ## Fonts
+    from b13d.api.fonts import test_font_index, test_glyph_cache
+
+    ## Splines
+    from b13d.api.utils import test_spline_arrays, test_adaptive_spline, test_tolerance_segments, test_offset_polygon
+
+    ## Sections
+    from b13d.api.solid import test_section
+
+    ## Build Graph
+    from b13d.api.graph import test_build_graph
+
+    ## Trace
+    from b13d.api.trace import test_tracer
+
+    ## Lazy
+    from b13d.api.lazy import test_lazy
+
+    ## Transforms
+    from b13d.api.matrix import test_deferred_transform
+
+    ## Broadphase
+    from b13d.api.bbox import test_broadphase, test_bbox_cache
+
+    ## Mesh interchange
+    from b13d.api.mesh import test_mesh_data, test_pv_split_points
+
+    ## Trimesh
+    from b13d.api.tm import test_tm_resident_manifold
+
     ## Solid Parts
-    from b13d.parts.tube import test_tube, test_tube_mock
+    from b13d.parts.tube import test_tube, test_tube_mock, test_tube_isolated_mock
     from b13d.parts.screw import test_screw, test_screw_mock
     from b13d.parts.screw_holder import test_screw_holder, test_screw_holder_mock
     from b13d.parts.import3d import test_import3d, test_import3d_mock
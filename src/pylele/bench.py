@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+
+"""
+    Pylele Benchmark: generate the named configurations with every installed
+    backend and fidelity, record timing and resource usage, compare with a baseline
+"""
+
+import argparse
+import csv
+import datetime
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import ceil
+
+import trimesh
+from json_tricks import dumps, load as json_load, loads as json_loads
+
+try:
+    import resource
+except ImportError:
+    # not available on windows, peak memory is not reported
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../"))
+
+from b13d.api.core import APIS_INFO, Fidelity, Implementation, supported_apis
+from b13d.api.constants import DEFAULT_BUILD_DIR
+from b13d.api.utils import lineSplineXY, make_or_exist_path
+from pylele.pylele2.body import genBodyPath
+from pylele.pylele2.config import CONFIGURATIONS, LeleConfig, pylele_config_parser
+
+BENCH_FORMAT_VERSION = 1
+BENCH_DIR = os.path.join(DEFAULT_BUILD_DIR, "bench")
+BENCH_COLS = [
+    "configuration",
+    "api",
+    "fidelity",
+    "runs",
+    "wall_time_min",
+    "wall_time_median",
+    "wall_time_mean",
+    "peak_rss_mb",
+    "triangles",
+    "stl_file_size",
+]
+# metrics checked for regressions in compare mode
+BENCH_COMPARE_COLS = ["wall_time_median", "peak_rss_mb"]
+
+# import b13d and discover the installed backends, in a new interpreter
+DISCOVERY_CODE = """
+import json, sys, time
+start = time.perf_counter()
+from b13d.api.core import supported_apis
+supported_apis()
+print(json.dumps({"wall_time": time.perf_counter() - start, "modules": list(sys.modules)}))
+"""
+
+def peak_rss_mb() -> float:
+    """ Peak resident set size of this process [MB], or None if not available """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macos, kilobytes elsewhere
+    if sys.platform == "darwin":
+        return rss / (1024 * 1024)
+    return rss / 1024
+
+def bench_run(configuration: str, api: str, fidelity: str, outdir: str) -> dict:
+    """ Generate one configuration in a fresh worker process and measure it """
+    from pylele.pylele2.all_assembly import main
+
+    args = CONFIGURATIONS[configuration] + [
+        "-i", api,
+        "-f", fidelity,
+        "-o", outdir,
+        "-odoff",
+        "-nc",  # measure generation, not cache hits
+    ]
+    start_time = time.time()
+    _, out_fname = main(args=args)
+    wall_time = time.time() - start_time
+
+    mesh = trimesh.load_mesh(out_fname)
+    return {
+        "wall_time": wall_time,
+        "peak_rss_mb": peak_rss_mb(),
+        "triangles": len(mesh.faces),
+        "stl_file_size": os.path.getsize(out_fname),
+    }
+
+def bench_case(configuration: str, api: str, fidelity: str, warmup: int = 1, repeat: int = 3) -> dict:
+    """ Benchmark one (configuration, api, fidelity) case.
+        Every run is a new process, so that peak memory and import state are not shared """
+    runs = []
+    with tempfile.TemporaryDirectory() as outdir:
+        for i in range(warmup + repeat):
+            with ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                run = executor.submit(bench_run, configuration, api, fidelity, outdir).result()
+            kind = "warmup" if i < warmup else "run"
+            print(f"# Bench {configuration} {api} {fidelity} {kind}: {run['wall_time']:.2f} [s]")
+            if i >= warmup:
+                runs.append(run)
+
+    wall_times = [r["wall_time"] for r in runs]
+    rss = [r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None]
+    return {
+        "configuration": configuration,
+        "api": str(api),
+        "fidelity": str(fidelity),
+        "runs": len(runs),
+        "wall_time_min": min(wall_times),
+        "wall_time_median": statistics.median(wall_times),
+        "wall_time_mean": statistics.mean(wall_times),
+        "peak_rss_mb": max(rss) if len(rss) > 0 else None,
+        "triangles": runs[-1]["triangles"],
+        "stl_file_size": runs[-1]["stl_file_size"],
+    }
+
+def backend_modules() -> list:
+    """ Backend modules and optional backend packages, imported by Implementation.get_api only """
+    modules = [info["module"] for info in APIS_INFO.values()]
+    for impl, info in APIS_INFO.items():
+        if impl != Implementation.TRIMESH:
+            modules += info["requires"]
+    return modules
+
+def bench_discovery(repeat: int = 3) -> dict:
+    """ Benchmark the import of b13d and the discovery of the installed backends """
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(__file__), "../"))
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", DISCOVERY_CODE],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(json_loads(out.splitlines()[-1]))
+        print(f"# Bench backend discovery: {runs[-1]['wall_time']:.3f} [s]")
+
+    wall_times = [r["wall_time"] for r in runs]
+    return {
+        "configuration": "discovery",
+        "api": "all",
+        "fidelity": "none",
+        "runs": len(runs),
+        "wall_time_min": min(wall_times),
+        "wall_time_median": statistics.median(wall_times),
+        "wall_time_mean": statistics.mean(wall_times),
+        "peak_rss_mb": None,
+        "triangles": None,
+        "stl_file_size": None,
+        "backend_modules": sorted(set(backend_modules()) & set(runs[-1]["modules"])),
+    }
+
+def body_paths() -> list:
+    """ (origin, path) of the body and body cut splines of every configuration """
+    parser = pylele_config_parser()
+    parser.add_argument("-i", "--implementation", type=Implementation, default=Implementation.MOCK)
+    paths = []
+    for args in CONFIGURATIONS.values():
+        cli, _ = parser.parse_known_args(args=args)
+        cfg = LeleConfig(cli=cli)
+        for isCut in [False, True]:
+            paths.append(genBodyPath(
+                scaleLen=float(cli.scale_length),
+                neckLen=cfg.neckLen,
+                neckWth=cfg.neckWth,
+                bodyWth=cfg.bodyWth,
+                bodyBackLen=cfg.bodyBackLen,
+                endWth=cli.end_flat_width,
+                neckWideAng=cfg.neckWideAng,
+                isCut=isCut,
+                body_type=cli.body_type,
+            ))
+    return paths
+
+def bench_splines(fidelity: str, repeat: int = 3, number: int = 20) -> dict:
+    """ Micro benchmark the discretization of the body splines of every configuration """
+    segs = Fidelity(fidelity).smoothing_segments()
+    dim2segs = lambda dim: ceil(abs(dim) ** 0.5 * segs)
+    paths = body_paths()
+
+    wall_times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            points = [lineSplineXY(origin, path, dim2segs) for origin, path in paths]
+        wall_times.append((time.perf_counter() - start_time) / number)
+    print(f"# Bench splines {fidelity}: {1000 * min(wall_times):.3f} [ms]")
+
+    return {
+        "configuration": "splines",
+        "api": "all",
+        "fidelity": str(fidelity),
+        "runs": len(wall_times),
+        "wall_time_min": min(wall_times),
+        "wall_time_median": statistics.median(wall_times),
+        "wall_time_mean": statistics.mean(wall_times),
+        "peak_rss_mb": None,
+        "triangles": None,
+        "stl_file_size": None,
+        "points": sum(len(p) for p in points),
+    }
+
+def bench_key(result: dict) -> tuple:
+    return (result["configuration"], result["api"], result["fidelity"])
+
+def bench_compare(results: list, baseline: list, threshold: float = 10) -> list:
+    """ Compare results with a baseline, return the regressions
+        larger than threshold [%] as a list of descriptions """
+    reference = {bench_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        ref = reference.get(bench_key(result))
+        if ref is None:
+            continue
+        for col in BENCH_COMPARE_COLS:
+            if result.get(col) is None or not ref.get(col):
+                continue
+            change = 100 * (result[col] / ref[col] - 1)
+            if change > threshold:
+                regressions.append(
+                    f"{'/'.join(bench_key(result))} {col}: "
+                    f"{ref[col]:.3f} -> {result[col]:.3f} ({change:+.1f}%)"
+                )
+    return regressions
+
+def bench_export(results: list, outdir: str, name: str = "bench") -> str:
+    """ Save results to .json and .csv files, return the .json file name """
+    make_or_exist_path(outdir)
+    fname = os.path.join(outdir, name)
+
+    data = {
+        "format": BENCH_FORMAT_VERSION,
+        "datetime": datetime.datetime.now().strftime("%y-%m-%d/%H:%M:%S"),
+        "platform": platform.uname()._asdict(),
+        "results": results,
+    }
+    with open(fname + ".json", "w", encoding="UTF8") as f:
+        f.write(dumps(data, indent=4))
+
+    with open(fname + ".csv", "w", newline="", encoding="UTF8") as f:
+        writer = csv.DictWriter(f, fieldnames=BENCH_COLS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+    print(f"Benchmark saved to {fname}.json and {fname}.csv")
+    return fname + ".json"
+
+def bench_load(fname: str) -> list:
+    """ Load the results of a benchmark .json file """
+    with open(fname, "r", encoding="UTF8") as f:
+        return json_load(f)["results"]
+
+def bench_parser(parser=None):
+    """ Benchmark command line parser """
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Pylele Benchmark")
+
+    parser.add_argument("-cfg", "--configurations", help="Configurations to benchmark, default all",
+                        nargs="+", choices=CONFIGURATIONS.keys(), default=list(CONFIGURATIONS.keys()))
+    parser.add_argument("-i", "--implementations", help="Implementations to benchmark, default all installed",
+                        nargs="+", default=None)
+    parser.add_argument("-f", "--fidelities", help="Fidelities to benchmark, default all",
+                        nargs="+", type=Fidelity, choices=list(Fidelity), default=list(Fidelity))
+    parser.add_argument("-w", "--warmup", help="Discarded warmup runs per case",
+                        type=int, default=1)
+    parser.add_argument("-r", "--repeat", help="Measured runs per case",
+                        type=int, default=3)
+    parser.add_argument("-o", "--outdir", help="Output directory",
+                        type=str, default=BENCH_DIR)
+    parser.add_argument("-n", "--name", help="Output file base name",
+                        type=str, default="bench")
+    parser.add_argument("-cmp", "--compare", help="Baseline .json file to compare with",
+                        type=str, default=None)
+    parser.add_argument("-thr", "--threshold", help="Regression threshold for compare [%%]",
+                        type=float, default=10)
+    return parser
+
+def main(args=None) -> list:
+    """ Run the benchmark, return the regressions against the baseline if any """
+    cli = bench_parser().parse_args(args=args)
+    apis = supported_apis() if cli.implementations is None else cli.implementations
+
+    results = [bench_discovery(repeat=cli.repeat)]
+    results += [bench_splines(fidelity, repeat=cli.repeat) for fidelity in cli.fidelities]
+    for configuration in cli.configurations:
+        for api in apis:
+            for fidelity in cli.fidelities:
+                results.append(bench_case(
+                    configuration, api, fidelity, warmup=cli.warmup, repeat=cli.repeat
+                ))
+    bench_export(results, cli.outdir, cli.name)
+
+    regressions = []
+    if cli.compare is not None:
+        regressions = bench_compare(results, bench_load(cli.compare), cli.threshold)
+        for regression in regressions:
+            print(f"## REGRESSION: {regression}")
+        print(f"# {len(regressions)} regressions over {cli.threshold}% against {cli.compare}")
+    return regressions
+
+def bench_main():
+    """ Console entry point, exit with an error on regressions """
+    sys.exit(1 if len(main()) > 0 else 0)
+
+def test_bench_compare(self):
+    """ Test Benchmark compare """
+    base = {"configuration": "default", "api": "mf", "fidelity": "low",
+            "wall_time_median": 10.0, "peak_rss_mb": 100.0}
+    with tempfile.TemporaryDirectory() as outdir:
+        fname = bench_export([base], outdir)
+        baseline = bench_load(fname)
+    self.assertEqual(baseline, [base])
+    self.assertEqual(bench_compare([base | {"wall_time_median": 10.5}], baseline), [])
+    regressions = bench_compare([base | {"wall_time_median": 12.0}], baseline)
+    self.assertEqual(len(regressions), 1)
+    self.assertIn("wall_time_median", regressions[0])
+    self.assertEqual(bench_compare([base | {"api": "tm", "peak_rss_mb": 500.0}], baseline), [])
+
+def test_bench_discovery(self):
+    """ Test backends are discovered without importing them """
+    result = bench_discovery(repeat=1)
+    self.assertEqual(result["backend_modules"], [])
+    self.assertLess(result["wall_time_median"], 10)
+
+if __name__ == "__main__":
+    bench_main()
@@ -13,9 +13,10 @@ from b13d.api.core import Shape
 from b13d.api.solid import main_maker, test_loop
 from pylele.pylele2.base import LeleBase
 from pylele.pylele2.top_assembly import LeleTopAssembly
-from pylele.pylele2.config import CONFIGURATIONS
+from pylele.pylele2.config import CONFIGURATIONS, LeleBodyType
 from pylele.pylele2.bottom_assembly import LeleBottomAssembly, pylele_bottom_assembly_parser
 from pylele.pylele2.bridge_assembly import pylele_bridge_assembly_parser
+from pylele.pylele2.chamber import LeleChamber
 from pylele.pylele2.strings import LeleStrings
 from pylele.pylele2.tuners import LeleTuners
 
@@ -44,6 +45,13 @@ class LeleAllAssembly(LeleBase):
             else:
                 top <<= (0, 0, -jcTol)
             body += top
+            if not self.cli.all and self.cli.body_type in [LeleBodyType.GOURD, LeleBodyType.TRAVEL]:
+                # the top is cut by the chamber before sinking by the join tolerance,
+                # cut the chamber of the body again, to remove the lip it leaves along the chamber wall
+                chm = LeleChamber(cli=self.cli, isCut=True)
+                chm.gen_full()
+                chm.shape = self.api.trim_by_plane(chm.shape, (0, 0, -1))
+                body -= chm
         if top.has_parts():
             self.add_parts(top.parts)
 
@@ -92,6 +100,7 @@ def test_all_assembly(self, apis=None):
         "separate_neck": ["-N"],
         "separate_fretboard": ["-F"],
         "separate_all": ["-F", "-N", "-T", "-B", "-NU", "-FR", "-D", "-G", "-HT"],
+        "separate_all_jobs": ["-F", "-N", "-T", "-B", "-NU", "-FR", "-D", "-G", "-HT", "-j", "2"],
         "gotoh_tuners": ["-t", "gotoh"],
     }
 
@@ -117,6 +126,15 @@ def test_all_assembly(self, apis=None):
     )
 
 
+def test_all_assembly_watertight(self):
+    """Test the default all assembly exports a watertight mesh"""
+    import trimesh
+    from b13d.api.constants import DEFAULT_TEST_DIR
+
+    _, out_fname = main(args=["-i", "mf", "-nc", "-odoff", "-o", os.path.join(DEFAULT_TEST_DIR, "watertight")])
+    mesh = trimesh.load(out_fname)
+    self.assertTrue(mesh.is_watertight)
+
 def test_all_assembly_mock(self):
     """Test Bottom Assembly Mock"""
     test_all_assembly(self, apis=["mock"])
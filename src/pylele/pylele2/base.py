@@ -11,7 +11,7 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.solid import Solid, export_dict2text
-from pylele.pylele2.config import LeleConfig, pylele_config_parser, CONFIGURATIONS
+from pylele.pylele2.config import LeleConfig, lele_config, pylele_config_parser, CONFIGURATIONS
 
 
 def pylele_base_parser(parser=None):
@@ -43,8 +43,8 @@ class LeleBase(Solid):
 
     def configure(self):
 
-        # generate ukulele configuration
-        self.cfg = LeleConfig(cli=self.cli)
+        # ukulele configuration, shared by all solids with the same cli
+        self.cfg = lele_config(self.cli)
 
         super().configure()
         # super().gen_full()
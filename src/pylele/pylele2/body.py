@@ -13,7 +13,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "../../"))
 
 from b13d.api.core import Shape
 from b13d.api.solid import main_maker, test_loop, FIT_TOL, ColorEnum
-from b13d.api.utils import radians
+from b13d.api.utils import offsetPolygon, pathBounds, pointList, radians
 from pylele.config_common import TunerType
 from pylele.pylele2.config import LeleBodyType
 from pylele.pylele2.base import LeleBase
@@ -115,32 +115,69 @@ class LeleBody(LeleBase):
             ratio = custom_ratio
 
         bot_below = (
-            self.api.spline_revolve(self.cfg.body_origin, self.cfg.body_path, angle)
+            self.api.spline_revolve(*self.body_profile(), angle)
             .scale(1, 1, ratio)
         )
 
         return bot_below
     
     def gourd_flat_extrusion(self, thickness: float, half: bool = False):
-        bot = self.api.spline_extrusion(self.cfg.body_origin, self.cfg.body_path, thickness)
+        bot = self.api.spline_extrusion(*self.body_profile(), thickness)
         if not half:
             return bot.mirror_and_join()
         return bot
 
+    def body_spline(self, isCut: bool = False):
+        """ origin and spline path of the body, shared by all bodies with the same configuration """
+        return self.cfg.derived(
+            ("body_path", isCut),
+            lambda: genBodyPath(
+                scaleLen = float(self.cli.scale_length),
+                neckLen = self.cfg.neckLen,
+                neckWth = self.cfg.neckWth,
+                bodyWth = self.cfg.bodyWth,
+                bodyBackLen = self.cfg.bodyBackLen,
+                endWth = self.cli.end_flat_width,
+                neckWideAng = self.cfg.neckWideAng,
+                isCut = isCut,
+                body_type=self.cli.body_type
+                )
+        )
+
+    def body_polygon(self, offset: float = 0):
+        """
+        Closed polygon of half the body outline, above the X axis,
+        grown by offset [mm], and by the fit tolerance for cuts.
+        The outline is discretized once per configuration, hence per implementation
+        and fidelity, and offset instead of discretizing another spline
+        """
+        if self.isCut:
+            offset += FIT_TOL
+        outline = self.cfg.derived(
+            ("body_polygon", 0),
+            lambda: self.api.spline_polygon(*self.body_spline()),
+        )
+        if offset == 0:
+            return outline
+
+        def grow():
+            (minX, _), (maxX, maxY) = pathBounds(outline)
+            pad = abs(offset) + 1
+            return offsetPolygon(outline, offset, bounds=((minX - pad, 0), (maxX + pad, maxY + pad)))
+        return self.cfg.derived(("body_polygon", offset), grow)
+
+    def body_profile(self):
+        """ start and path of the body outline, for spline_revolve and spline_extrusion """
+        if self.cli.implementation.has_native_spline():
+            return self.body_origin, self.body_path
+        polygon = self.body_polygon()
+        return tuple(polygon[0]), pointList(polygon[1:])
+
     def configure(self):
         LeleBase.configure(self)
 
-        self.cfg.body_origin, self.cfg.body_path = genBodyPath(
-                 scaleLen = float(self.cli.scale_length),
-                 neckLen = self.cfg.neckLen,
-                 neckWth = self.cfg.neckWth,
-                 bodyWth = self.cfg.bodyWth,
-                 bodyBackLen = self.cfg.bodyBackLen,
-                 endWth = self.cli.end_flat_width,
-                 neckWideAng = self.cfg.neckWideAng,
-                 isCut = self.isCut,
-                 body_type=self.cli.body_type
-                 )
+        # body spline, shared by all bodies with the same configuration and isCut
+        self.body_origin, self.body_path = self.body_spline(self.isCut)
 
     def gen_flat_body_bottom(self):
         """Generate the thin rounded bottom of a flat body"""
@@ -228,5 +265,45 @@ def test_body_mock(self):
     """Test body"""
     test_body(self, apis=["mock"])
 
+def test_body_polygon(self):
+    """Test body outline shared by parts, and offset for cuts"""
+    import numpy as np
+    from b13d.api.utils import polygonArea
+    from pylele.pylele2.top import LeleTop
+
+    body = LeleBody(args=["-i", "mock"])
+    body.configure()
+    outline = body.body_polygon()
+    self.assertEqual(outline.shape[1], 2)
+    self.assertEqual(tuple(outline[0]), tuple(outline[-1]))
+    # coincident consecutive samples make degenerate faces
+    self.assertTrue(np.all(np.linalg.norm(np.diff(outline, axis=0), axis=1) > 0))
+
+    top = LeleTop(cli=body.cli)
+    top.configure()
+    self.assertIs(top.body_polygon(), outline)
+    start, path = top.body_profile()
+    self.assertEqual(len(path), len(outline) - 1)
+
+    cut = LeleBody(cli=body.cli, isCut=True)
+    cut.configure()
+    grown = cut.body_polygon()
+    self.assertIs(cut.body_polygon(), grown)
+    self.assertGreaterEqual(grown[:, 1].min(), 0)
+    self.assertAlmostEqual(grown[:, 1].max(), outline[:, 1].max() + FIT_TOL, places=3)
+    self.assertGreater(abs(polygonArea(grown)), abs(polygonArea(outline)))
+    self.assertLess(abs(len(grown) - len(outline)), 10)
+
+    # the offset outline is close to the spline of cuts, which is also wider at the neck and end
+    from shapely.geometry import Polygon
+    for body_type in list(LeleBodyType):
+        for end_width in [[], ["-e", "80"]]:
+            cut = LeleBody(args=["-i", "mock", "-bt", body_type, *end_width], isCut=True)
+            cut.configure()
+            grown = Polygon(cut.body_polygon())
+            spline = Polygon(cut.api.spline_polygon(*cut.body_spline(isCut=True)))
+            self.assertLessEqual(grown.hausdorff_distance(spline), FIT_TOL + 1e-3)
+            self.assertLess(grown.symmetric_difference(spline).area, 2e-3 * spline.area)
+
 if __name__ == "__main__":
     main()
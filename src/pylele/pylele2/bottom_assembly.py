@@ -32,6 +32,7 @@ from pylele.pylele2.tuners import LeleTuners, pylele_tuners_parser
 from pylele.pylele2.turnaround import LeleTurnaround
 from pylele.pylele2.neck_assembly import LeleNeckAssembly, pylele_neck_assembly_parser
 from pylele.pylele2.bottom import LeleBottom
+from b13d.api.graph import BuildGraph
 
 def pylele_bottom_assembly_parser(parser=None):
     """
@@ -53,50 +54,48 @@ class LeleBottomAssembly(LeleBase):
         """ Generate Body Bottom Assembly """
 
         jcTol = self.api.tolerance()
+        graph = BuildGraph()
 
         ## Body
-        body = LeleBody(cli=self.cli)
+        body = graph.node(LeleBody(cli=self.cli))
 
         ## Chamber
         if not self.cli.body_type in [LeleBodyType.FLAT, LeleBodyType.HOLLOW]:
-            chamber = LeleChamber(cli=self.cli, isCut=True)
+            chamber = graph.node(LeleChamber(cli=self.cli, isCut=True))
             body -= chamber
         else:
             chamber = None
 
         ## Rim
         if self.cli.separate_top: # and not self.cli.body_type.is_solid():
-            body -= LeleRim(cli=self.cli, isCut=True)
+            body -= graph.node(LeleRim(cli=self.cli, isCut=True))
 
         ## Spines
         if self.cli.num_spines > 0:
-            body -= LeleSpines(cli=self.cli, isCut=True).mv(0, 0, jcTol)
+            body -= graph.node(LeleSpines(cli=self.cli, isCut=True)).mv(0, 0, jcTol)
 
         ## Neck
         neck = LeleNeckAssembly(cli=self.cli, isCut=False)
-        neck.gen_full()
         if self.cli.separate_neck:
-            body -= LeleNeckAssembly(cli=self.cli, isCut=True).mv(0, 0, jcTol)
+            body -= graph.node(LeleNeckAssembly(cli=self.cli, isCut=True)).mv(0, 0, jcTol)
             if self.cli.all:
-                neck <<= (-5*self.cli.all_distance,0,0)
-                body += neck
+                body += graph.node(neck) << (-5*self.cli.all_distance,0,0)
             elif not self.api.implementation == Implementation.BLENDER:
                 # god knows why blender does not like this
                 self.add_part(neck)
         else:
-            body += neck.mv(jcTol, 0, 0)
-            self.add_parts(neck.parts)
- 
+            body += graph.node(neck).mv(jcTol, 0, 0)
+
         ## Fretboard Spines
         if  (self.cli.separate_fretboard or
             self.cli.separate_neck or
             self.cli.separate_top) and self.cli.num_spines > 0:
-            body -= LeleFretboardSpines(cli=self.cli, isCut=True).mv(2*FIT_TOL, 0, 0)
+            body -= graph.node(LeleFretboardSpines(cli=self.cli, isCut=True)).mv(2*FIT_TOL, 0, 0)
 
         ## Tuners
-        tnrs = LeleTuners(cli=self.cli, isCut=True)
+        tnrs = graph.node(LeleTuners(cli=self.cli, isCut=True))
         body -= tnrs
-        if tnrs.is_turnaround():
+        if tnrs.solid.is_turnaround():
             self.add_part(LeleTurnaround(cli=self.cli))
 
         ## Jack Hole
@@ -110,7 +109,7 @@ class LeleBottomAssembly(LeleBase):
                     )
             body -= jh
             """
-            jh = Jack6p5Female(cli=self.cli, isCut=True)
+            jh = graph.node(Jack6p5Female(cli=self.cli, isCut=True))
             jh = jh.rotate_y(-90).rotate_z(90)
             jh <<= (
                     float(self.cli.scale_length),
@@ -121,24 +120,24 @@ class LeleBottomAssembly(LeleBase):
 
         ## Tail, not ideal for non worm but possible
         if self.cli.separate_end:
-            tail_cut = LeleTail(cli=self.cli, isCut=True).mv(0, 0, jcTol)
+            tail_cut = graph.node(LeleTail(cli=self.cli, isCut=True)).mv(0, 0, jcTol)
             body -= tail_cut
-            tail = LeleTail(cli=self.cli)
+            tail = graph.node(LeleTail(cli=self.cli))
             if self.cli.jack_hole_en:
                 tail -= jh
             if self.cli.all:
                 tail <<= (5*self.cli.all_distance, 0, self.cli.all_distance/2)
                 body += tail
             else:
-                self.add_part(tail)
+                self.add_part(tail.solid)
         elif self.cli.body_type in [LeleBodyType.HOLLOW]:
             # join tail to body if flat hollow and not separate end
-            body += LeleTail(cli=self.cli)
+            body += graph.node(LeleTail(cli=self.cli))
             tail_cut = None
 
         ## Text (buggy for blender)
         if not self.cli.no_text:
-            text = LeleTexts(cli=self.cli, isCut=True)
+            text = graph.node(LeleTexts(cli=self.cli, isCut=True))
         else:
             text = None
         if not self.cli.separate_bottom:
@@ -154,11 +153,11 @@ class LeleBottomAssembly(LeleBase):
 
         ## bottom
         if self.cli.separate_bottom:
-            rim = LeleRim(cli=self.cli, isCut=True) # .gen_full()
-            rim <<= (0,0,-self.cli.flat_body_thickness + rim.RIM_TCK/2)
+            rim = graph.node(LeleRim(cli=self.cli, isCut=True))
+            rim <<= (0,0,-self.cli.flat_body_thickness + rim.solid.RIM_TCK/2)
             body -= rim
 
-            bottom = LeleBottom(cli=self.cli)
+            bottom = graph.node(LeleBottom(cli=self.cli))
             bottom = bottom - chamber - rim - tnrs - text
             if self.cli.separate_end:
                 bottom -= tail_cut
@@ -167,9 +166,16 @@ class LeleBottomAssembly(LeleBase):
                 bottom <<= (0, 0, -self.cli.all_distance)
                 body += bottom
             else:
-                self.add_part(bottom)
+                self.add_part(bottom.solid)
+
+        shape = graph.gen(body)
+        if self.cli.trace:
+            graph.print_report(body)
+
+        if not self.cli.separate_neck:
+            self.add_parts(neck.parts)
 
-        return body.gen_full()
+        return shape
 
     def gen_parser(self,parser=None):
         """
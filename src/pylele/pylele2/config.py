@@ -3,6 +3,7 @@
 """ Pylele Configuration Module """
 
 import argparse
+from collections import OrderedDict
 from math import atan, inf, sqrt, tan
 
 import os
@@ -13,6 +14,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
 from b13d.api.core import Fidelity, Implementation, StringEnum
 from b13d.api.utils import radians, degrees, accumDiv
 from b13d.api.constants import FIT_TOL, FILLET_RAD, ColorEnum
+from b13d.api.cache import cli_fingerprint
 from pylele.config_common import SEMI_RATIO, LeleScaleEnum, TunerConfig, PegConfig, WormConfig, TunerType
 
 DEFAULT_FLAT_BODY_THICKNESS=25
@@ -180,7 +182,13 @@ def tzAdj(tY: float, tnrType: TunerType, endWth: float, top_ratio: float) -> flo
         else (((endWth/2)**2 - tY**2)**.5 * top_ratio/2 + .5)
 
 class LeleConfig:
-    """ Pylele Configuration Class """
+    """ Pylele Configuration Class
+
+        Immutable once constructed, use lele_config() to share one instance
+        between all the solids generated from the same cli.
+        Per part data derived from the configuration is computed on first
+        use and cached, see derived()
+    """
     TOP_RATIO = 1/8
     BOT_RATIO = 2/3
     EMBOSS_DEP = .5
@@ -457,13 +465,82 @@ class LeleConfig:
             self.stringPaths.append(strPathR)
             self.stringPaths.append(strPathL)
 
+        self._key = cli_fingerprint(self.cli)
+        self._derived = {}
+        self._frozen = True
+
+    def __setattr__(self, key, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(
+                f"LeleConfig is immutable, cannot set {key}, use derived() for per part data"
+            )
+        super().__setattr__(key, value)
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __eq__(self, other):
+        return isinstance(other, LeleConfig) and self._key == other._key
+
+    def derived(self, key, fn):
+        """ Return data derived from this configuration, computed by fn on first use.
+            key must identify fn and any input not in the configuration,
+            the returned data is shared and must not be modified """
+        if key not in self._derived:
+            self._derived[key] = fn()
+        return self._derived[key]
+
     def __repr__(self):
         class_vars_str = '\n'.join(f"{key}={value!r}" for key, value in self.__class__.__dict__.items() \
                 if not callable(value) and not key.startswith("__"))
 
-        instance_vars_str = '\n'.join(f"{key}={value!r}" for key, value in vars(self).items())
+        instance_vars_str = '\n'.join(f"{key}={value!r}" for key, value in vars(self).items() \
+                if not key.startswith("_"))
         return f"{self.__class__.__name__}\n{class_vars_str}\n{instance_vars_str}"
 
+# least recently used configurations by cli fingerprint, shared by all solids of a build,
+# bounded for long running processes building many configurations, e.g. tests
+_CONFIGS = OrderedDict()
+CONFIGS_CACHE_SIZE = 16
+
+def lele_config(cli) -> LeleConfig:
+    """ Return the configuration of a cli, computed once per distinct cli """
+    key = cli_fingerprint(cli)
+    if key in _CONFIGS:
+        _CONFIGS.move_to_end(key)
+        return _CONFIGS[key]
+    cfg = LeleConfig(cli=cli)
+    _CONFIGS[key] = cfg
+    if len(_CONFIGS) > CONFIGS_CACHE_SIZE:
+        _CONFIGS.popitem(last=False)
+    return cfg
+
+def test_lele_config(self):
+    """ Test shared Pylele Configuration """
+    parser = pylele_config_parser()
+    parser.add_argument("-i", "--implementation", type=Implementation, default=Implementation.MOCK)
+
+    cfg = lele_config(parser.parse_args(args=[]))
+    self.assertIs(cfg, lele_config(parser.parse_args(args=[])))
+    self.assertIsNot(cfg, lele_config(parser.parse_args(args=['-n', '6'])))
+    self.assertEqual(hash(cfg), hash(LeleConfig(cli=parser.parse_args(args=[]))))
+
+    # least recently used configurations are dropped
+    first = lele_config(parser.parse_args(args=['-n', '7']))
+    for n in range(CONFIGS_CACHE_SIZE):
+        lele_config(parser.parse_args(args=['-n', str(n + 8)]))
+        self.assertIs(cfg, lele_config(parser.parse_args(args=[])))
+    self.assertEqual(len(_CONFIGS), CONFIGS_CACHE_SIZE)
+    self.assertIsNot(first, lele_config(parser.parse_args(args=['-n', '7'])))
+
+    with self.assertRaises(AttributeError):
+        cfg.neckLen = 0
+
+    calls = []
+    for _ in range(2):
+        self.assertEqual(cfg.derived("test", lambda: calls.append(1) or len(calls)), 1)
+    self.assertEqual(len(calls), 1)
+
 def main():
     """ Pylele Configuration """
     parser = pylele_config_parser()
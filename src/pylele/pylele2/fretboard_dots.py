@@ -62,7 +62,7 @@ class LeleFretboardDots(LeleBase):
         dotRad = self.cli.dots_radius + cutAdj
         fret2Dots = self.cli.dot_frets
 
-        dots = None
+        dots = []
         sgap = nutSGap
         # half length of fret 1
         flen = 0.5 * scLen / accumDiv(1, 12, SEMI_RATIO)
@@ -77,16 +77,15 @@ class LeleFretboardDots(LeleBase):
                     else [-0.5, 0.5] if fret2Dots[n] == 2 else [-1, 0, 1]
                 )
                 for p in pos:
-                    dot = self.api.cylinder_z(
-                        2 * dep, dotRad).mv(acclen - .5*flen, p*sgap, ht)
-                    dots = dot + dots
+                    dots.append(self.api.cylinder_z(
+                        2 * dep, dotRad).mv(acclen - .5*flen, p*sgap, ht))
 
             sgap = 0.5 * acclen * math.tan(radians(wideAng)) + nutSGap
             flen /= SEMI_RATIO
             acclen += flen
             n += 1
     
-        return dots.set_color(ColorEnum.WHITE)
+        return self.api.union_all(dots).set_color(ColorEnum.WHITE)
 
     def gen_parser(self, parser=None):
         """
@@ -24,12 +24,12 @@ class LeleFretboardJoint(LeleNeckJoint):
         cutAdj = (FIT_TOL + self.api.tolerance()) if self.isCut else 0
         fbHt = self.cfg.fretbdHt
         nkLen = self.cfg.neckLen
-        jntLen = self.cfg.neckJntLen + 2*cutAdj
-        jntWth = self.cfg.neckJntWth + 2*cutAdj # to align with spine cuts
+        jntLen = self.jnt_cfg.neckJntLen + 2*cutAdj
+        jntWth = self.jnt_cfg.neckJntWth + 2*cutAdj # to align with spine cuts
         jntTck = .8*fbHt + 2*cutAdj
         jnt = self.api.box(jntLen, jntWth, jntTck).mv(nkLen+jntLen/2, 0, jntTck/2)
-        jntLen = self.cfg.neckJntLen + 2 * cutAdj
-        jntWth = self.cfg.neckJntWth + 2 * cutAdj  # to align with spine cuts
+        jntLen = self.jnt_cfg.neckJntLen + 2 * cutAdj
+        jntWth = self.jnt_cfg.neckJntWth + 2 * cutAdj  # to align with spine cuts
         jntTck = 0.8 * fbHt + 2 * cutAdj
         jnt = self.api.box(jntLen, jntWth, jntTck).mv(
             nkLen + jntLen / 2, 0, jntTck / 2
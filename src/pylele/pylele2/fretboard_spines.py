@@ -27,7 +27,7 @@ class LeleFretboardSpines(LeleSpines,LeleNeckJoint):
 
     def fretboard_spine_len(self) -> float:
         """ Spine Length """
-        return self.cfg.neckLen - self.cfg.NUT_HT + self.cfg.neckJntLen
+        return self.cfg.neckLen - self.cfg.NUT_HT + self.jnt_cfg.neckJntLen
 
     def gen(self) -> Shape:
         """Generate Fretboard Spines"""
@@ -46,7 +46,7 @@ class LeleFretboardSpines(LeleSpines,LeleNeckJoint):
         fspX = self.cfg.NUT_HT
 
         shape = None
-        for y_spine in self.cfg.spineY:
+        for y_spine in self.spine_cfg.spineY:
             spine = self.api.box(fspLen, spWth, fspTck)
             spine <<= (fspX + fspLen/2 - 2*cutAdj, y_spine, -fspTck/2)
             shape = spine + shape
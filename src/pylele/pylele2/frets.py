@@ -79,7 +79,7 @@ class LeleFrets(LeleBase):
         fx = 0
         gap = (scLen / 2) / accumDiv(1, 12, SEMI_RATIO)
         count = 0
-        frets =  None
+        frets = []
         while (fx < (fbLen - gap - 2 * fHt)):
             fx = fx + gap
             fy = fWth / 2 + math.tan(radians(wideAng)) * fx
@@ -88,14 +88,14 @@ class LeleFrets(LeleBase):
             fret = gen_fret(api=self.api, y=fy, h=fHt, ftype=self.cli.fret_type)
             fret <<= (fx, 0, fz)
 
-            frets = fret + frets
+            frets.append(fret)
 
             gap = gap / SEMI_RATIO
             count += 1
             if count > maxFrets:  # prevent runaway loop
                 break
 
-        return frets.set_color(ColorEnum.LITE_GRAY)
+        return self.api.union_all(frets).set_color(ColorEnum.LITE_GRAY)
 
     def gen_parser(self, parser=None):
         """Generate Fret Parser"""
@@ -35,15 +35,15 @@ class LeleHead(LeleHeadTop):
     def gen(self) -> Shape:
         """Generate Head"""
 
-        hdWth = self.cfg.headWth
+        hdWth = self.head_cfg.headWth
         hdLen = self.cfg.headLen
         spHt = self.cfg.SPINE_HT
         fspTck = self.cfg.FRETBD_SPINE_TCK
         topRat = self.TOP_HEAD_RATIO
         midTck = self.cfg.extMidBotTck
         botRat = self.cfg.BOT_RATIO
-        orig = self.cfg.headOrig
-        path = self.cfg.headPath
+        orig = self.head_cfg.headOrig
+        path = self.head_cfg.headPath
         joinTol = self.api.tolerance()
 
         hd = self.api.spline_revolve(orig, path, -180)
@@ -97,5 +97,17 @@ def test_head_mock(self):
     """Test Head"""
     test_head(self, apis=["mock"])
 
+def test_head_cache(self):
+    """Test Head exported by a cold and a warm cache build is identical"""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        stls = []
+        for build in ["cold", "warm"]:
+            _, out_fname = main(args=["-i", "mf", "-cdir", cache_dir, "-odoff", "-o", os.path.join(cache_dir, build)])
+            with open(out_fname, "rb") as f:
+                stls.append(f.read())
+        self.assertEqual(stls[0], stls[1])
+
 if __name__ == "__main__":
     main()
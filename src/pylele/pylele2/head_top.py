@@ -16,6 +16,7 @@ from b13d.api.utils import radians
 from b13d.api.core import Shape
 from b13d.api.solid import main_maker, test_loop
 from pylele.pylele2.base import LeleBase
+from pylele.pylele2.config import AttrDict
 from pylele.pylele2.strings import LeleStrings
 
 class LeleHeadTop(LeleBase):
@@ -24,20 +25,25 @@ class LeleHeadTop(LeleBase):
 
     def configure_head(self):
         """ Configure head """
-        
-        self.cfg.headWth = self.cfg.nutWth * self.HEAD_WTH_RATIO
+        self.head_cfg = self.cfg.derived(("head", self.HEAD_WTH_RATIO), self.head_config)
+
+    def head_config(self) -> AttrDict:
+        """ Head Configuration, derived from the ukulele configuration """
+        cfg = AttrDict()
+        cfg.headWth = self.cfg.nutWth * self.HEAD_WTH_RATIO
         headDX = 1
         headDY = headDX * tan(radians(self.cfg.neckWideAng))
-        self.cfg.headOrig = (0, 0)
-        self.cfg.headPath = [
+        cfg.headOrig = (0, 0)
+        cfg.headPath = [
             (0, self.cfg.nutWth/2),
             [
                 (-headDX, self.cfg.nutWth/2 + headDY, headDY/headDX),
-                (-self.cfg.headLen/2, self.cfg.headWth/2, 0),
-                (-self.cfg.headLen, self.cfg.headWth/6, -inf),
+                (-self.cfg.headLen/2, cfg.headWth/2, 0),
+                (-self.cfg.headLen, cfg.headWth/6, -inf),
             ],
             (-self.cfg.headLen, 0),
         ]
+        return cfg
 
     def configure(self):
         LeleBase.configure(self)
@@ -47,12 +53,12 @@ class LeleHeadTop(LeleBase):
         """Generate Head"""
 
         topRat = self.TOP_HEAD_RATIO
-        hdWth = self.cfg.headWth
+        hdWth = self.head_cfg.headWth
         hdLen = self.cfg.headLen
         ntHt = self.cfg.NUT_HT
         fbTck = self.cfg.FRETBD_TCK
-        orig = self.cfg.headOrig
-        path = self.cfg.headPath
+        orig = self.head_cfg.headOrig
+        path = self.head_cfg.headPath
         joinTol = self.api.tolerance()
 
         top = None
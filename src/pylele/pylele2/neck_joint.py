@@ -13,6 +13,7 @@ from b13d.api.core import Shape
 from b13d.api.constants import FIT_TOL
 from b13d.api.solid import main_maker, test_loop
 from pylele.pylele2.base import LeleBase
+from pylele.pylele2.config import AttrDict
 
 
 class LeleNeckJoint(LeleBase):
@@ -21,9 +22,15 @@ class LeleNeckJoint(LeleBase):
 
     def configure_neck_joint(self):
         """ Neck Joint Configuration """
-        self.cfg.neckJntLen = self.NECK_JNT_RATIO*(self.cfg.fretbdLen - self.cfg.neckLen)
-        self.cfg.neckJntTck = self.cfg.FRETBD_SPINE_TCK + self.cfg.SPINE_HT
-        self.cfg.neckJntWth = (1 if self.cfg.is_odd_strs() else 2)*self.cli.nut_string_gap + self.cfg.SPINE_WTH
+        self.jnt_cfg = self.cfg.derived(("neck_joint", self.NECK_JNT_RATIO), self.neck_joint_config)
+
+    def neck_joint_config(self) -> AttrDict:
+        """ Neck Joint Configuration, derived from the ukulele configuration """
+        cfg = AttrDict()
+        cfg.neckJntLen = self.NECK_JNT_RATIO*(self.cfg.fretbdLen - self.cfg.neckLen)
+        cfg.neckJntTck = self.cfg.FRETBD_SPINE_TCK + self.cfg.SPINE_HT
+        cfg.neckJntWth = (1 if self.cfg.is_odd_strs() else 2)*self.cli.nut_string_gap + self.cfg.SPINE_WTH
+        return cfg
     
     def configure(self):
         LeleBase.configure(self)
@@ -33,10 +40,10 @@ class LeleNeckJoint(LeleBase):
         """Generate Neck Joint"""
         cutAdj = (FIT_TOL + self.api.tolerance()) if self.isCut else 0
         nkLen = self.cfg.neckLen
-        jntLen = self.cfg.neckJntLen + 2 * cutAdj
-        jntWth = self.cfg.neckJntWth + 2 * cutAdj
+        jntLen = self.jnt_cfg.neckJntLen + 2 * cutAdj
+        jntWth = self.jnt_cfg.neckJntWth + 2 * cutAdj
         jntTck = (
-            self.cfg.neckJntTck + 2 * FIT_TOL + 2 * self.api.tolerance()
+            self.jnt_cfg.neckJntTck + 2 * FIT_TOL + 2 * self.api.tolerance()
         )  # to match cut grooves for spines
         jnt = self.api.box(jntLen, jntWth, jntTck).mv(
             nkLen + jntLen / 2, 0, -jntTck / 2
@@ -40,21 +40,21 @@ class LeleSoundhole(LeleBase):
 
     def configure(self):
         LeleBase.configure(self)
-        self.cfg.sh_cfg = soundhole_config(
+        self.sh_cfg = self.cfg.derived("soundhole", lambda: soundhole_config(
                      scaleLen = float(self.cli.scale_length),
                      chmFront = self.cfg.chmFront,
                      chmWth = self.cfg.chmWth,
-                     neckWth = self.cfg.neckWth)
+                     neckWth = self.cfg.neckWth))
 
     def gen(self) -> Shape:
         """Generate Soundhole"""
 
-        x = self.cfg.sh_cfg.sndholeX
-        y = self.cfg.sh_cfg.sndholeY
+        x = self.sh_cfg.sndholeX
+        y = self.sh_cfg.sndholeY
         midTck = self.cfg.extMidTopTck
-        minRad = self.cfg.sh_cfg.sndholeMinRad
-        maxRad = self.cfg.sh_cfg.sndholeMaxRad
-        ang = self.cfg.sh_cfg.sndholeAng
+        minRad = self.sh_cfg.sndholeMinRad
+        maxRad = self.sh_cfg.sndholeMaxRad
+        ang = self.sh_cfg.sndholeAng
         bodyWth = self.cfg.bodyWth
 
         hole = self.api.cylinder_z(bodyWth + midTck, minRad)\
@@ -67,7 +67,7 @@ class LeleSoundhole(LeleBase):
         """ Fillet soundhole """
 
         # soundhole fillet
-        sh_cfg = self.cfg.sh_cfg
+        sh_cfg = self.sh_cfg
 
         top = top.fillet(
             nearestPts=[(sh_cfg.sndholeX, sh_cfg.sndholeY, self.cfg.fretbdHt)],
@@ -15,7 +15,7 @@ from b13d.api.core import Shape
 from b13d.api.constants import FIT_TOL
 from b13d.api.solid import main_maker, test_loop
 from pylele.pylele2.base import LeleBase
-from pylele.pylele2.config import LeleBodyType
+from pylele.pylele2.config import AttrDict, LeleBodyType
 
 
 class LeleSpines(LeleBase):
@@ -27,30 +27,35 @@ class LeleSpines(LeleBase):
 
     def configure_spines(self):
         """ Spine Configuration """
-        # Spine configs
-        self.cfg.spineX = -self.cfg.headLen
-        self.cfg.spineLen = self.cfg.headLen + float(self.cli.scale_length)
+        self.spine_cfg = self.cfg.derived("spines", self.spines_config)
+
+    def spines_config(self) -> AttrDict:
+        """ Spine Configuration, derived from the ukulele configuration """
+        cfg = AttrDict()
+        cfg.spineX = -self.cfg.headLen
+        cfg.spineLen = self.cfg.headLen + float(self.cli.scale_length)
         if not self.cli.body_type in [LeleBodyType.TRAVEL]:
-            self.cfg.spineLen += self.cfg.chmBack + self.cfg.rimWth
-        self.cfg.spineGap = (1 if self.cfg.is_odd_strs() else 2)*self.cli.nut_string_gap
-        self.cfg.spineY = []
+            cfg.spineLen += self.cfg.chmBack + self.cfg.rimWth
+        cfg.spineGap = (1 if self.cfg.is_odd_strs() else 2)*self.cli.nut_string_gap
+        cfg.spineY = []
         if (self.cli.num_spines % 2) != 0:
-            self.cfg.spineY.append(0)
+            cfg.spineY.append(0)
         for i in range(1,floor(self.cli.num_spines/2)+1):
-            self.cfg.spineY += [-i*self.cfg.spineGap/2, i*self.cfg.spineGap/2]
+            cfg.spineY += [-i*cfg.spineGap/2, i*cfg.spineGap/2]
+        return cfg
 
     def gen(self) -> Shape:
         """Generate Spines"""
 
         cutAdj = (FIT_TOL + self.api.tolerance()) if self.isCut else 0
-        spX = self.cfg.spineX
-        spLen = self.cfg.spineLen+ 2*cutAdj
+        spX = self.spine_cfg.spineX
+        spLen = self.spine_cfg.spineLen+ 2*cutAdj
         spHt = self.cfg.SPINE_HT + 2*cutAdj
         spWth = self.cfg.SPINE_WTH + 2*cutAdj
         fspTck = self.cfg.FRETBD_SPINE_TCK  + 2*self.api.tolerance()
 
         shape = None
-        for y_spine in self.cfg.spineY:
+        for y_spine in self.spine_cfg.spineY:
             spine = self.api.box(spLen, spWth, spHt)
             spine <<= (spX + spLen/2, y_spine, -fspTck - spHt/2)
             
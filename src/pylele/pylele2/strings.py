@@ -25,11 +25,7 @@ class LeleStrings(LeleBase):
         srad = self.cfg.STR_RAD + cutAdj
         paths = self.cfg.stringPaths
 
-        strs = None
-        for p in paths:
-            strs = self.api.regpoly_sweep(srad, p) + strs
-
-        return strs
+        return self.api.union_all([self.api.regpoly_sweep(srad, p) for p in paths])
 
 def main(args=None):
     """Generate Strings"""
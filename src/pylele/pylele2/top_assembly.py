@@ -163,5 +163,35 @@ def test_top_assembly_mock(self):
     test_top_assembly(self, apis=["mock"])
 
 
+def test_top_assembly_jobs(self):
+    """Test separate parts exported by worker processes match the serial build,
+    and their reports and trace spans are collected by the assembly"""
+    import tempfile
+    from unittest import mock
+    from b13d.api.trace import TRACER
+
+    with tempfile.TemporaryDirectory() as outdir:
+        stls = {}
+        for jobs in ["1", "2"]:
+            # -nc, so that workers do not load the parts cached by the serial build
+            args = ["-i", "mf", "-nc", "-odoff", "-B", "-G", "-tr", "-j", jobs, "-o", os.path.join(outdir, jobs)]
+            with mock.patch("os.cpu_count", return_value=2):
+                solid, _ = main(args=args)
+            fnames = sorted(os.path.basename(rpt["fname"]) for rpt in solid.parts_rpt)
+            self.assertEqual(fnames, ["LeleBridgeAssembly.stl", "LeleGuide.stl"])
+            for rpt in solid.parts_rpt:
+                with open(rpt["fname"], "rb") as f:
+                    stls[(jobs, os.path.basename(rpt["fname"]))] = f.read()
+            remote = [e["name"] for e in TRACER.events if e["pid"] != os.getpid()]
+            if jobs == "1":
+                self.assertEqual(remote, [])
+            else:
+                self.assertIn("LeleGuide", remote)
+                self.assertIn("LeleBridgeAssembly", remote)
+
+        for fname in fnames:
+            self.assertEqual(stls[("1", fname)], stls[("2", fname)])
+
+
 if __name__ == "__main__":
     main()
@@ -57,33 +57,36 @@ class LeleTuners(LeleBase):
     def gen(self) -> Shape:
         """Generate Tuners"""
 
-        tnrs = None
-        for txyz in self.cfg.tnrXYZs:
-            if self.is_peg():
-                tnr = LelePeg(isCut=self.isCut, cli=self.cli).gen_full()
-            elif self.is_worm():
-                tnr = LeleWorm(isCut=self.isCut, cli=self.cli).gen_full()
-            elif self.is_turnaround():
-                tnr = LeleTurnaround(isCut=self.isCut, cli=self.cli).gen_full()
-            else:
-                raise ValueError(f"Unknown tuner type: {self.cli.tuner_type}")
-            tnr = tnr.mv(txyz[0], txyz[1], txyz[2])
-            tnrs = tnr + tnrs
+        # all tuners are identical, generate once and place copies
+        if self.is_peg():
+            tnr = LelePeg(isCut=self.isCut, cli=self.cli).gen_full()
+        elif self.is_worm():
+            tnr = LeleWorm(isCut=self.isCut, cli=self.cli).gen_full()
+        elif self.is_turnaround():
+            tnr = LeleTurnaround(isCut=self.isCut, cli=self.cli).gen_full()
+        else:
+            raise ValueError(f"Unknown tuner type: {self.cli.tuner_type}")
+
+        tnrs = self.api.union_all(
+            [tnr.dup().mv(txyz[0], txyz[1], txyz[2]) for txyz in self.cfg.tnrXYZs]
+        )
 
         # generate pegs for turnaround
         if self.is_turnaround():
-            ta_tnr = None
-            for i in range(ceil(self.cli.num_strings/2)):
-                if self.cli.tuner_type == TunerType.TURNAROUND90.name:
-                    tnr = LelePeg90(isCut=self.isCut, cli=self.cli).gen_full()
-                else:
-                    tnr = LelePeg(isCut=self.isCut, cli=self.cli).gen_full()
-                peg_cfg = TunerType[self.cli.tuner_type].value.peg_config
-                tnr <<= (0,0,peg_cfg.botLen)
-                tnr.rotate_x(90).mv(float(self.cli.scale_length) - self.cli.tuners_turnaround_spacing * (1 + i),
-                                    self.cfg.bodyWth/2,
-                                    -self.cli.flat_body_thickness/2)
-                ta_tnr = tnr + ta_tnr
+            if self.cli.tuner_type == TunerType.TURNAROUND90.name:
+                peg = LelePeg90(isCut=self.isCut, cli=self.cli).gen_full()
+            else:
+                peg = LelePeg(isCut=self.isCut, cli=self.cli).gen_full()
+            peg_cfg = TunerType[self.cli.tuner_type].value.peg_config
+            peg <<= (0,0,peg_cfg.botLen)
+            peg = peg.rotate_x(90)
+
+            ta_tnr = self.api.union_all([
+                peg.dup().mv(float(self.cli.scale_length) - self.cli.tuners_turnaround_spacing * (1 + i),
+                             self.cfg.bodyWth/2,
+                             -self.cli.flat_body_thickness/2)
+                for i in range(ceil(self.cli.num_strings/2))
+            ])
             ta_tnr += ta_tnr.mirror_and_join()
             tnrs += ta_tnr
 
@@ -33,6 +33,9 @@ class PyleleTestMethods(unittest.TestCase):
     from pylele.parts.jack_hole_6p5mm import test_jack_hole_6p5mm, test_jack_hole_6p5mm_mock
     from pylele.parts.jack_holder import test_jack_holder, test_jack_holder_mock
 
+    ## Pylele Configuration
+    from pylele.pylele2.config import test_lele_config
+
     ## Pylele Individual Parts
     from pylele.pylele2.frets import test_frets, test_frets_mock
     from pylele.pylele2.fretboard import test_fretboard, test_fretboard_mock
@@ -54,7 +57,7 @@ class PyleleTestMethods(unittest.TestCase):
     from pylele.pylele2.nut import test_nut, test_nut_mock
     from pylele.pylele2.spines import test_spines, test_spines_mock
     from pylele.pylele2.head_top import test_head_top, test_head_top_mock
-    from pylele.pylele2.head import test_head, test_head_mock
+    from pylele.pylele2.head import test_head, test_head_mock, test_head_cache
     from pylele.pylele2.neck_joint import test_neck_joint, test_neck_joint_mock
     from pylele.pylele2.neck import test_neck, test_neck_mock
     from pylele.pylele2.guide import test_guide, test_guide_mock
@@ -64,7 +67,7 @@ class PyleleTestMethods(unittest.TestCase):
     from pylele.pylele2.worm import test_worm, test_worm_mock
     from pylele.pylele2.turnaround import test_turnaround,test_turnaround_mock
     from pylele.pylele2.tuners import test_tuners, test_tuners_mock
-    from pylele.pylele2.body import test_body, test_body_mock
+    from pylele.pylele2.body import test_body, test_body_mock, test_body_polygon
     from pylele.pylele2.texts import test_texts, test_texts_mock
     from pylele.pylele2.rim import test_rim, test_rim_mock
     from pylele.pylele2.worm_key import test_worm_key, test_worm_key_mock
@@ -79,12 +82,15 @@ class PyleleTestMethods(unittest.TestCase):
     )
     from pylele.pylele2.neck_assembly import test_neck_assembly, test_neck_assembly_mock
     from pylele.pylele2.bridge_assembly import test_bridge_assembly, test_bridge_assembly_mock
-    from pylele.pylele2.top_assembly import test_top_assembly, test_top_assembly_mock
+    from pylele.pylele2.top_assembly import test_top_assembly, test_top_assembly_mock, test_top_assembly_jobs
     from pylele.pylele2.bottom_assembly import (
         test_bottom_assembly,
         test_bottom_assembly_mock,
     )
-    from pylele.pylele2.all_assembly import test_all_assembly, test_all_assembly_mock
+    from pylele.pylele2.all_assembly import test_all_assembly, test_all_assembly_mock, test_all_assembly_watertight
+
+    ## Benchmark
+    from pylele.bench import test_bench_compare, test_bench_discovery
 
     def test_zz_report(self):
         """ Generate Test Report """